@@ -1,7 +1,7 @@
 from dataclasses import dataclass
 import sys
 from pathlib import Path
-from typing import List, Literal
+from typing import List, Literal, Optional
 from pydantic import BaseModel, Field, field_validator
 from langchain_core.tools import tool
 from langchain_openai import AzureChatOpenAI
@@ -522,17 +522,20 @@ Analysis:
                 self.logger.error(f"Error in get_all_transactions_tool: {str(e)}")
                 raise AgentException() from e
 
-        @tool("get_transactions_by_customer_tool", description="LIST all transactions for a specific customer ID, use this when the user asks about a customer's transaction history, limited to 20 results;")
-        async def get_transactions_by_customer_tool(customer_id: str, limit: int = 20, skip: int = 0):
+        @tool("get_transactions_by_customer_tool", description="LIST all transactions for a specific customer ID, newest first, with the customer's totals, use this when the user asks about a customer's transaction history, limited to 20 results; pass the returned next cursor to get older transactions;")
+        async def get_transactions_by_customer_tool(customer_id: str, limit: int = 20, cursor: Optional[str] = None):
             self.logger.info(f"Tool called: get_transactions_by_customer_tool with customer_id={customer_id}")
             try:
-                transactions = await self.backend_client.get_transactions_by_customer(customer_id, limit, skip)
+                timeline = await self.backend_client.get_transactions_by_customer(customer_id, limit, cursor)
+                transactions = timeline["transactions"]
 
                 if not transactions:
                     self.logger.warning(f"No transactions found for customer ID: {customer_id}")
                     return f"No transactions found for customer ID '{customer_id}'."
 
-                result = f"Transaction history for customer {customer_id} ({len(transactions)} transactions):\n\n"
+                summary = timeline["summary"]
+                result = f"Transaction history for customer {customer_id} ({len(transactions)} of {summary['transaction_count']} transactions, "
+                result += f"total ${summary['total_amount_usd']:.2f}, {summary['fraud_count']} fraudulent):\n\n"
                 writer = get_stream_writer()
 
                 for i, transaction in enumerate(transactions, 1):
@@ -546,6 +549,9 @@ Analysis:
                     result += f"   Distant from Home: {'Yes' if transaction.get('distance_from_home') == 1 else 'No'}\n"
                     result += f"   Is Fraud: {'Yes' if transaction.get('is_fraud') else 'No'}\n\n"
 
+                if timeline["next_cursor"]:
+                    result += f"More transactions available, next cursor: {timeline['next_cursor']}\n"
+
                 writer(f"{result}")
                 self.logger.info(f"Successfully retrieved {len(transactions)} transactions for customer: {customer_id}")
 
@@ -746,6 +752,69 @@ Analysis:
                 self.logger.error(f"Error in get_transaction_by_id_tool: {str(e)}")
                 raise AgentException() from e
     
+        @tool("get_transactions_by_ids_tool", description="Get several transactions at once from a list of transaction IDs, use this instead of calling get_transaction_by_id_tool repeatedly when the user asks about more than one transaction, User has the option to INCLUDE or NOT the predictions with the result")
+        async def get_transactions_by_ids_tool(transaction_ids: List[str], include_predictions: bool = False):
+            self.logger.info(f"Tool called: get_transactions_by_ids_tool with {len(transaction_ids)} ids with include_predictions as {include_predictions}")
+            try:
+                lookup = await self.backend_client.get_transactions_by_ids(transaction_ids, include_predictions)
+                transactions = lookup["transactions"]
+
+                writer = get_stream_writer()
+
+                result = f"Found {len(transactions)} of {len(transaction_ids)} transactions:\n\n"
+                for i, transaction in enumerate(transactions, 1):
+                    result += f"{i}. Transaction ID: {transaction.get('transaction_id')}\n"
+                    result += f"   Customer: {transaction.get('customer_id')}\n"
+                    result += f"   Amount: ${transaction.get('amount'):.2f} {transaction.get('currency', 'USD')}\n"
+                    result += f"   Date: {transaction.get('timestamp')}\n"
+                    result += f"   Merchant: {transaction.get('merchant')} ({transaction.get('merchant_category')})\n"
+                    result += f"   Location: {transaction.get('city')}, {transaction.get('country')}\n"
+                    result += f"   Channel: {transaction.get('channel')} via {transaction.get('device')}\n"
+                    result += f"   Is Fraud: {'Yes' if transaction.get('is_fraud') else 'No'}\n"
+                    if include_predictions:
+                        result += f"   Fraud Probability: {transaction.get('fraud_probability', 0.0):.2%}\n"
+                    result += "\n"
+                if lookup["missing"]:
+                    result += f"Not found: {', '.join(lookup['missing'])}\n"
+
+                writer(f"{result}")
+                self.logger.info(f"Successfully retrieved {len(transactions)} transactions by ID")
+
+                return result
+            except Exception as e:
+                self.logger.error(f"Error in get_transactions_by_ids_tool: {str(e)}")
+                raise AgentException() from e
+
+        @tool("search_transactions_in_period_tool", description="LIST transactions in a date range (ISO dates, e.g. 2023-01-01), optionally for one customer and/or only frauds, use this for old periods: it also reads the archived transactions that are no longer in the database, limited to 20 results")
+        async def search_transactions_in_period_tool(start_date: str, end_date: str, customer_id: Optional[str] = None, is_fraud: Optional[bool] = None, limit: int = 20):
+            self.logger.info(f"Tool called: search_transactions_in_period_tool with start_date={start_date}, end_date={end_date}, customer_id={customer_id}, is_fraud={is_fraud}")
+            try:
+                filters = {"start_date": start_date, "end_date": end_date, "customer_id": customer_id, "is_fraud": is_fraud}
+                transactions = await self.backend_client.export_transactions(filters, limit)
+
+                if not transactions:
+                    return f"No transactions were found between {start_date} and {end_date}."
+
+                writer = get_stream_writer()
+
+                result = f"Here are {len(transactions)} transactions between {start_date} and {end_date}:\n\n"
+                for i, transaction in enumerate(transactions, 1):
+                    result += f"{i}. Transaction ID: {transaction.get('transaction_id')}\n"
+                    result += f"   Customer: {transaction.get('customer_id')}\n"
+                    result += f"   Amount: ${transaction.get('amount'):.2f} {transaction.get('currency', 'USD')}\n"
+                    result += f"   Date: {transaction.get('timestamp')}\n"
+                    result += f"   Merchant: {transaction.get('merchant')} ({transaction.get('merchant_category')})\n"
+                    result += f"   Location: {transaction.get('city')}, {transaction.get('country')}\n"
+                    result += f"   Is Fraud: {'Yes' if transaction.get('is_fraud') else 'No'}\n\n"
+
+                writer(f"{result}")
+                self.logger.info(f"Successfully retrieved {len(transactions)} transactions between {start_date} and {end_date}")
+
+                return result
+            except Exception as e:
+                self.logger.error(f"Error in search_transactions_in_period_tool: {str(e)}")
+                raise AgentException() from e
+
         @tool("check_backend_connection_tool", description="Check if the backend prediction service is available and healthy. Use this when there are connection issues or to verify backend status")
         async def check_backend_connection_tool():
             self.logger.info("Tool called: check_backend_connection_tool")
@@ -766,7 +835,7 @@ Analysis:
                 self.logger.error(f"Error in check_backend_connection_tool: {str(e)}")
                 return f"❌ Error checking backend connection: {str(e)}"
 
-        return [get_user_data, get_latest_report, create_transaction_analysis, get_transaction_analysis, search_knowledge_base, get_all_transactions_tool, get_transaction_by_id_tool, get_transactions_by_customer_tool, get_fraud_transactions_tool, get_transaction_stats_tool, search_transactions_by_params_tool, get_all_transactions_count_by_params_tool, predict_transaction_fraud_tool, check_backend_connection_tool, get_all_transactions_count_tool]
+        return [get_user_data, get_latest_report, create_transaction_analysis, get_transaction_analysis, search_knowledge_base, get_all_transactions_tool, get_transaction_by_id_tool, get_transactions_by_ids_tool, get_transactions_by_customer_tool, search_transactions_in_period_tool, get_fraud_transactions_tool, get_transaction_stats_tool, search_transactions_by_params_tool, get_all_transactions_count_by_params_tool, predict_transaction_fraud_tool, check_backend_connection_tool, get_all_transactions_count_tool]
 
     async def _stream_query(self, agent_input, thread_id: str, context: UserContext):
         """
@@ -35,11 +35,13 @@ You have access to the following database query functions:
    - Parameters: transaction_id (string), include_predictions (default False) to include ML fraud probability
    - Returns: Complete transaction details including fraud status, and optionally fraud probability with risk level
    - Note: For comprehensive fraud analysis, use create_transaction_analysis instead
+   - Note: For several transaction IDs at once, use get_transactions_by_ids_tool(transaction_ids: list[str], include_predictions: bool = False), which fetches them all in one request
 
-7. **get_transactions_by_customer_tool(customer_id: str, limit: int = 20, skip: int = 0)** - LIST all transactions for a specific customer
+7. **get_transactions_by_customer_tool(customer_id: str, limit: int = 20, cursor: str = None)** - LIST all transactions for a specific customer
    - Use when: User asks about a customer's transaction history, "customer transactions", "user activity"
-   - Parameters: customer_id (string), limit and skip for pagination
-   - Returns: Transaction history for the specified customer ID
+   - Parameters: customer_id (string), limit, and cursor (the "next cursor" of the previous result) for older transactions
+   - Returns: Transaction history for the specified customer ID, newest first, with the customer's totals
+   - Note: For a date range (especially old periods, which may have been archived out of the database), use search_transactions_in_period_tool(start_date: str, end_date: str, customer_id: str = None, is_fraud: bool = None, limit: int = 20), which also reads archived transactions
 
 8. **get_fraud_transactions_tool(is_fraud: bool = True, limit: int = 20, skip: int = 0)** - LIST fraudulent or legitimate transactions
    - Use when: User asks about "fraud cases", "suspicious transactions", "fraudulent activity", "legitimate transactions"
@@ -1,6 +1,7 @@
 import httpx
+import json
 import os
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 from dotenv import load_dotenv
 from infra.logging.logger import get_agent_logger
 from infra.exceptions.agent_exceptions import BackendClientException
@@ -289,20 +290,42 @@ class BackendAPIClient:
         filters = {field: value}
         return await self.get_transactions_filtered(filters, limit, skip)
 
-    async def get_transactions_by_customer(self, customer_id: str, limit: int = 20, skip: int = 0) -> Dict[str, Any]:
+    async def get_transactions_by_customer(self, customer_id: str, limit: int = 20, cursor: Optional[str] = None) -> Dict[str, Any]:
         """
-        Get transactions for a specific customer.
+        Get the transaction history of a customer, newest first.
 
         Args:
-            customer_id: The customer ID to filter by
+            customer_id: The customer ID
             limit: Maximum number of transactions to return (default 20)
-            skip: Number of transactions to skip (default 0)
+            cursor: next_cursor of the previous page (None for the most recent transactions)
 
         Returns:
-            List of transactions for the customer
+            Dict with the customer's summary (count, total amount in USD, fraud count),
+            the transactions of the page and next_cursor (None on the last page)
         """
-        filters = {"customer_id": customer_id}
-        return await self.get_transactions_filtered(filters, limit, skip)
+        endpoint = f"/customers/{customer_id}/transactions"
+        url = f"{self.base_url}{endpoint}"
+
+        params = {"limit": limit}
+        if cursor:
+            params["cursor"] = cursor
+
+        self.logger.info(f"Requesting transactions of customer {customer_id} with limit={limit}, cursor={cursor}")
+
+        try:
+            async with httpx.AsyncClient() as client:
+                response = await client.get(url, params=params)
+                if response.status_code == 404:
+                    return {"customer_id": customer_id, "summary": None, "transactions": [], "next_cursor": None}
+                response.raise_for_status()
+
+                data = response.json()
+                self.logger.info(f"Customer transactions retrieved successfully: {len(data['transactions'])} transactions")
+                return data
+
+        except httpx.HTTPError as e:
+            self.logger.error(f"Failed to get customer transactions: {str(e)}")
+            raise BackendClientException(f"Failed to get customer transactions: {str(e)}")
 
     async def get_fraud_transactions(self, is_fraud: bool = True, limit: int = 20, skip: int = 0) -> Dict[str, Any]:
         """
@@ -402,6 +425,76 @@ class BackendAPIClient:
             self.logger.error(f"Failed to get transaction {transaction_id}: {str(e)}")
             raise BackendClientException(f"Failed to get transaction {transaction_id}: {str(e)}")
 
+    async def get_transactions_by_ids(self, transaction_ids: List[str], include_predictions: bool = False) -> Dict[str, Any]:
+        """
+        Get many transactions by ID in a single request.
+
+        Args:
+            transaction_ids: IDs of the transactions to retrieve (up to 1000)
+            include_predictions: Whether to include the fraud probability of each transaction
+
+        Returns:
+            Dict with the transactions (in the order of transaction_ids) and the missing IDs
+        """
+        endpoint = "/transactions/lookup"
+        url = f"{self.base_url}{endpoint}"
+
+        self.logger.info(f"Requesting {len(transaction_ids)} transactions by ID")
+
+        payload = {"ids": transaction_ids, "include_predictions": include_predictions}
+        try:
+            async with httpx.AsyncClient() as client:
+                response = await client.post(url, json=payload)
+                response.raise_for_status()
+
+                data = response.json()
+                self.logger.info(f"Transactions retrieved successfully: {len(data['transactions'])} found, {len(data['missing'])} missing")
+                return data
+
+        except httpx.HTTPError as e:
+            self.logger.error(f"Failed to get transactions by ID: {str(e)}")
+            raise BackendClientException(f"Failed to get transactions by ID: {str(e)}")
+
+    async def export_transactions(self, filters: Dict[str, Any], limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        Get the transactions matching the filters, including the ones already moved to the archive.
+
+        Reads the NDJSON stream of /transactions/export and stops after `limit` transactions, so old
+        date ranges that are no longer in the database can still be queried.
+
+        Args:
+            filters: Transaction filters (e.g. start_date, end_date, customer_id, is_fraud); None values are ignored
+            limit: Maximum number of transactions to return (default 20)
+
+        Returns:
+            List of transaction dicts
+        """
+        endpoint = "/transactions/export"
+        url = f"{self.base_url}{endpoint}"
+
+        params = {key: value for key, value in filters.items() if value is not None}
+        params["format"] = "ndjson"
+
+        self.logger.info(f"Requesting exported transactions with filters: {params}, limit={limit}")
+
+        transactions = []
+        try:
+            async with httpx.AsyncClient(timeout=None) as client:
+                async with client.stream("GET", url, params=params) as response:
+                    response.raise_for_status()
+                    async for line in response.aiter_lines():
+                        if line:
+                            transactions.append(json.loads(line))
+                        if len(transactions) >= limit:
+                            break
+
+            self.logger.info(f"Exported transactions retrieved successfully: {len(transactions)} transactions")
+            return transactions
+
+        except httpx.HTTPError as e:
+            self.logger.error(f"Failed to export transactions: {str(e)}")
+            raise BackendClientException(f"Failed to export transactions: {str(e)}")
+
     async def health_check(self) -> bool:
         """
         Check if the backend API is healthy and responsive.
@@ -4,7 +4,7 @@
 from app.exception.user_exceptions import UserException
 from fastapi import Request
 from fastapi.responses import JSONResponse
-from app.exception.transaction_exceptions import TransactionsException
+from app.exception.transaction_exceptions import QueryTooExpensiveError, TransactionsException
 import logging
 
 logger = logging.getLogger(__name__)
@@ -16,6 +16,12 @@ async def transaction_handler(request: Request, exc: TransactionsException):
         content={"message": exc.message}
     )
 
+async def query_budget_handler(request: Request, exc: QueryTooExpensiveError):
+    return JSONResponse(
+        status_code=exc.to_http_status(),
+        content={"error": "query_too_expensive", "message": exc.message, "route": exc.route, "budget_ms": exc.budget_ms, "reason": exc.reason}
+    )
+
 async def user_handler(request: Request, exc: UserException):
     logger.error(f"{exc.__class__.__name__}: {exc.message}")
     return JSONResponse(
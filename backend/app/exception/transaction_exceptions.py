@@ -2,7 +2,7 @@ from fastapi import Request
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
 from sqlalchemy.exc import IntegrityError
-from starlette.status import HTTP_400_BAD_REQUEST, HTTP_404_NOT_FOUND, HTTP_500_INTERNAL_SERVER_ERROR, HTTP_409_CONFLICT
+from starlette.status import HTTP_400_BAD_REQUEST, HTTP_404_NOT_FOUND, HTTP_500_INTERNAL_SERVER_ERROR, HTTP_409_CONFLICT, HTTP_503_SERVICE_UNAVAILABLE, HTTP_504_GATEWAY_TIMEOUT
 
 class TransactionsException(Exception):
     """Base exception class for transaction service related errors."""
@@ -21,6 +21,27 @@ class DatabaseException(TransactionsException):
     def to_http_status(self):
         return HTTP_500_INTERNAL_SERVER_ERROR
 
+class QueryTooExpensiveError(TransactionsException):
+    """Exception raised when a query of a route is cancelled: over its statement timeout, or the client disconnected."""
+    def __init__(self, route: str, budget_ms: int, reason: str):
+        self.route = route
+        self.budget_ms = budget_ms
+        self.reason = reason
+        if reason == "client_disconnected":
+            message = f"The query of {route} was cancelled because the client disconnected."
+        else:
+            message = f"The query exceeded the {budget_ms} ms budget of {route}; narrow the filters (e.g. a date range) and retry."
+        super().__init__(name="Query Too Expensive", message=message)
+
+    def to_http_status(self):
+        # Not 422: that is what FastAPI answers for malformed parameters
+        return HTTP_504_GATEWAY_TIMEOUT if self.reason == "statement_timeout" else HTTP_503_SERVICE_UNAVAILABLE
+
+class SuggestIndexNotReadyError(TransactionsException):
+    """Exception raised when filter suggestions are requested before the in-memory index is built (or while it is disabled)."""
+    def to_http_status(self):
+        return HTTP_503_SERVICE_UNAVAILABLE
+
 class TransactionNotFoundError(TransactionsException):
     """Exception raised when a transaction is not found."""
     def to_http_status(self):
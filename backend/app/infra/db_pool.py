@@ -0,0 +1,69 @@
+import time
+from collections import deque
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+class InstrumentedAsyncPool(AsyncAdaptedQueuePool):
+    """
+    AsyncAdaptedQueuePool (the asyncpg default) that records how long checkouts wait for a
+    connection, how often the pool grows into its overflow and how often checkouts time out.
+    Reported by GET /health/db-pool.
+    """
+
+    # Recent acquire times kept for the percentiles
+    WAIT_SAMPLES = 1000
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.overflow_events = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self._waits = deque(maxlen=self.WAIT_SAMPLES)
+
+    def _inc_overflow(self):
+        grown = super()._inc_overflow()
+        # _overflow starts at -pool_size: it only goes above 0 for connections beyond pool_size
+        if grown and self._overflow > 0:
+            self.overflow_events += 1
+        return grown
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            raise
+        waited = time.perf_counter() - start
+
+        self.checkouts += 1
+        self.wait_total += waited
+        self.wait_max = max(self.wait_max, waited)
+        self._waits.append(waited)
+        return connection
+
+    def stats(self) -> dict:
+        waits = sorted(self._waits)
+
+        def percentile(p: float) -> float:
+            return round(waits[min(len(waits) - 1, int(p * len(waits)))] * 1000, 3) if waits else 0.0
+
+        return {
+            "pool_size": self.size(),
+            "max_overflow": self._max_overflow,
+            "timeout_seconds": self._timeout,
+            "checked_out": self.checkedout(),
+            "idle": self.checkedin(),
+            "overflow": max(self.overflow(), 0),
+            "checkouts": self.checkouts,
+            "overflow_events": self.overflow_events,
+            "timeouts": self.timeouts,
+            "wait_ms": {
+                "avg": round(self.wait_total / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                "p50": percentile(0.50),
+                "p95": percentile(0.95),
+                "max": round(self.wait_max * 1000, 3),
+            },
+        }
@@ -0,0 +1,59 @@
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set
+
+class DistinctValuesCache:
+    """
+    In-process cache of the distinct values of a few columns, versioned per field.
+    A field is scanned once (load); afterwards every write reports its values (observe) and the
+    version of a field is bumped only when a value that is not in its set shows up, which
+    rebuilds the cached list without going back to the database. Values that disappear
+    (deletes, updates) are kept: a filter value with no rows left is harmless.
+    """
+
+    def __init__(self, fields: Iterable[str]):
+        self.fields = tuple(fields)
+        self._values: Dict[str, Set[Any]] = {field: set() for field in self.fields}
+        self._versions: Dict[str, int] = {field: 0 for field in self.fields}
+        self._loaded: Set[str] = set()
+        self._lists: Dict[str, tuple[int, List[Any]]] = {}
+
+    def version(self, field: str) -> int:
+        return self._versions[field]
+
+    def get(self, field: str) -> Optional[List[Any]]:
+        """Sorted distinct values of `field`, or None if it was never loaded."""
+        if field not in self._loaded:
+            return None
+        version = self._versions[field]
+        cached = self._lists.get(field)
+        if cached is None or cached[0] != version:
+            cached = (version, sorted(self._values[field]))
+            self._lists[field] = cached
+        return cached[1]
+
+    def load(self, field: str, values: Iterable[Any]) -> None:
+        """Values of a full scan. Merged with what was observed meanwhile, so a concurrent write is never lost."""
+        self._values[field].update(value for value in values if value is not None)
+        self._loaded.add(field)
+        self._versions[field] += 1
+
+    def observe(self, field: str, values: Iterable[Any]) -> bool:
+        """Report written values of `field`; True when one of them is new (version bumped)."""
+        new = set(values) - self._values[field]
+        new.discard(None)
+        if not new:
+            return False
+        self._values[field].update(new)
+        self._versions[field] += 1
+        return True
+
+    def observe_rows(self, rows: Sequence[Any]) -> None:
+        """Report written transactions (ORM objects or anything exposing the fields as attributes)."""
+        for field in self.fields:
+            self.observe(field, (getattr(row, field, None) for row in rows))
+
+    def observe_records(self, columns: Sequence[str], records: Sequence[tuple]) -> None:
+        """Report rows written as tuples ordered like `columns` (COPY records)."""
+        for field in self.fields:
+            if field in columns:
+                index = columns.index(field)
+                self.observe(field, (record[index] for record in records))
@@ -0,0 +1,31 @@
+from decimal import Decimal
+from typing import Any
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+# Stats dicts are keyed by bool/int values (high_risk_merchant, distance_from_home, ...)
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+def _default(value: Any):
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSONResponse encoded with orjson. Opt-in per route: declare it as `response_class` and
+    return it directly, so FastAPI skips jsonable_encoder / response_model re-validation
+    (the response_model is still used for the OpenAPI schema).
+    Bytes content is treated as already serialized JSON (see `from_model`).
+    """
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return orjson.dumps(content, default=_default, option=ORJSON_OPTIONS)
+
+    @classmethod
+    def from_model(cls, adapter: TypeAdapter, value: Any, **kwargs) -> "FastJSONResponse":
+        """Serializes Pydantic models with a precomputed TypeAdapter, without validating them again."""
+        return cls(adapter.dump_json(value), **kwargs)
@@ -0,0 +1,151 @@
+import json
+import os
+from datetime import date, datetime
+from typing import Iterator, List, Optional, Sequence
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from sqlalchemy import Boolean, DateTime, Float, Integer
+from sqlalchemy.dialects.postgresql import JSONB
+from app.models.transaction_model import Transaction
+
+def arrow_type(column) -> pa.DataType:
+    if isinstance(column.type, DateTime):
+        return pa.timestamp("us")
+    if isinstance(column.type, Float):
+        return pa.float64()
+    if isinstance(column.type, Integer):
+        return pa.int64()
+    if isinstance(column.type, Boolean):
+        return pa.bool_()
+    return pa.string()
+
+def transaction_schema() -> pa.Schema:
+    """Arrow schema of the transactions table; JSONB columns are stored as JSON text."""
+    return pa.schema([(column.name, arrow_type(column)) for column in Transaction.__table__.columns])
+
+def json_column_names() -> set:
+    return {column.name for column in Transaction.__table__.columns if isinstance(column.type, JSONB)}
+
+def rows_to_table(rows: Sequence[tuple], schema: pa.Schema, json_columns: set) -> pa.Table:
+    """Rows ordered like the transactions columns -> Arrow table (JSONB values dumped to text)."""
+    arrays = {}
+    for i, name in enumerate(schema.names):
+        values = [row[i] for row in rows]
+        if name in json_columns:
+            values = [json.dumps(value) if value is not None else None for value in values]
+        arrays[name] = values
+    return pa.Table.from_pydict(arrays, schema=schema)
+
+def publish(tmp_path: str) -> None:
+    """Rename a finished `<name>.parquet.tmp` to its final name (atomic; replaces a file of the same name)."""
+    os.replace(tmp_path, tmp_path[:-len(".tmp")])
+
+def sample_ids(tmp_path: str, limit: int) -> Optional[List[str]]:
+    """Up to `limit` transaction ids of a finished file; None if it was never closed (no footer)."""
+    try:
+        first_group = pq.ParquetFile(tmp_path).read_row_group(0, columns=["transaction_id"])
+    except (pa.ArrowException, OSError, IndexError):
+        return None
+    return first_group.column("transaction_id").to_pylist()[:limit]
+
+class ArchiveFile:
+    """One Parquet file being written: invisible to readers (temporary name) until published."""
+
+    def __init__(self, path: str, row_group_rows: int):
+        self.path = path
+        self.tmp_path = f"{path}.tmp"
+        self.row_group_rows = row_group_rows
+        self.schema = transaction_schema()
+        self.json_columns = json_column_names()
+        self.rows = 0
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._writer = pq.ParquetWriter(self.tmp_path, self.schema, compression="zstd")
+
+    def write(self, rows: Sequence[tuple]) -> None:
+        self._writer.write_table(rows_to_table(rows, self.schema, self.json_columns), row_group_size=self.row_group_rows)
+        self.rows += len(rows)
+
+    def close(self) -> int:
+        """Finish the file and return the row count read back from its footer."""
+        self._writer.close()
+        return pq.ParquetFile(self.tmp_path).metadata.num_rows
+
+    def publish(self) -> None:
+        publish(self.tmp_path)
+
+    def discard(self) -> None:
+        if self._writer.is_open:
+            self._writer.close()
+        for path in (self.tmp_path, self.path):
+            if os.path.exists(path):
+                os.remove(path)
+
+class ParquetArchive:
+    """
+    Transactions moved out of Postgres, kept as Parquet files under `root`: one directory per
+    month (year=YYYY/month=MM, hive style, so pyarrow/DuckDB/Spark read it as one dataset).
+    Files are sorted by timestamp and written in row groups of a fixed number of rows, so the
+    min/max statistics of each row group let a date-bounded scan skip most of a file.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def month_dir(self, month: date) -> str:
+        return os.path.join(self.root, f"year={month.year:04d}", f"month={month.month:02d}")
+
+    def new_file(self, month: date, name: str, row_group_rows: int) -> ArchiveFile:
+        """A file for `month`; a previous archive of the same `name` is overwritten when it is published."""
+        return ArchiveFile(os.path.join(self.month_dir(month), f"{name}.parquet"), row_group_rows)
+
+    def unpublished(self) -> List[str]:
+        """Temporary files left behind by an archive run that stopped before publishing them."""
+        return [
+            os.path.join(self.month_dir(month), name)
+            for month in self.months() for name in sorted(os.listdir(self.month_dir(month)))
+            if name.endswith(".parquet.tmp")
+        ]
+
+    def months(self) -> List[date]:
+        months = []
+        if not os.path.isdir(self.root):
+            return months
+        for year_dir in os.listdir(self.root):
+            if not year_dir.startswith("year="):
+                continue
+            for month_dir in os.listdir(os.path.join(self.root, year_dir)):
+                if month_dir.startswith("month="):
+                    months.append(date(int(year_dir[5:]), int(month_dir[6:]), 1))
+        return sorted(months)
+
+    def files(self, start: Optional[datetime] = None, end: Optional[datetime] = None) -> List[str]:
+        """Published files of the months overlapping [start, end]."""
+        first = date(start.year, start.month, 1) if start else None
+        last = date(end.year, end.month, 1) if end else None
+        files = []
+        for month in self.months():
+            if (first and month < first) or (last and month > last):
+                continue
+            directory = self.month_dir(month)
+            files.extend(os.path.join(directory, name) for name in sorted(os.listdir(directory)) if name.endswith(".parquet"))
+        return files
+
+    def scan(self, expression: Optional[ds.Expression], start: Optional[datetime], end: Optional[datetime],
+             batch_rows: int) -> Iterator[pa.RecordBatch]:
+        files = self.files(start, end)
+        if not files:
+            return iter(())
+        # Files written before a column was added read it as null
+        dataset = ds.dataset(files, schema=transaction_schema(), format="parquet")
+        return dataset.to_batches(filter=expression, batch_size=batch_rows)
+
+    def stats(self) -> dict:
+        files = self.files()
+        return {
+            "root": self.root,
+            "months": [month.isoformat()[:7] for month in self.months()],
+            "files": len(files),
+            "rows": sum(pq.ParquetFile(path).metadata.num_rows for path in files),
+            "bytes": sum(os.path.getsize(path) for path in files),
+        }
@@ -0,0 +1,88 @@
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import Dialect
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.sql import Executable
+from app.infra.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# SQLSTATEs of a missing table or column: the first connection runs before create_all has added them
+UNDEFINED_OBJECTS = {"42P01", "42703"}
+
+class StatementRegistry:
+    """
+    Named statements of the hot read paths, prepared on every pooled connection when it is
+    checked out, so the first request a connection serves does not pay the Parse/Describe round
+    trips (and type introspection) of asyncpg.
+
+    A statement is prepared under the SQL it compiles to, which is the key of the adapter's
+    prepared statement cache (DB_STATEMENT_CACHE_SIZE): registering a representative statement
+    built by the same code as the live query warms that query whatever its parameter values.
+    Statements already in a connection's cache are skipped, so after the first checkout this
+    is a few dict lookups; with the cache disabled (pgbouncer) nothing is prepared.
+
+    Preparing does not plan: the first execution on a new backend still loads the catalog
+    entries of every partition and index the plan touches. Statements registered with
+    `warm_params` are executed once with them right after being prepared; only worth it for
+    cheap ones (a lookup of an id that does not exist).
+    """
+
+    def __init__(self):
+        self._statements: Dict[str, Tuple[Executable, Optional[dict]]] = {}
+        self._compiled: Dict[int, List[Tuple[str, str, Optional[list]]]] = {}
+
+    def register(self, name: str, statement: Executable, warm_params: Optional[dict] = None) -> Executable:
+        self._statements[name] = (statement, warm_params)
+        self._compiled.clear()
+        return statement
+
+    def names(self) -> List[str]:
+        return list(self._statements)
+
+    def compiled(self, dialect: Dialect) -> List[Tuple[str, str, Optional[list]]]:
+        """(name, SQL, positional warm-up arguments or None) of every statement, compiled once per dialect."""
+        key = id(dialect)
+        if key not in self._compiled:
+            compiled = []
+            for name, (statement, warm_params) in self._statements.items():
+                sql = statement.compile(dialect=dialect)
+                args = None
+                if warm_params is not None:
+                    values = sql.construct_params(warm_params)
+                    args = [values[param] for param in sql.positiontup]
+                compiled.append((name, str(sql), args))
+            self._compiled[key] = compiled
+        return self._compiled[key]
+
+    def attach(self, engine: AsyncEngine) -> None:
+        dialect = engine.sync_engine.dialect
+
+        def prepare_on_checkout(dbapi_connection, connection_record, connection_proxy):
+            self.prepare(dbapi_connection, dialect)
+
+        event.listen(engine.sync_engine, "checkout", prepare_on_checkout)
+
+    def prepare(self, dbapi_connection, dialect: Dialect) -> int:
+        """Prepare the statements missing from the connection's cache; returns how many were prepared."""
+        cache = getattr(dbapi_connection, "_prepared_statement_cache", None)
+        if cache is None:
+            return 0
+        prepared = 0
+        for name, sql, args in self.compiled(dialect):
+            if sql in cache:
+                continue
+            try:
+                # The adapter's own prepare: caches the statement under `sql` exactly like an execution would
+                statement, _ = dbapi_connection.await_(dbapi_connection._prepare(sql, dialect._invalidate_schema_cache_asof))
+                if args is not None:
+                    dbapi_connection.await_(statement.fetch(*args))
+                prepared += 1
+            except Exception as e:
+                # Left out of the cache, so it is tried again on the next checkout
+                if getattr(e, "sqlstate", None) not in UNDEFINED_OBJECTS:
+                    logger.warning(f"Could not prepare statement {name}: {e}")
+        return prepared
+
+# Registered by the repositories at import time (see transaction_repo and rollup_repo)
+hot_statements = StatementRegistry()
@@ -0,0 +1,123 @@
+import asyncio
+from contextlib import asynccontextmanager
+from fnmatch import fnmatch
+from typing import Dict, Optional
+import asyncpg
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.exception.transaction_exceptions import QueryTooExpensiveError
+from app.infra.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# SQLSTATE of a statement cancelled by statement_timeout or pg_cancel_backend
+QUERY_CANCELED = "57014"
+
+def parse_budgets(spec: str) -> Dict[str, int]:
+    """'/transactions/filtered/count=3000,/stats/*=10000' -> {route pattern: milliseconds}."""
+    budgets = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        pattern, _, ms = item.rpartition("=")
+        budgets[pattern.strip()] = int(ms)
+    return budgets
+
+def route_key(request: Request) -> str:
+    """Path template of the matched route (e.g. /customers/{customer_id}/transactions), not the raw URL."""
+    route = request.scope.get("route")
+    return getattr(route, "path", request.url.path)
+
+def is_query_canceled(error: BaseException) -> bool:
+    """True when `error` (or what it wraps) is Postgres cancelling the statement."""
+    while error is not None:
+        if isinstance(error, DBAPIError) and getattr(error.orig, "sqlstate", None) == QUERY_CANCELED:
+            return True
+        if isinstance(error, asyncpg.QueryCanceledError):
+            return True
+        error = error.__cause__
+    return False
+
+class QueryBudgets:
+    """
+    Statement timeout of each route and count of the queries cancelled per route and reason
+    ("statement_timeout" or "client_disconnected"), reported by GET /health/query-budgets.
+    """
+
+    def __init__(self, default_ms: int, overrides: Dict[str, int]):
+        self.default_ms = default_ms
+        self.overrides = overrides
+        self.cancelled: Dict[str, Dict[str, int]] = {}
+
+    def budget_for(self, route: str) -> int:
+        """Milliseconds allowed per statement on `route` (first matching override, else the default; 0 = no limit)."""
+        for pattern, ms in self.overrides.items():
+            if fnmatch(route, pattern):
+                return ms
+        return self.default_ms
+
+    def record(self, route: str, reason: str) -> None:
+        counts = self.cancelled.setdefault(route, {"statement_timeout": 0, "client_disconnected": 0})
+        counts[reason] += 1
+
+    def stats(self) -> dict:
+        return {"default_ms": self.default_ms, "overrides": self.overrides, "cancelled": self.cancelled}
+
+class _Budget:
+    """Per-request state: the backend running the session's queries and whether the client went away."""
+
+    def __init__(self):
+        self.pid: Optional[int] = None
+        self.dsn: Optional[str] = None
+        self.disconnected = False
+
+async def _cancel_on_disconnect(request: Request, budget: _Budget, poll_seconds: float) -> None:
+    while not await request.is_disconnected():
+        await asyncio.sleep(poll_seconds)
+    budget.disconnected = True
+    if budget.pid is None:
+        return
+    # From a connection of its own: the pool may be exhausted by exactly this kind of query
+    try:
+        conn = await asyncpg.connect(budget.dsn)
+        try:
+            await conn.execute("SELECT pg_cancel_backend($1)", budget.pid)
+        finally:
+            await conn.close()
+    except Exception as e:
+        logger.warning(f"Could not cancel the query of a disconnected client (pid {budget.pid}): {e}")
+
+@asynccontextmanager
+async def query_budget(request: Request, session: AsyncSession, budgets: QueryBudgets, poll_seconds: float):
+    """
+    Run the route's queries with `SET LOCAL statement_timeout` (re-applied at the start of every
+    transaction of the session) and cancel the running query on the server when the client
+    disconnects. A cancelled query surfaces as QueryTooExpensiveError and is counted.
+    """
+    route = route_key(request)
+    budget_ms = budgets.budget_for(route)
+    if budget_ms <= 0:
+        yield
+        return
+
+    budget = _Budget()
+    budget.dsn = session.bind.url.set(drivername="postgresql").render_as_string(hide_password=False)
+
+    def apply_budget(sync_session, transaction, connection):
+        connection.exec_driver_sql(f"SET LOCAL statement_timeout = {int(budget_ms)}")
+        budget.pid = connection.connection.driver_connection.get_server_pid()
+
+    event.listen(session.sync_session, "after_begin", apply_budget)
+    watcher = asyncio.create_task(_cancel_on_disconnect(request, budget, poll_seconds))
+    try:
+        yield
+    except Exception as e:
+        if not is_query_canceled(e):
+            raise
+        reason = "client_disconnected" if budget.disconnected else "statement_timeout"
+        budgets.record(route, reason)
+        logger.warning(f"Query of {route} cancelled ({reason}, budget {budget_ms} ms)")
+        raise QueryTooExpensiveError(route=route, budget_ms=budget_ms, reason=reason) from e
+    finally:
+        watcher.cancel()
+        event.remove(session.sync_session, "after_begin", apply_budget)
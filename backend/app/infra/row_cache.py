@@ -0,0 +1,71 @@
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, Optional
+
+class RowCache:
+    """
+    Bounded in-process LRU of rows (plain dicts) by key, shared by every request of the process.
+    Writes of this process invalidate the keys they touch; writes of other processes (another
+    worker, a replica catching up) are only seen once an entry is `ttl_seconds` old.
+    A row read while a write was invalidating is not stored: readers take `generation` before
+    querying and `put` drops the row when an invalidation happened meanwhile.
+    max_rows = 0 disables the cache.
+    """
+
+    def __init__(self, max_rows: int, ttl_seconds: float):
+        self.max_rows = max_rows
+        self.ttl_seconds = ttl_seconds
+        self.generation = 0
+        self._rows: "OrderedDict[Hashable, tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_rows > 0
+
+    def get(self, key: Hashable) -> Optional[Dict[str, Any]]:
+        if not self.enabled:
+            return None
+        entry = self._rows.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._rows[key]
+            self._misses += 1
+            return None
+        self._rows.move_to_end(key)
+        self._hits += 1
+        return entry[1]
+
+    def put(self, key: Hashable, row: Dict[str, Any], generation: int) -> None:
+        """Store `row`, read when the cache was at `generation`."""
+        if not self.enabled or generation != self.generation:
+            return
+        self._rows[key] = (time.monotonic() + self.ttl_seconds, row)
+        self._rows.move_to_end(key)
+        while len(self._rows) > self.max_rows:
+            self._rows.popitem(last=False)
+
+    def invalidate(self, keys: Optional[Iterable[Hashable]] = None) -> None:
+        """Drop `keys`, or every row when the written keys are not known (None)."""
+        self.generation += 1
+        self._invalidations += 1
+        if keys is None:
+            self._rows.clear()
+            return
+        for key in keys:
+            self._rows.pop(key, None)
+
+    def stats(self) -> dict:
+        lookups = self._hits + self._misses
+        return {
+            "enabled": self.enabled,
+            "max_rows": self.max_rows,
+            "ttl_seconds": self.ttl_seconds,
+            "rows": len(self._rows),
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+            "invalidations": self._invalidations,
+        }
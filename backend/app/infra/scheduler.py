@@ -0,0 +1,48 @@
+import asyncio
+from typing import Awaitable, Callable, List
+from app.infra.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+class PeriodicScheduler:
+    """
+    Runs background jobs on a fixed interval inside the API event loop.
+    Jobs are started in the FastAPI lifespan and cancelled on shutdown.
+    """
+
+    def __init__(self):
+        self._tasks: List[asyncio.Task] = []
+
+    def add_job(self, name: str, interval_seconds: int, job: Callable[[], Awaitable[object]], run_immediately: bool = True) -> None:
+        """
+        Schedule `job` every `interval_seconds`. A failing run is logged and retried on the next tick.
+        Args:
+            name (str): Name used in logs and as the task name.
+            interval_seconds (int): Delay between two runs; values <= 0 disable the job.
+            job (Callable): Coroutine factory executed on each tick.
+            run_immediately (bool): Run once at startup instead of waiting a full interval.
+        """
+        if interval_seconds <= 0:
+            logger.info(f"Job '{name}' disabled (interval={interval_seconds})")
+            return
+        self._tasks.append(asyncio.create_task(self._loop(name, interval_seconds, job, run_immediately), name=name))
+
+    async def _loop(self, name: str, interval_seconds: int, job: Callable[[], Awaitable[object]], run_immediately: bool):
+        if not run_immediately:
+            await asyncio.sleep(interval_seconds)
+        while True:
+            try:
+                await job()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Job '{name}' failed: {e}", exc_info=True)
+            await asyncio.sleep(interval_seconds)
+
+    async def shutdown(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+
+scheduler = PeriodicScheduler()
@@ -6,13 +6,24 @@ from app.exception.user_exceptions import UserException
 from fastapi import FastAPI, status
 from app.routers.transaction_router import router as transaction_router
 from app.routers.chat_router import router as chat_router
-from app.settings.database import async_engine
+from app.routers.customer_router import router as customer_router
+from app.settings.database import async_engine, read_engine, AsyncSessionLocal, get_read_session_factory, pool_stats, query_budgets
 from pydantic import BaseModel
 from fastapi.middleware.cors import CORSMiddleware
-from app.exception.transaction_exceptions import TransactionsException
-from app.exception.handler import transaction_handler, user_handler
+from app.exception.transaction_exceptions import QueryTooExpensiveError, TransactionsException
+from app.exception.handler import query_budget_handler, transaction_handler, user_handler
 from app.infra.logger import setup_logger
 from app.settings.base import Base
+from app.settings.config import settings
+from app.infra.scheduler import scheduler
+from app.service.partition_service import PartitionService
+from app.repositories.counter_repo import TransactionCounterRepository
+from app.repositories.transaction_repo import transaction_cache
+from app.service.stats_view_service import StatsViewService
+from app.service.suggest_service import FilterSuggestService
+from app.service.retention_service import RetentionService
+from app.service.archive_service import TransactionArchiveService
+from app.service.backfill_service import ColumnBackfillService
 
 logger = setup_logger("main")
 
@@ -25,11 +36,54 @@ async def create_tables():
     async with async_engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
 
+async def init_counters():
+    """Seed transaction_counters with a full count if they were never initialized"""
+    async with AsyncSessionLocal() as session:
+        await TransactionCounterRepository(session).ensure_initialized()
+
+async def maintain_partitions():
+    """Create upcoming monthly partitions of transactions and detach expired ones"""
+    async with AsyncSessionLocal() as session:
+        await PartitionService(session).maintain()
+
+async def refresh_stats_views():
+    """Refresh the dashboard materialized views (STATS_SOURCE=materialized_views)"""
+    await StatsViewService.refresh_with(AsyncSessionLocal)
+
+async def rebuild_suggest_index():
+    """Reload the in-memory filter suggestions from the database (read replica when available)"""
+    await FilterSuggestService.rebuild_with(await get_read_session_factory())
+
+async def purge_expired_transactions():
+    """Delete transactions (and their analysis) older than RETENTION_DAYS"""
+    await RetentionService.purge_with(AsyncSessionLocal)
+
+async def archive_old_transactions():
+    """Move transactions older than ARCHIVE_AFTER_DAYS to the Parquet archive"""
+    await TransactionArchiveService.archive_with(AsyncSessionLocal)
+
+async def backfill_columns():
+    """Fill columns added to existing transactions (typed velocity, usd_rate/amount_usd) in batches"""
+    await ColumnBackfillService.run_with(AsyncSessionLocal)
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await create_tables()
+    await init_counters()
+    scheduler.add_job("partition-maintenance", settings.PARTITION_MAINTENANCE_INTERVAL_SECONDS, maintain_partitions)
+    if StatsViewService.enabled():
+        scheduler.add_job("stats-views-refresh", settings.STATS_VIEWS_REFRESH_INTERVAL_SECONDS, refresh_stats_views, run_immediately=False)
+    scheduler.add_job("suggest-index-rebuild", settings.SUGGEST_INDEX_REBUILD_INTERVAL_SECONDS, rebuild_suggest_index)
+    scheduler.add_job("column-backfill", settings.BACKFILL_INTERVAL_SECONDS, backfill_columns)
+    if settings.RETENTION_DAYS > 0:
+        scheduler.add_job("retention-purge", settings.RETENTION_INTERVAL_SECONDS, purge_expired_transactions)
+    if settings.ARCHIVE_AFTER_DAYS > 0:
+        scheduler.add_job("transaction-archive", settings.ARCHIVE_INTERVAL_SECONDS, archive_old_transactions)
     yield
+    await scheduler.shutdown()
     await async_engine.dispose()
+    if read_engine is not None:
+        await read_engine.dispose()
 
 app = FastAPI(
     title="Credit Card Fraud Detection API",
@@ -52,9 +106,11 @@ app.include_router(user_router)
 app.include_router(auth_router)
 app.include_router(chat_router) 
 app.include_router(stats_router) 
+app.include_router(customer_router)
 
 # Register exception handlers --------------------------------------------------
 app.add_exception_handler(TransactionsException, transaction_handler)
+app.add_exception_handler(QueryTooExpensiveError, query_budget_handler)
 app.add_exception_handler(UserException, user_handler)
 
 @app.get("/")
@@ -83,3 +139,46 @@ def get_health() -> HealthCheck:
     logger.info("Health check endpoint called")
     return HealthCheck(status="OK")
 
+
+@app.get(
+    "/health/db-pool",
+    tags=["healthcheck"],
+    summary="Database connection pool metrics",
+    status_code=status.HTTP_200_OK,
+)
+def get_db_pool_health() -> dict:
+    """
+    ## Database connection pool metrics
+    Live state of the primary (and read replica, if configured) connection pools:
+    checked-out and idle connections, current overflow, checkout wait times,
+    overflow events and checkout timeouts since startup.
+    """
+    return pool_stats()
+
+@app.get(
+    "/health/query-budgets",
+    tags=["healthcheck"],
+    summary="Statement timeouts and cancelled queries per route",
+    status_code=status.HTTP_200_OK,
+)
+def get_query_budgets_health() -> dict:
+    """
+    ## Query budgets
+    Statement timeout of the read-only routes (default and per-route overrides) and the number of
+    queries cancelled per route since startup, by reason: statement_timeout or client_disconnected.
+    """
+    return query_budgets.stats()
+
+@app.get(
+    "/health/row-cache",
+    tags=["healthcheck"],
+    summary="Process-wide cache of transactions by id",
+    status_code=status.HTTP_200_OK,
+)
+def get_row_cache_health() -> dict:
+    """
+    ## Row cache
+    Size, TTL, hits, misses and invalidations since startup of this process's cache of
+    transactions looked up by id (disabled while TRANSACTION_CACHE_ROWS is 0).
+    """
+    return transaction_cache.stats()
@@ -0,0 +1,119 @@
+from typing import List
+from sqlalchemy import BigInteger, Column, DDL, SmallInteger, String, event
+from app.settings.base import Base
+
+# Concurrent writers increment different rows (one per backend pid modulo COUNTER_SHARDS),
+# readers sum all of them
+COUNTER_SHARDS = 16
+
+class TransactionCounter(Base):
+    """
+    Exact row counts of transactions, kept by statement-level triggers on the transactions table.
+    Writes that must not be counted (rows moved between partitions) run with
+    `SET LOCAL app.skip_counters = 'on'`.
+    """
+    __tablename__ = "transaction_counters"
+
+    shard = Column(SmallInteger, primary_key=True)
+    total = Column(BigInteger, nullable=False, default=0)
+    fraud = Column(BigInteger, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<TransactionCounter(shard={self.shard}, total={self.total}, fraud={self.fraud})>"
+
+# Columns of transactions counted per value in dimension_counters (values stored as text)
+DIMENSIONS: List[str] = [
+    "country", "merchant_category", "device", "channel",
+    "high_risk_merchant", "distance_from_home", "weekend_transaction",
+]
+
+class DimensionCounter(Base):
+    """Per-value total and fraud counts of each column in DIMENSIONS, kept by the same kind of triggers."""
+    __tablename__ = "dimension_counters"
+
+    shard = Column(SmallInteger, primary_key=True)
+    dimension = Column(String(50), primary_key=True)
+    value = Column(String(100), primary_key=True)
+    total = Column(BigInteger, nullable=False, default=0)
+    fraud = Column(BigInteger, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<DimensionCounter(dimension={self.dimension}, value={self.value}, total={self.total}, fraud={self.fraud})>"
+
+def dimension_delta_sql(source: str, sign: str = "+") -> str:
+    """
+    One (dimension, value, total, fraud) row per transaction and dimension of `source`,
+    with +1/-1 deltas. Used by the triggers (transition tables) and to subtract detached partitions.
+    """
+    values = ", ".join(f"('{name}', r.{name}::text)" for name in DIMENSIONS)
+    return (
+        f"SELECT d.dimension, d.value, {sign}1 AS total, CASE WHEN r.is_fraud THEN {sign}1 ELSE 0 END AS fraud "
+        f"FROM {source} r CROSS JOIN LATERAL (VALUES {values}) AS d(dimension, value)"
+    )
+
+def dimension_upsert_sql(changes: str, shard: str = f"pg_backend_pid() %% {COUNTER_SHARDS}") -> str:
+    """Aggregate the deltas of `changes` and add them to dimension_counters (in key order, to avoid deadlocks)."""
+    return (
+        f"INSERT INTO dimension_counters AS c (shard, dimension, value, total, fraud) "
+        f"SELECT {shard}, x.dimension, x.value, sum(x.total), sum(x.fraud) "
+        f"FROM ({changes}) x WHERE x.value IS NOT NULL "
+        f"GROUP BY x.dimension, x.value HAVING sum(x.total) <> 0 OR sum(x.fraud) <> 0 "
+        f"ORDER BY x.dimension, x.value "
+        f"ON CONFLICT (shard, dimension, value) DO UPDATE SET total = c.total + EXCLUDED.total, fraud = c.fraud + EXCLUDED.fraud"
+    )
+
+# One function for the three triggers: each statement adds its new rows and subtracts its old rows,
+# in transaction_counters and dimension_counters.
+# '%' is escaped as '%%' because DDL strings go through Python formatting.
+COUNTERS_FUNCTION = DDL(f"""
+CREATE OR REPLACE FUNCTION transaction_counters_apply() RETURNS trigger LANGUAGE plpgsql AS $$
+DECLARE
+    delta_total bigint := 0;
+    delta_fraud bigint := 0;
+BEGIN
+    IF current_setting('app.skip_counters', true) = 'on' THEN
+        RETURN NULL;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        SELECT delta_total + count(*), delta_fraud + count(*) FILTER (WHERE is_fraud)
+        INTO delta_total, delta_fraud FROM new_rows;
+    END IF;
+    IF TG_OP IN ('DELETE', 'UPDATE') THEN
+        SELECT delta_total - count(*), delta_fraud - count(*) FILTER (WHERE is_fraud)
+        INTO delta_total, delta_fraud FROM old_rows;
+    END IF;
+    IF delta_total <> 0 OR delta_fraud <> 0 THEN
+        INSERT INTO transaction_counters AS c (shard, total, fraud)
+        VALUES (pg_backend_pid() %% {COUNTER_SHARDS}, delta_total, delta_fraud)
+        ON CONFLICT (shard) DO UPDATE SET total = c.total + EXCLUDED.total, fraud = c.fraud + EXCLUDED.fraud;
+    END IF;
+    IF TG_OP = 'INSERT' THEN
+        {dimension_upsert_sql(dimension_delta_sql("new_rows", "+"))};
+    ELSIF TG_OP = 'DELETE' THEN
+        {dimension_upsert_sql(dimension_delta_sql("old_rows", "-"))};
+    ELSE
+        {dimension_upsert_sql(dimension_delta_sql("new_rows", "+") + " UNION ALL " + dimension_delta_sql("old_rows", "-"))};
+    END IF;
+    RETURN NULL;
+END $$
+""")
+
+# Transition tables cannot be shared between events, hence one trigger per event
+COUNTERS_TRIGGERS = [
+    DDL(
+        "CREATE OR REPLACE TRIGGER transaction_counters_insert AFTER INSERT ON transactions "
+        "REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION transaction_counters_apply()"
+    ),
+    DDL(
+        "CREATE OR REPLACE TRIGGER transaction_counters_update AFTER UPDATE ON transactions "
+        "REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION transaction_counters_apply()"
+    ),
+    DDL(
+        "CREATE OR REPLACE TRIGGER transaction_counters_delete AFTER DELETE ON transactions "
+        "REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION transaction_counters_apply()"
+    ),
+]
+
+# After the whole metadata is created (both tables exist); idempotent, so it runs on every startup
+for ddl in [COUNTERS_FUNCTION, *COUNTERS_TRIGGERS]:
+    event.listen(Base.metadata, "after_create", ddl)
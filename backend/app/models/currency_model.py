@@ -0,0 +1,65 @@
+from sqlalchemy import Column, DateTime, DDL, Float, String, event, func, select
+from app.settings.base import Base
+from app.schemas.features_schema import DEFAULT_USD_RATE, conversion_rates
+
+class CurrencyRate(Base):
+    """
+    USD rate of a currency from `valid_from` on. A transaction takes the rate in force at its timestamp
+    when it is written (transactions.usd_rate and amount_usd, set by the transactions_usd_amount trigger):
+    adding a version changes the transactions written afterwards, not the amounts already stored.
+    """
+    __tablename__ = "currency_rates"
+
+    currency = Column(String(10), primary_key=True)
+    valid_from = Column(DateTime, primary_key=True)
+    usd_rate = Column(Float, nullable=False)
+
+    def __repr__(self):
+        return f"<CurrencyRate(currency={self.currency}, valid_from={self.valid_from}, usd_rate={self.usd_rate})>"
+
+def usd_rate_sql(currency: str, timestamp: str) -> str:
+    """Rate in force for `currency` at `timestamp` (SQL expressions), DEFAULT_USD_RATE when there is none."""
+    return (
+        f"coalesce((SELECT r.usd_rate FROM currency_rates r WHERE r.currency = {currency} AND r.valid_from <= {timestamp} "
+        f"ORDER BY r.valid_from DESC LIMIT 1), {DEFAULT_USD_RATE})"
+    )
+
+def usd_rate_expression(currency, timestamp):
+    """usd_rate_sql as a SQLAlchemy expression (backfill of rows written before the columns existed)."""
+    rate = (
+        select(CurrencyRate.usd_rate)
+        .where(CurrencyRate.currency == currency, CurrencyRate.valid_from <= timestamp)
+        .order_by(CurrencyRate.valid_from.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+    return func.coalesce(rate, DEFAULT_USD_RATE)
+
+# First version of every rate: the table the model features were built with, in force since always.
+# ON CONFLICT: runs on every startup without overwriting rates changed since.
+RATES_SEED = DDL(
+    "INSERT INTO currency_rates (currency, valid_from, usd_rate) VALUES "
+    + ", ".join(f"('{currency}', '-infinity', {rate})" for currency, rate in conversion_rates.items())
+    + " ON CONFLICT DO NOTHING"
+)
+
+# Row-level BEFORE trigger: the rate is looked up once, when the row is written (or its currency or
+# timestamp change); a row that already carries one (moved between partitions) keeps it.
+USD_AMOUNT_FUNCTION = DDL(f"""
+CREATE OR REPLACE FUNCTION transactions_usd_amount() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF NEW.usd_rate IS NULL OR (TG_OP = 'UPDATE' AND (NEW.currency IS DISTINCT FROM OLD.currency OR NEW.timestamp IS DISTINCT FROM OLD.timestamp)) THEN
+        NEW.usd_rate := {usd_rate_sql("NEW.currency", "NEW.timestamp")};
+    END IF;
+    NEW.amount_usd := NEW.amount * NEW.usd_rate;
+    RETURN NEW;
+END $$
+""")
+
+USD_AMOUNT_TRIGGER = DDL(
+    "CREATE OR REPLACE TRIGGER transactions_usd_amount BEFORE INSERT OR UPDATE OF amount, currency, timestamp "
+    "ON transactions FOR EACH ROW EXECUTE FUNCTION transactions_usd_amount()"
+)
+
+for ddl in [RATES_SEED, USD_AMOUNT_FUNCTION, USD_AMOUNT_TRIGGER]:
+    event.listen(Base.metadata, "after_create", ddl)
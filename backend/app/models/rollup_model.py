@@ -0,0 +1,113 @@
+from typing import List
+from sqlalchemy import BigInteger, Column, DateTime, DDL, Identity, Integer, String, event
+from app.settings.base import Base
+
+# Columns of transactions the rollup is broken down by (the filters of /stats/timeseries). Kept to a few
+# low-cardinality columns: every extra one multiplies the number of rows per hour.
+ROLLUP_DIMENSIONS: List[str] = ["country", "merchant_category", "channel", "high_risk_merchant"]
+
+# Code stored for a NULL value (real codes start at 1)
+NULL_CODE = 0
+
+class RollupCode(Base):
+    """Integer code of every (dimension, value) of ROLLUP_DIMENSIONS; values stored as text like in dimension_counters."""
+    __tablename__ = "rollup_codes"
+
+    dimension = Column(String(50), primary_key=True)
+    value = Column(String(100), primary_key=True)
+    code = Column(Integer, Identity(), nullable=False, unique=True)
+
+    def __repr__(self):
+        return f"<RollupCode(dimension={self.dimension}, value={self.value}, code={self.code})>"
+
+class HourlyRollup(Base):
+    """
+    Transaction and fraud counts per hour (bucket_start) and combination of dimension codes,
+    kept by statement-level triggers on transactions like transaction_counters. Coarser
+    buckets are sums of these rows; a time series never has to read transactions.
+    """
+    __tablename__ = "hourly_rollup"
+
+    bucket_start = Column(DateTime, primary_key=True)
+    country = Column(Integer, primary_key=True)
+    merchant_category = Column(Integer, primary_key=True)
+    channel = Column(Integer, primary_key=True)
+    high_risk_merchant = Column(Integer, primary_key=True)
+    total = Column(BigInteger, nullable=False, default=0)
+    fraud = Column(BigInteger, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<HourlyRollup(bucket_start={self.bucket_start}, total={self.total}, fraud={self.fraud})>"
+
+def rollup_codes_sql(source: str) -> str:
+    """Register the values of `source` that have no code yet (checked first, so no identity value is burned)."""
+    values = ", ".join(f"('{name}', r.{name}::text)" for name in ROLLUP_DIMENSIONS)
+    return (
+        f"INSERT INTO rollup_codes (dimension, value) "
+        f"SELECT DISTINCT d.dimension, d.value FROM {source} r CROSS JOIN LATERAL (VALUES {values}) AS d(dimension, value) "
+        f"WHERE d.value IS NOT NULL AND NOT EXISTS "
+        f"(SELECT 1 FROM rollup_codes c WHERE c.dimension = d.dimension AND c.value = d.value) "
+        f"ORDER BY 1, 2 ON CONFLICT DO NOTHING"
+    )
+
+def rollup_delta_sql(source: str, sign: str = "+") -> str:
+    """One (bucket_start, codes..., total, fraud) row per transaction of `source`, with +1/-1 deltas."""
+    codes = ", ".join(f"coalesce(c_{name}.code, {NULL_CODE}) AS {name}" for name in ROLLUP_DIMENSIONS)
+    joins = " ".join(
+        f"LEFT JOIN rollup_codes c_{name} ON c_{name}.dimension = '{name}' AND c_{name}.value = r.{name}::text"
+        for name in ROLLUP_DIMENSIONS
+    )
+    return (
+        f"SELECT date_trunc('hour', r.timestamp) AS bucket_start, {codes}, "
+        f"{sign}1 AS total, CASE WHEN r.is_fraud THEN {sign}1 ELSE 0 END AS fraud FROM {source} r {joins}"
+    )
+
+def rollup_upsert_sql(changes: str) -> str:
+    """Aggregate the deltas of `changes` and add them to hourly_rollup (in key order, to avoid deadlocks)."""
+    key = ", ".join(["bucket_start", *ROLLUP_DIMENSIONS])
+    selected = ", ".join(f"x.{name}" for name in ["bucket_start", *ROLLUP_DIMENSIONS])
+    return (
+        f"INSERT INTO hourly_rollup AS h ({key}, total, fraud) "
+        f"SELECT {selected}, sum(x.total), sum(x.fraud) FROM ({changes}) x "
+        f"GROUP BY {selected} HAVING sum(x.total) <> 0 OR sum(x.fraud) <> 0 ORDER BY {selected} "
+        f"ON CONFLICT ({key}) DO UPDATE SET total = h.total + EXCLUDED.total, fraud = h.fraud + EXCLUDED.fraud"
+    )
+
+# Same contract as transaction_counters_apply (app/models/counter_model.py): new rows are added, old rows
+# subtracted, and writes that only move rows between partitions (app.skip_counters) are ignored.
+ROLLUP_FUNCTION = DDL(f"""
+CREATE OR REPLACE FUNCTION hourly_rollup_apply() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF current_setting('app.skip_counters', true) = 'on' THEN
+        RETURN NULL;
+    END IF;
+    IF TG_OP = 'INSERT' THEN
+        {rollup_codes_sql("new_rows")};
+        {rollup_upsert_sql(rollup_delta_sql("new_rows", "+"))};
+    ELSIF TG_OP = 'DELETE' THEN
+        {rollup_upsert_sql(rollup_delta_sql("old_rows", "-"))};
+    ELSE
+        {rollup_codes_sql("new_rows")};
+        {rollup_upsert_sql(rollup_delta_sql("new_rows", "+") + " UNION ALL " + rollup_delta_sql("old_rows", "-"))};
+    END IF;
+    RETURN NULL;
+END $$
+""")
+
+ROLLUP_TRIGGERS = [
+    DDL(
+        "CREATE OR REPLACE TRIGGER hourly_rollup_insert AFTER INSERT ON transactions "
+        "REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION hourly_rollup_apply()"
+    ),
+    DDL(
+        "CREATE OR REPLACE TRIGGER hourly_rollup_update AFTER UPDATE ON transactions "
+        "REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION hourly_rollup_apply()"
+    ),
+    DDL(
+        "CREATE OR REPLACE TRIGGER hourly_rollup_delete AFTER DELETE ON transactions "
+        "REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION hourly_rollup_apply()"
+    ),
+]
+
+for ddl in [ROLLUP_FUNCTION, *ROLLUP_TRIGGERS]:
+    event.listen(Base.metadata, "after_create", ddl)
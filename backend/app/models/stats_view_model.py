@@ -0,0 +1,36 @@
+from typing import List
+from sqlalchemy import DDL, event
+from app.settings.base import Base
+from app.settings.config import settings
+from app.models.counter_model import dimension_delta_sql
+
+# Materialized views behind /stats/overview and /stats/geral_stats when STATS_SOURCE=materialized_views.
+# Each has a unique index, required by REFRESH MATERIALIZED VIEW CONCURRENTLY (readers are never blocked).
+# The hourly histogram is read from hourly_rollup whatever the source, over the same window.
+DIMENSION_VIEW = "stats_dimension_mv"
+GENERAL_VIEW = "stats_general_mv"
+STATS_VIEWS: List[str] = [DIMENSION_VIEW, GENERAL_VIEW]
+
+STATS_VIEWS_DDL = [
+    DDL(f"""
+    CREATE MATERIALIZED VIEW IF NOT EXISTS {DIMENSION_VIEW} AS
+    SELECT x.dimension, x.value, sum(x.total)::bigint AS total, sum(x.fraud)::bigint AS fraud
+    FROM ({dimension_delta_sql("transactions")}) x
+    WHERE x.value IS NOT NULL
+    GROUP BY x.dimension, x.value
+    """),
+    DDL(f"CREATE UNIQUE INDEX IF NOT EXISTS {DIMENSION_VIEW}_key ON {DIMENSION_VIEW} (dimension, value)"),
+    DDL(f"""
+    CREATE MATERIALIZED VIEW IF NOT EXISTS {GENERAL_VIEW} AS
+    SELECT 1 AS id, count(*) AS total, count(*) FILTER (WHERE is_fraud) AS fraud,
+           max(amount_usd) AS max_amount, min(amount_usd) AS min_amount, avg(amount_usd) AS avg_amount
+    FROM transactions
+    """),
+    DDL(f"CREATE UNIQUE INDEX IF NOT EXISTS {GENERAL_VIEW}_key ON {GENERAL_VIEW} (id)"),
+]
+
+def _views_enabled(*args, **kwargs) -> bool:
+    return settings.STATS_SOURCE == "materialized_views"
+
+for ddl in STATS_VIEWS_DDL:
+    event.listen(Base.metadata, "after_create", ddl.execute_if(callable_=_views_enabled))
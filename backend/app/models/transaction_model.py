@@ -1,16 +1,26 @@
-from typing import List
-from sqlalchemy import Column, Integer, Float, Boolean, DateTime, String
+from typing import Dict, List, Optional
+from sqlalchemy import Column, Computed, Integer, Float, Boolean, DateTime, String, DDL, FetchedValue, Numeric, case, event, func
 from app.settings.base import Base
+from app.models.currency_model import CurrencyRate  # noqa: F401  (rates read by the transactions_usd_amount trigger)
+from app.schemas.features_schema import BUSINESS_HOURS, HIGH_AMOUNT_USD, HIGH_RISK_COUNTRIES, LOW_AMOUNT_USD, SUSPICIOUS_DEVICES
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 
+def _sql_in(column: str, values: List[str]) -> str:
+    quoted = ", ".join("'" + value + "'" for value in values)
+    return f"{column} IN ({quoted})"
+
 class Transaction(Base):
     __tablename__ = "transactions"
+    # Range partitioned by month on timestamp; the partition key has to be part of the primary key.
+    # Monthly partitions are created/detached by PartitionService (see app/service/partition_service.py).
+    __table_args__ = {"postgresql_partition_by": "RANGE (timestamp)"}
 
     transaction_id = Column(String, primary_key=True, index=True)
     customer_id = Column(String, nullable=False)
     card_number = Column(String(32), nullable=False)
-    timestamp = Column(DateTime, nullable=False)
+    timestamp = Column(DateTime, primary_key=True, nullable=False, index=True)
     merchant_category = Column(String(100), nullable=True)
     merchant_type = Column(String(100), nullable=True)
     merchant = Column(String(100), nullable=True)
@@ -31,13 +41,193 @@ class Transaction(Base):
     weekend_transaction = Column(Boolean, default=False)
     velocity_last_hour = Column(JSONB, nullable=True)
     is_fraud = Column(Boolean, default=False)
+    # Typed copies of velocity_last_hour (see VELOCITY_COLUMNS): filtered and read without decoding the JSON
+    velocity_num_transactions = Column(Integer, nullable=True)
+    velocity_total_amount = Column(Float, nullable=True)
+    velocity_unique_merchants = Column(Integer, nullable=True)
+    velocity_unique_countries = Column(Integer, nullable=True)
+    velocity_max_single_amount = Column(Float, nullable=True)
+    # Set by the transactions_usd_amount trigger from currency_rates (see app/models/currency_model.py)
+    usd_rate = Column(Float, nullable=True, server_default=FetchedValue(), server_onupdate=FetchedValue())
+    amount_usd = Column(Float, nullable=True, index=True, server_default=FetchedValue(), server_onupdate=FetchedValue())
+    # Derived model features (TransactionService.extract_features), generated by Postgres when the row is written;
+    # NULL while a column they depend on is (rows the backfills have not reached yet)
+    is_off_hours = Column(Boolean, Computed(f"transaction_hour < {BUSINESS_HOURS[0]} OR transaction_hour > {BUSINESS_HOURS[1]}", persisted=True))
+    is_high_amount = Column(Boolean, Computed(f"amount_usd > {HIGH_AMOUNT_USD}", persisted=True))
+    is_low_amount = Column(Boolean, Computed(f"amount_usd < {LOW_AMOUNT_USD}", persisted=True))
+    suspicious_device = Column(Boolean, Computed(_sql_in("device", SUSPICIOUS_DEVICES), persisted=True))
+    high_risk_transaction = Column(
+        Boolean, Computed(f"{_sql_in('country', HIGH_RISK_COUNTRIES)} AND {_sql_in('device', SUSPICIOUS_DEVICES)}", persisted=True)
+    )
+    velocity_total_amount_usd = Column(Float, Computed("velocity_total_amount * usd_rate", persisted=True))
+    velocity_max_single_amount_usd = Column(Float, Computed("velocity_max_single_amount * usd_rate", persisted=True))
 
-    analysis = relationship("Analysis", back_populates="transaction")
+    # No FK from analysis: a foreign key to a partitioned table would have to include timestamp
+    analysis = relationship(
+        "Analysis",
+        back_populates="transaction",
+        primaryjoin="Transaction.transaction_id == foreign(Analysis.transaction_id)",
+    )
 
     def __repr__(self):
         return f"<Transaction(transaction_id={self.transaction_id}, amount={self.amount}, is_fraud={self.is_fraud}), customer_id={self.customer_id}, merchant={self.merchant}, timestamp={self.timestamp}, country={self.country}, city={self.city}, card_type={self.card_type}, channel={self.channel}, device={self.device}), card_present={self.card_present}, high_risk_merchant={self.high_risk_merchant}, weekend_transaction={self.weekend_transaction}, transaction_hour={self.transaction_hour}, distance_from_home={self.distance_from_home}, velocity_last_hour={self.velocity_last_hour}, currency={self.currency}, merchant_category={self.merchant_category}, merchant_type={self.merchant_type}, ip_address={self.ip_address}, device_fingerprint={self.device_fingerprint}, card_number={self.card_number}"
 
 
+# Rows outside every monthly partition land here instead of failing the insert;
+# PartitionService moves them into a proper partition when it creates one.
+event.listen(
+    Transaction.__table__,
+    "after_create",
+    DDL("CREATE TABLE IF NOT EXISTS transactions_default PARTITION OF transactions DEFAULT"),
+)
+
+# transaction_id identifies a transaction on its own, but a unique index of a partitioned table must
+# contain the partition key, so no constraint can enforce it. Every writer of new rows does instead:
+# it takes this transaction-level advisory lock, then inserts only ids that do not exist yet. Writers
+# of new rows are serialized from the lock to their commit (a bulk chunk's COPY into staging is not).
+# Always taken after LOCK TABLE transactions IN ROW EXCLUSIVE MODE: a writer holding the advisory lock
+# and queued for the table lock behind a partition creation would otherwise deadlock with another.
+NEW_IDS_LOCK_KEY = 734_026
+NEW_IDS_LOCK_SQL = f"SELECT pg_advisory_xact_lock({NEW_IDS_LOCK_KEY})"
+
+def insert_new_ids_sql(source: str, columns: List[str]) -> str:
+    """
+    INSERT into transactions of the rows of `source` (one per transaction_id) whose id is not there yet,
+    under any timestamp. Run after NEW_IDS_LOCK_SQL, in the same transaction.
+    """
+    column_list = ", ".join(columns)
+    return (
+        f"INSERT INTO transactions ({column_list}) SELECT {column_list} FROM {source} s "
+        f"WHERE NOT EXISTS (SELECT 1 FROM transactions t WHERE t.transaction_id = s.transaction_id) "
+        f"ON CONFLICT DO NOTHING"
+    )
+
+# velocity_last_hour key -> typed column holding it
+VELOCITY_COLUMNS: Dict[str, str] = {
+    "num_transactions": "velocity_num_transactions",
+    "total_amount": "velocity_total_amount",
+    "unique_merchants": "velocity_unique_merchants",
+    "unique_countries": "velocity_unique_countries",
+    "max_single_amount": "velocity_max_single_amount",
+}
+
+# (JSON key, column, whether it holds an integer)
+_VELOCITY_FIELDS = [
+    (key, name, isinstance(Transaction.__table__.c[name].type, Integer)) for key, name in VELOCITY_COLUMNS.items()
+]
+
+def velocity_columns_from(velocity: Optional[dict], keys: bool = False) -> dict:
+    """
+    Typed velocity values of a velocity_last_hour dict, keyed by column (by JSON key with `keys`).
+    A missing or non-numeric entry counts as 0, as it did for the model features; no dict -> all None.
+    """
+    if velocity is None:
+        return {key if keys else name: None for key, name, _ in _VELOCITY_FIELDS}
+    if not isinstance(velocity, dict):
+        velocity = {}
+    values = {}
+    for key, name, integer in _VELOCITY_FIELDS:
+        value = velocity.get(key)
+        if not isinstance(value, (int, float)) or isinstance(value, bool):
+            value = 0
+        values[key if keys else name] = round(value) if integer else float(value)
+    return values
+
+def velocity_of(record) -> Optional[Dict[str, float]]:
+    """
+    velocity_last_hour of a Transaction or of a row with the typed velocity columns, read from those
+    columns; from the JSON (if loaded) for a row the backfill has not reached yet.
+    """
+    if getattr(record, "velocity_num_transactions", None) is None:
+        velocity = getattr(record, "velocity_last_hour", None)
+        return velocity_columns_from(velocity, keys=True) if velocity is not None else None
+    return {key: getattr(record, name) for key, name in VELOCITY_COLUMNS.items()}
+
+def velocity_column_expressions() -> dict:
+    """velocity_columns_from in SQL, over the velocity_last_hour column (backfill and read fallback)."""
+    expressions = {}
+    for key, name in VELOCITY_COLUMNS.items():
+        entry = Transaction.velocity_last_hour[key]
+        number = case((func.jsonb_typeof(entry) == "number", entry.astext.cast(Numeric)), else_=0)
+        column_type = Transaction.__table__.c[name].type
+        if isinstance(column_type, Integer):
+            number = func.round(number)
+        expressions[name] = case((Transaction.velocity_last_hour.is_(None), None), else_=number.cast(column_type))
+    return expressions
+
+def _column_definition(name: str) -> str:
+    column = Transaction.__table__.c[name]
+    definition = f"{name} {column.type.compile(dialect=postgresql.dialect())}"
+    if column.computed is not None:
+        definition += f" GENERATED ALWAYS AS ({column.computed.sqltext}) STORED"
+    return definition
+
+def add_columns_ddl(names: List[str]) -> DDL:
+    """
+    ALTER TABLE transactions ADD COLUMN for databases created before `names` were in the model.
+    Checked first, so a restart of an up-to-date database takes no lock on transactions.
+    Plain columns are added empty; generated ones are computed for every row (one rewrite of the table).
+    """
+    additions = ", ".join(f"ADD COLUMN IF NOT EXISTS {_column_definition(name)}" for name in names)
+    return DDL(f"""
+DO $$ BEGIN
+    IF EXISTS (
+        SELECT 1 FROM unnest(ARRAY[{", ".join(f"'{name}'" for name in names)}]) AS wanted(name)
+        WHERE NOT EXISTS (
+            SELECT 1 FROM information_schema.columns
+            WHERE table_schema = current_schema() AND table_name = 'transactions' AND column_name = wanted.name
+        )
+    ) THEN
+        ALTER TABLE transactions {additions};
+    END IF;
+END $$
+""")
+
+# Columns set by the transactions_usd_amount trigger: not loaded by ingest, never written by the API
+USD_COLUMNS: List[str] = ["usd_rate", "amount_usd"]
+
+# Added empty (no table rewrite) and filled by the backfill job (app/service/backfill_service.py)
+event.listen(Base.metadata, "after_create", add_columns_ddl(list(VELOCITY_COLUMNS.values())))
+event.listen(Base.metadata, "after_create", add_columns_ddl(USD_COLUMNS))
+event.listen(Base.metadata, "after_create", DDL("CREATE INDEX IF NOT EXISTS ix_transactions_amount_usd ON transactions (amount_usd)"))
+# Rows the backfill has still to fill (see BACKFILLS): empty once it is done, so checking for
+# rows written without the columns since (by an older loader, say) is an index probe, not a scan
+event.listen(
+    Base.metadata,
+    "after_create",
+    DDL(
+        "CREATE INDEX IF NOT EXISTS ix_transactions_velocity_pending ON transactions (transaction_id) "
+        "WHERE velocity_num_transactions IS NULL AND velocity_last_hour IS NOT NULL"
+    ),
+)
+event.listen(
+    Base.metadata,
+    "after_create",
+    DDL("CREATE INDEX IF NOT EXISTS ix_transactions_usd_pending ON transactions (transaction_id) WHERE usd_rate IS NULL"),
+)
+
+# Generated from the columns above, so added after them
+GENERATED_COLUMNS: List[str] = [c.name for c in Transaction.__table__.columns if c.computed is not None]
+event.listen(Base.metadata, "after_create", add_columns_ddl(GENERATED_COLUMNS))
+# The only flag selective enough for an index to beat a scan; the others hold for a large share of rows
+event.listen(
+    Base.metadata,
+    "after_create",
+    DDL("CREATE INDEX IF NOT EXISTS ix_transactions_high_risk ON transactions (timestamp) WHERE high_risk_transaction"),
+)
+
+# Customer timeline (GET /customers/{customer_id}/transactions): keyset order of the pages plus the columns
+# of the per-customer aggregates, so the aggregates are an index-only scan and a page touches only its rows.
+# IF NOT EXISTS on metadata create: also added to databases created before it (propagated to every partition).
+event.listen(
+    Base.metadata,
+    "after_create",
+    DDL(
+        "CREATE INDEX IF NOT EXISTS ix_transactions_customer_timeline "
+        "ON transactions (customer_id, timestamp DESC, transaction_id DESC) INCLUDE (amount_usd, is_fraud)"
+    ),
+)
+
 # Ordem EXATA das features (usa estes nomes como colunas no DataFrame)
 FEATURE_COLUMNS: List[str] = [
     "channel_medium","device_Android App","device_Safari","device_Firefox",
@@ -51,3 +241,18 @@ FEATURE_COLUMNS: List[str] = [
     "distance_from_home",
 ]
 
+# Boolean generated columns, filterable like the stored flags (high_risk_merchant, ...)
+FEATURE_FLAGS: List[str] = ["is_off_hours", "is_high_amount", "is_low_amount", "suspicious_device", "high_risk_transaction"]
+
+# Features read from the generated columns of a stored transaction (feature -> column), not recomputed
+STORED_FEATURES: Dict[str, str] = {
+    "USD_converted_amount": "amount_usd",
+    "USD_converted_total_amount": "velocity_total_amount_usd",
+    "max_single_amount": "velocity_max_single_amount_usd",
+    "is_off_hours": "is_off_hours",
+    "is_high_amount": "is_high_amount",
+    "is_low_amount": "is_low_amount",
+    "suspicious_device": "suspicious_device",
+    "high_risk_transaction": "high_risk_transaction",
+}
+
@@ -62,9 +62,14 @@ class Analysis(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    transaction_id = Column(String, ForeignKey("transactions.transaction_id"), nullable=False)
+    # Plain column (no FK): transactions is partitioned and its key is (transaction_id, timestamp)
+    transaction_id = Column(String, nullable=False, index=True)
     created_at = Column(DateTime, server_default=func.now())
     analysis_content = Column(JSON, nullable=True)  
 
     user = relationship("User", back_populates="analysis")
-    transaction = relationship("Transaction", back_populates="analysis")
+    transaction = relationship(
+        "Transaction",
+        back_populates="analysis",
+        primaryjoin="foreign(Analysis.transaction_id) == Transaction.transaction_id",
+    )
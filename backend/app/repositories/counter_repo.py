@@ -0,0 +1,107 @@
+from sqlalchemy import func, select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import SQLAlchemyError
+from app.models.counter_model import DimensionCounter, TransactionCounter, dimension_delta_sql, dimension_upsert_sql
+from app.models.transaction_model import Transaction
+from app.repositories.rollup_repo import RollupRepository
+from app.exception.transaction_exceptions import DatabaseException
+from app.infra.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+class TransactionCounterRepository:
+    """
+    Reads and maintains the sharded transaction_counters and dimension_counters tables (see app/models/counter_model.py).
+    Subtracting, reconciling and seeding also cover hourly_rollup, which is kept by the same kind of triggers.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.rollup = RollupRepository(db)
+
+    async def get_totals(self) -> dict[str, int]:
+        """Exact total and fraud counts in O(shards), whatever the size of transactions."""
+        try:
+            stmt = select(
+                func.coalesce(func.sum(TransactionCounter.total), 0),
+                func.coalesce(func.sum(TransactionCounter.fraud), 0),
+            )
+            total, frauds = (await self.db.execute(stmt)).one()
+            return {"total_transactions": int(total), "fraud_transactions": int(frauds)}
+        except SQLAlchemyError as e:
+            logger.error(f"Erro ao ler contadores de transações: {e}")
+            raise DatabaseException("Error accessing the database") from e
+
+    async def get_dimension_totals(self) -> dict[str, dict[str, dict[str, int]]]:
+        """{dimension: {value (as text): {"total_transactions", "fraud_transactions"}}} for every DIMENSIONS column."""
+        try:
+            stmt = (
+                select(
+                    DimensionCounter.dimension,
+                    DimensionCounter.value,
+                    func.sum(DimensionCounter.total),
+                    func.sum(DimensionCounter.fraud),
+                )
+                .group_by(DimensionCounter.dimension, DimensionCounter.value)
+                .having(func.sum(DimensionCounter.total) > 0)
+                .order_by(DimensionCounter.dimension, DimensionCounter.value)
+            )
+            totals: dict[str, dict[str, dict[str, int]]] = {}
+            for dimension, value, total, frauds in (await self.db.execute(stmt)).all():
+                totals.setdefault(dimension, {})[value] = {"total_transactions": int(total), "fraud_transactions": int(frauds)}
+            return totals
+        except SQLAlchemyError as e:
+            logger.error(f"Erro ao ler contadores por dimensão: {e}")
+            raise DatabaseException("Error accessing the database") from e
+
+    async def subtract_table(self, table: str) -> None:
+        """
+        Remove the rows of `table` (e.g. a partition that was just detached, which fires no trigger)
+        from both counters. Runs in the caller's transaction; does not commit.
+        """
+        stmt = text(f"SELECT count(*), count(*) FILTER (WHERE is_fraud) FROM {table}")
+        total, frauds = (await self.db.execute(stmt)).one()
+        upsert = insert(TransactionCounter).values(shard=0, total=-total, fraud=-frauds)
+        upsert = upsert.on_conflict_do_update(
+            index_elements=[TransactionCounter.shard],
+            set_={"total": TransactionCounter.total + upsert.excluded.total, "fraud": TransactionCounter.fraud + upsert.excluded.fraud},
+        )
+        await self.db.execute(upsert)
+        await self.db.execute(text(dimension_upsert_sql(dimension_delta_sql(table, "-"), shard="0")))
+        await self.rollup.subtract_table(table)
+
+    async def skip_counting(self) -> None:
+        """Writes of the current transaction are not counted by the triggers (rows moved, not added)."""
+        await self.db.execute(text("SET LOCAL app.skip_counters = 'on'"))
+
+    async def reconcile(self) -> dict[str, int]:
+        """
+        Recount transactions and reset the counters to the exact values. Writes to transactions
+        are blocked (SHARE lock) for the duration of the count.
+        """
+        try:
+            await self.db.execute(text(f"LOCK TABLE {Transaction.__tablename__} IN SHARE MODE"))
+            count_stmt = select(
+                func.count(Transaction.transaction_id),
+                func.count(Transaction.transaction_id).filter(Transaction.is_fraud == True),
+            )
+            total, frauds = (await self.db.execute(count_stmt)).one()
+            await self.db.execute(TransactionCounter.__table__.delete())
+            await self.db.execute(insert(TransactionCounter).values(shard=0, total=total, fraud=frauds))
+            await self.db.execute(DimensionCounter.__table__.delete())
+            await self.db.execute(text(dimension_upsert_sql(dimension_delta_sql(Transaction.__tablename__), shard="0")))
+            await self.rollup.rebuild()
+            await self.db.commit()
+            logger.info(f"Transaction counters reconciled: total={total} fraud={frauds}")
+            return {"total_transactions": total, "fraud_transactions": frauds}
+        except SQLAlchemyError as e:
+            await self.db.rollback()
+            logger.error(f"Erro ao reconciliar contadores de transações: {e}")
+            raise DatabaseException("Error reconciling transaction counters") from e
+
+    async def ensure_initialized(self) -> None:
+        """Seed the counters from a full count the first time (e.g. on a database that predates them)."""
+        initialized = (await self.db.execute(select(TransactionCounter.shard).limit(1))).first() is not None
+        if not initialized:
+            await self.reconcile()
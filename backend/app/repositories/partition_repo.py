@@ -0,0 +1,140 @@
+from datetime import date
+from typing import List
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import SQLAlchemyError
+from app.models.transaction_model import Transaction
+from app.repositories.counter_repo import TransactionCounterRepository
+from app.repositories.transaction_repo import transaction_cache
+from app.exception.transaction_exceptions import DatabaseException
+from app.infra.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+PARENT_TABLE = Transaction.__tablename__
+DEFAULT_PARTITION = f"{PARENT_TABLE}_default"
+
+class PartitionRepository:
+    """
+    DDL helpers for the monthly partitions of the transactions table.
+    Partition names and bounds are generated by PartitionService, never taken from user input.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.counters = TransactionCounterRepository(db)
+
+    async def is_partitioned(self) -> bool:
+        stmt = text("SELECT relkind = 'p' FROM pg_class WHERE oid = to_regclass(:name)")
+        result = await self.db.execute(stmt, {"name": PARENT_TABLE})
+        return bool(result.scalar())
+
+    async def list_partitions(self) -> List[str]:
+        try:
+            stmt = text("""
+                SELECT child.relname
+                FROM pg_inherits
+                JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+                WHERE pg_inherits.inhparent = to_regclass(:parent)
+                ORDER BY child.relname
+            """)
+            result = await self.db.execute(stmt, {"parent": PARENT_TABLE})
+            return [row[0] for row in result.all()]
+        except SQLAlchemyError as e:
+            logger.error(f"Erro ao listar partições: {e}")
+            raise DatabaseException("Error accessing the database") from e
+
+    async def list_detached_partitions(self) -> List[str]:
+        """Monthly tables left behind by detach_partition (no longer attached to the parent)."""
+        try:
+            stmt = text("""
+                SELECT relname FROM pg_class
+                WHERE relkind = 'r' AND NOT relispartition AND relname ~ :pattern
+                ORDER BY relname
+            """)
+            result = await self.db.execute(stmt, {"pattern": f"^{PARENT_TABLE}_p[0-9]{{4}}_[0-9]{{2}}$"})
+            return [row[0] for row in result.all()]
+        except SQLAlchemyError as e:
+            logger.error(f"Erro ao listar partições desanexadas: {e}")
+            raise DatabaseException("Error accessing the database") from e
+
+    async def ensure_default_partition(self) -> None:
+        await self.db.execute(text(f"CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION} PARTITION OF {PARENT_TABLE} DEFAULT"))
+        await self.db.commit()
+
+    async def create_partition(self, name: str, start: date, end: date) -> None:
+        """
+        Create the partition [start, end). Rows that were already routed to the default
+        partition for that range are moved into the new partition in the same transaction.
+        """
+        bounds = f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+        try:
+            # Serialize partition creators before touching the default partition: otherwise one holds a
+            # lock on the default while waiting for the parent, and the other the reverse (deadlock)
+            await self.db.execute(text(f"LOCK TABLE {PARENT_TABLE} IN SHARE ROW EXCLUSIVE MODE"))
+            stmt = text(f"SELECT EXISTS (SELECT 1 FROM {DEFAULT_PARTITION} WHERE timestamp >= :start AND timestamp < :end)")
+            has_stray_rows = (await self.db.execute(stmt, {"start": start, "end": end})).scalar()
+
+            if not has_stray_rows:
+                await self.db.execute(text(f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {PARENT_TABLE} {bounds}"))
+            else:
+                logger.info(f"Moving rows from {DEFAULT_PARTITION} into new partition {name}")
+                columns = ", ".join(c.name for c in Transaction.__table__.columns if c.computed is None)
+                await self.db.execute(text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {DEFAULT_PARTITION}"))
+                await self.db.execute(text(f"CREATE TABLE {name} PARTITION OF {PARENT_TABLE} {bounds}"))
+                # Moved rows are already counted in transaction_counters
+                await self.counters.skip_counting()
+                await self.db.execute(
+                    text(f"INSERT INTO {PARENT_TABLE} ({columns}) SELECT {columns} FROM {DEFAULT_PARTITION} WHERE timestamp >= :start AND timestamp < :end"),
+                    {"start": start, "end": end},
+                )
+                await self.db.execute(
+                    text(f"DELETE FROM {DEFAULT_PARTITION} WHERE timestamp >= :start AND timestamp < :end"),
+                    {"start": start, "end": end},
+                )
+                await self.db.execute(text(f"ALTER TABLE {PARENT_TABLE} ATTACH PARTITION {DEFAULT_PARTITION} DEFAULT"))
+            await self.db.commit()
+        except SQLAlchemyError as e:
+            await self.db.rollback()
+            logger.error(f"Erro ao criar partição {name}: {e}")
+            raise DatabaseException("Error creating transactions partition") from e
+
+    async def detach_partition(self, name: str) -> None:
+        """Detach a partition; its table (and data) stays around for archival."""
+        try:
+            await self.db.execute(text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {name}"))
+            # Detaching fires no delete trigger, the rows leave the counters here
+            await self.counters.subtract_table(name)
+            await self.db.commit()
+            # Its rows are no longer transactions: nothing cached may outlive them
+            transaction_cache.invalidate()
+        except SQLAlchemyError as e:
+            await self.db.rollback()
+            logger.error(f"Erro ao desanexar partição {name}: {e}")
+            raise DatabaseException("Error detaching transactions partition") from e
+
+    async def delete_analysis_batch(self, name: str, batch_rows: int) -> int:
+        """Delete up to `batch_rows` analysis rows of the transactions stored in partition `name`."""
+        try:
+            stmt = text(f"""
+                DELETE FROM analysis WHERE id IN (
+                    SELECT a.id FROM analysis a JOIN {name} t ON t.transaction_id = a.transaction_id LIMIT :batch_rows
+                )
+            """)
+            deleted = (await self.db.execute(stmt, {"batch_rows": batch_rows})).rowcount
+            await self.db.commit()
+            return deleted
+        except SQLAlchemyError as e:
+            await self.db.rollback()
+            logger.error(f"Erro ao remover análises da partição {name}: {e}")
+            raise DatabaseException("Error deleting analysis of transactions partition") from e
+
+    async def drop_table(self, name: str) -> None:
+        """Drop a detached partition: its rows are gone at once, without a DELETE per row."""
+        try:
+            await self.db.execute(text(f"DROP TABLE IF EXISTS {name}"))
+            await self.db.commit()
+        except SQLAlchemyError as e:
+            await self.db.rollback()
+            logger.error(f"Erro ao remover a tabela {name}: {e}")
+            raise DatabaseException("Error dropping transactions partition") from e
@@ -0,0 +1,102 @@
+from datetime import datetime, timedelta
+from typing import List, Optional
+from sqlalchemy import bindparam, extract, func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import SQLAlchemyError
+from app.models.rollup_model import HourlyRollup, RollupCode, rollup_codes_sql, rollup_delta_sql, rollup_upsert_sql
+from app.models.transaction_model import Transaction
+from app.exception.transaction_exceptions import DatabaseException
+from app.infra.prepared_statements import hot_statements
+from app.infra.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+def _code_condition(dimension: str, value):
+    """Rollup rows whose `dimension` matches `value`, with the semantics of filter_conditions (ILIKE on text)."""
+    codes = select(RollupCode.code).where(RollupCode.dimension == dimension)
+    if isinstance(value, bool):
+        codes = codes.where(RollupCode.value == ("true" if value else "false"))
+    else:
+        codes = codes.where(RollupCode.value.ilike(f"%{value}%"))
+    return getattr(HourlyRollup, dimension).in_(codes)
+
+def series_statement(bucket: str, start: datetime, end: datetime, dimensions: dict):
+    bucket_start = HourlyRollup.bucket_start if bucket == "hour" else func.date_trunc(bucket, HourlyRollup.bucket_start)
+    bucket_start = bucket_start.label("bucket_start")
+    return (
+        select(bucket_start, func.sum(HourlyRollup.total), func.sum(HourlyRollup.fraud))
+        .where(
+            HourlyRollup.bucket_start >= start,
+            HourlyRollup.bucket_start < end,
+            *[_code_condition(dimension, value) for dimension, value in dimensions.items()],
+        )
+        .group_by(bucket_start)
+        .order_by(bucket_start)
+    )
+
+# Hot statements (app/infra/prepared_statements.py): the dashboard's hourly charts
+LATEST_BUCKET = hot_statements.register(
+    "rollup_latest_bucket",
+    select(HourlyRollup.bucket_start).where(HourlyRollup.total > 0).order_by(HourlyRollup.bucket_start.desc()).limit(1),
+)
+_hour = extract("hour", HourlyRollup.bucket_start).label("hour")
+HOUR_OF_DAY = hot_statements.register(
+    "rollup_hour_of_day",
+    select(_hour, func.sum(HourlyRollup.total), func.sum(HourlyRollup.fraud))
+    .where(HourlyRollup.bucket_start > bindparam("since"))
+    .group_by(_hour),
+)
+for _bucket in ("hour", "day"):
+    hot_statements.register(f"rollup_{_bucket}_series", series_statement(_bucket, datetime.min, datetime.min, {}))
+
+class RollupRepository:
+    """Reads and maintains hourly_rollup and rollup_codes (see app/models/rollup_model.py)."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_series(self, bucket: str, start: datetime, end: datetime, dimensions: dict) -> List[tuple]:
+        """(bucket_start, total, fraud) per non-empty `bucket` ('hour' or 'day') in [start, end), summed from the hourly rows."""
+        try:
+            stmt = series_statement(bucket, start, end, dimensions)
+            return [(row[0], int(row[1]), int(row[2])) for row in (await self.db.execute(stmt)).all()]
+        except SQLAlchemyError as e:
+            logger.error(f"Erro ao ler série temporal de transações: {e}")
+            raise DatabaseException("Error accessing the database") from e
+
+    async def latest_bucket(self) -> Optional[datetime]:
+        """Start of the most recent hour with transactions (an index lookup on the primary key)."""
+        return (await self.db.execute(LATEST_BUCKET)).scalar()
+
+    async def get_hour_of_day_stats(self, days: int) -> List[dict]:
+        """
+        Transactions aggregated by hour of day (0-23) over the `days` days up to the most recent
+        transaction. Returns list of dicts with: hour (0-23), total_transactions, fraud_transactions
+        """
+        try:
+            hour_data = {}
+            latest = await self.latest_bucket()
+            if latest is not None:
+                result = await self.db.execute(HOUR_OF_DAY, {"since": latest - timedelta(days=days)})
+                hour_data = {int(row[0]): (int(row[1]), int(row[2])) for row in result.all()}
+            return [
+                {
+                    "hour": hour,
+                    "total_transactions": hour_data.get(hour, (0, 0))[0],
+                    "fraud_transactions": hour_data.get(hour, (0, 0))[1],
+                }
+                for hour in range(24)
+            ]
+        except SQLAlchemyError as e:
+            logger.error(f"Error getting hourly transaction stats: {e}")
+            raise DatabaseException("Error accessing the database") from e
+
+    async def subtract_table(self, table: str) -> None:
+        """Remove the rows of `table` (a detached partition) from the rollup. Does not commit."""
+        await self.db.execute(text(rollup_upsert_sql(rollup_delta_sql(table, "-"))))
+
+    async def rebuild(self) -> None:
+        """Recompute the whole rollup from transactions. Does not commit; the caller blocks writes meanwhile."""
+        await self.db.execute(HourlyRollup.__table__.delete())
+        await self.db.execute(text(rollup_codes_sql(Transaction.__tablename__)))
+        await self.db.execute(text(rollup_upsert_sql(rollup_delta_sql(Transaction.__tablename__))))
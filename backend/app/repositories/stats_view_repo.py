@@ -0,0 +1,71 @@
+import time
+from typing import Optional
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import SQLAlchemyError
+from app.models.stats_view_model import DIMENSION_VIEW, GENERAL_VIEW, STATS_VIEWS
+from app.exception.transaction_exceptions import DatabaseException
+from app.infra.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Arbitrary key of the advisory lock taken while refreshing, so two refreshes never queue up
+REFRESH_LOCK_KEY = 734_034
+
+class StatsViewRepository:
+    """Reads and refreshes the dashboard materialized views (see app/models/stats_view_model.py)."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_dimension_totals(self) -> dict[str, dict[str, dict[str, int]]]:
+        """Same shape as TransactionCounterRepository.get_dimension_totals."""
+        try:
+            stmt = text(f"SELECT dimension, value, total, fraud FROM {DIMENSION_VIEW} WHERE total > 0 ORDER BY dimension, value")
+            totals: dict[str, dict[str, dict[str, int]]] = {}
+            for dimension, value, total, frauds in (await self.db.execute(stmt)).all():
+                totals.setdefault(dimension, {})[value] = {"total_transactions": int(total), "fraud_transactions": int(frauds)}
+            return totals
+        except SQLAlchemyError as e:
+            logger.error(f"Erro ao ler {DIMENSION_VIEW}: {e}")
+            raise DatabaseException("Error accessing the database") from e
+
+    async def get_general_stats(self) -> dict:
+        """Same shape as TransactionRepository.get_transaction_stats."""
+        try:
+            row = (await self.db.execute(text(f"SELECT total, fraud, max_amount, min_amount, avg_amount FROM {GENERAL_VIEW}"))).first()
+            total = int(row.total) if row else 0
+            frauds = int(row.fraud) if row else 0
+            return {
+                "total_transactions": total,
+                "fraudulent_transactions": frauds,
+                "max_amount": float(row.max_amount or 0.0) if row else 0.0,
+                "min_amount": float(row.min_amount or 0.0) if row else 0.0,
+                "avg_amount": float(row.avg_amount or 0.0) if row else 0.0,
+                "fraud_rate": round(frauds / total * 100, 2) if total > 0 else 0.0,
+            }
+        except SQLAlchemyError as e:
+            logger.error(f"Erro ao ler {GENERAL_VIEW}: {e}")
+            raise DatabaseException("Error accessing the database") from e
+
+    async def refresh(self) -> Optional[dict[str, float]]:
+        """
+        REFRESH ... CONCURRENTLY every view (reads keep using the previous contents meanwhile).
+        Returns the duration in milliseconds of each view, or None if another refresh is running.
+        """
+        try:
+            acquired = (await self.db.execute(text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": REFRESH_LOCK_KEY})).scalar()
+            if not acquired:
+                await self.db.rollback()
+                return None
+            durations = {}
+            for view in STATS_VIEWS:
+                start = time.perf_counter()
+                await self.db.execute(text(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {view}"))
+                durations[view] = round((time.perf_counter() - start) * 1000, 1)
+            await self.db.commit()
+            return durations
+        except SQLAlchemyError as e:
+            await self.db.rollback()
+            logger.error(f"Erro ao atualizar vistas materializadas: {e}")
+            raise DatabaseException("Error refreshing stats views") from e
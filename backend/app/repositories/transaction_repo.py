@@ -1,11 +1,21 @@
 # repositories/transaction_repo.py
+import asyncpg
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, Integer, cast, text
-from app.models.transaction_model import Transaction
-from typing import List, Optional
+from sqlalchemy import select, update, values, column, func, Integer, String, cast, text, Row, any_, bindparam, true, tuple_, inspect
+from sqlalchemy.dialects.postgresql import ARRAY
+from app.models.transaction_model import (
+    FEATURE_FLAGS, NEW_IDS_LOCK_SQL, VELOCITY_COLUMNS, Transaction, insert_new_ids_sql, velocity_column_expressions, velocity_columns_from,
+)
+from app.models.user_model import Analysis
+from app.repositories.counter_repo import TransactionCounterRepository
+from app.infra.distinct_cache import DistinctValuesCache
+from app.infra.prepared_statements import hot_statements
+from app.infra.row_cache import RowCache
+from app.settings.config import settings
+from typing import Dict, List, Optional
 from app.infra.logger import setup_logger
 from app.exception.transaction_exceptions import DatabaseException, TransactionDuplucateError
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from sqlalchemy import delete
 from app.schemas.transaction_schema import TransactionCreate
 from app.schemas.filter_schema import TransactionFilter
@@ -13,78 +23,153 @@ from datetime import datetime, timedelta
 
 logger = setup_logger(__name__)
 
+UNIQUE_VIOLATION = "23505"
+STAGING_TABLE = "transactions_staging"
+# asyncpg accepts at most 32767 bind parameters per statement
+MAX_BIND_PARAMS = 30000
+
+def is_unique_violation(error: SQLAlchemyError) -> bool:
+    """True when the driver reports a unique_violation (SQLSTATE 23505)."""
+    return isinstance(error, IntegrityError) and getattr(error.orig, "sqlstate", None) == UNIQUE_VIOLATION
+
+def filter_conditions(filters: TransactionFilter) -> list:
+    """
+    Translate a TransactionFilter into WHERE conditions.
+    Date bounds are emitted as plain comparisons on the partition key (timestamp) so the
+    planner can prune monthly partitions; they must never be wrapped in a function.
+    """
+    conditions = []
+    if filters.start_date:
+        conditions.append(Transaction.timestamp >= filters.start_date)
+    if filters.end_date:
+        conditions.append(Transaction.timestamp <= filters.end_date)
+    if filters.customer_id:
+        conditions.append(Transaction.customer_id == filters.customer_id)
+    if filters.country:
+        conditions.append(Transaction.country.ilike(f"%{filters.country}%"))
+    if filters.city:
+        conditions.append(Transaction.city.ilike(f"%{filters.city}%"))
+    if filters.merchant_category:
+        conditions.append(Transaction.merchant_category.ilike(f"%{filters.merchant_category}%"))
+    if filters.merchant:
+        conditions.append(Transaction.merchant.ilike(f"%{filters.merchant}%"))
+    if filters.card_type:
+        conditions.append(Transaction.card_type.ilike(f"%{filters.card_type}%"))
+    if filters.card_present is not None:
+        conditions.append(Transaction.card_present == bool(filters.card_present))
+    if filters.channel:
+        conditions.append(Transaction.channel.ilike(f"%{filters.channel}%"))
+    if filters.device:
+        conditions.append(Transaction.device.ilike(f"%{filters.device}%"))
+    if filters.distance_from_home is not None:
+        conditions.append(Transaction.distance_from_home == filters.distance_from_home)
+    if filters.high_risk_merchant is not None:
+        conditions.append(Transaction.high_risk_merchant == filters.high_risk_merchant)
+    if filters.weekend_transaction is not None:
+        conditions.append(Transaction.weekend_transaction == filters.weekend_transaction)
+    if filters.min_amount is not None:
+        conditions.append(Transaction.amount_usd >= filters.min_amount)
+    if filters.max_amount is not None:
+        conditions.append(Transaction.amount_usd <= filters.max_amount)
+    if filters.is_fraud is not None:
+        conditions.append(Transaction.is_fraud == filters.is_fraud)
+    for name in FEATURE_FLAGS:
+        value = getattr(filters, name)
+        if value is not None:
+            conditions.append(getattr(Transaction, name) == value)
+    for key, name in VELOCITY_COLUMNS.items():
+        low, high = getattr(filters, f"min_{name}"), getattr(filters, f"max_{name}")
+        if low is not None:
+            conditions.append(getattr(Transaction, name) >= low)
+        if high is not None:
+            conditions.append(getattr(Transaction, name) <= high)
+    return conditions
+
+# Typed velocity columns as read by the list paths: the JSON is only looked at for rows not backfilled yet
+_VELOCITY_FALLBACK = velocity_column_expressions()
+VELOCITY_READ_COLUMNS = [
+    func.coalesce(getattr(Transaction, name), _VELOCITY_FALLBACK[name]).label(name) for name in VELOCITY_COLUMNS.values()
+]
+
+# Columns needed to build a TransactionResponse (see TransactionService._row_to_dict)
+LIST_COLUMNS = [
+    Transaction.transaction_id, Transaction.customer_id, Transaction.card_number, Transaction.timestamp,
+    Transaction.merchant, Transaction.merchant_category, Transaction.merchant_type, Transaction.amount,
+    Transaction.amount_usd, Transaction.currency, Transaction.country, Transaction.city, Transaction.city_size, Transaction.card_type,
+    Transaction.card_present, Transaction.device, Transaction.channel, Transaction.device_fingerprint,
+    Transaction.ip_address, Transaction.distance_from_home, Transaction.high_risk_merchant,
+    Transaction.transaction_hour, Transaction.weekend_transaction, *VELOCITY_READ_COLUMNS,
+    Transaction.is_fraud,
+]
+
+# Columns whose distinct values feed the filter dropdowns and the per-dimension stats routes
+DISTINCT_FIELDS = {
+    "country": Transaction.country,
+    "city": Transaction.city,
+    "merchant": Transaction.merchant,
+    "merchant_category": Transaction.merchant_category,
+    "high_risk_merchant": Transaction.high_risk_merchant,
+    "distance_from_home": Transaction.distance_from_home,
+    "weekend_transaction": Transaction.weekend_transaction,
+    "card_type": Transaction.card_type,
+    "channel": Transaction.channel,
+    "device": Transaction.device,
+}
+
+# Shared by the whole process; every successful insert/update below reports its values
+distinct_values = DistinctValuesCache(DISTINCT_FIELDS)
+
+# Hot rows by transaction_id, shared by the whole process (off unless TRANSACTION_CACHE_ROWS > 0);
+# the writes below invalidate what they touch, writes of other processes expire with the TTL
+transaction_cache = RowCache(settings.TRANSACTION_CACHE_ROWS, settings.TRANSACTION_CACHE_TTL_SECONDS)
+
+def _snapshot(transaction: Transaction) -> dict:
+    """Column values of a loaded transaction, what transaction_cache stores."""
+    return {attr.key: getattr(transaction, attr.key) for attr in Transaction.__mapper__.column_attrs}
+
+def page_statement(filters: TransactionFilter, limit: int, skip: int):
+    """One page of LIST_COLUMNS matching `filters` (GET /transactions/)."""
+    return select(*LIST_COLUMNS).where(*filter_conditions(filters)).offset(skip).limit(limit)
+
+def count_statement(filters: TransactionFilter):
+    return select(func.count(Transaction.transaction_id)).where(*filter_conditions(filters))
+
+# Hot statements, prepared on every pooled connection (app/infra/prepared_statements.py). The lookups are
+# executed as registered (and once with an id that matches nothing, to plan them); the list and count
+# entries are representatives of the shapes the dashboard sends most (no filter, a date range), built by
+# the same functions as the live queries so their SQL matches.
+TRANSACTION_BY_ID = hot_statements.register(
+    "transaction_by_id",
+    select(Transaction).where(Transaction.transaction_id == bindparam("transaction_id")),
+    warm_params={"transaction_id": ""},
+)
+TRANSACTIONS_BY_IDS = hot_statements.register(
+    "transactions_by_ids",
+    select(Transaction).where(Transaction.transaction_id == any_(bindparam("ids", type_=ARRAY(String)))),
+    warm_params={"ids": [""]},
+)
+_DATE_RANGE = TransactionFilter(start_date=datetime.min, end_date=datetime.min)
+hot_statements.register("transaction_page", page_statement(TransactionFilter(), 0, 0))
+hot_statements.register("transaction_page_in_range", page_statement(_DATE_RANGE, 0, 0))
+hot_statements.register("transaction_count_in_range", count_statement(_DATE_RANGE))
+
 class TransactionRepository:
     def __init__(self, db: AsyncSession):
         self.db = db
+        self.counters = TransactionCounterRepository(db)
+        # Transactions already looked up through this repository (one per request), by id
+        self._lookups: Dict[str, Transaction] = {}
     
     async def get_transaction_count(self) -> dict[str, int]:
-        total_stmt = select(func.count(Transaction.transaction_id))
-        fraud_stmt = select(func.count(Transaction.transaction_id)).where(Transaction.is_fraud == True)
-
-        total_result = await self.db.execute(total_stmt)
-        fraud_result = await self.db.execute(fraud_stmt)
-
-        total = total_result.scalar()
-        frauds = fraud_result.scalar()
-
-        return {
-            "total_transactions": total,
-            "fraud_transactions": frauds
-        }
+        # Maintained by triggers (transaction_counters), no scan of transactions
+        return await self.counters.get_totals()
     
     async def get_transaction_stats_filtered(self, filters: TransactionFilter) -> dict[str, int]:
         try:
-            total_stmt = select(func.count(Transaction.transaction_id))
-            fraud_stmt = select(func.count(Transaction.transaction_id)).where(Transaction.is_fraud == True)
-
-            if filters.country:
-                total_stmt = total_stmt.where(Transaction.country.ilike(f"%{filters.country}%"))
-                fraud_stmt = fraud_stmt.where(Transaction.country.ilike(f"%{filters.country}%"))
-            if filters.city:
-                total_stmt = total_stmt.where(Transaction.city.ilike(f"%{filters.city}%"))
-                fraud_stmt = fraud_stmt.where(Transaction.city.ilike(f"%{filters.city}%"))
-            if filters.merchant_category:
-                total_stmt = total_stmt.where(Transaction.merchant_category.ilike(f"%{filters.merchant_category}%"))
-                fraud_stmt = fraud_stmt.where(Transaction.merchant_category.ilike(f"%{filters.merchant_category}%"))
-            if filters.merchant:
-                total_stmt = total_stmt.where(Transaction.merchant.ilike(f"%{filters.merchant}%"))
-                fraud_stmt = fraud_stmt.where(Transaction.merchant.ilike(f"%{filters.merchant}%"))
-            if filters.card_type:
-                total_stmt = total_stmt.where(Transaction.card_type.ilike(f"%{filters.card_type}%"))
-                fraud_stmt = fraud_stmt.where(Transaction.card_type.ilike(f"%{filters.card_type}%"))
-            if filters.card_present is not None:
-                total_stmt = total_stmt.where(Transaction.card_present == filters.card_present)
-                fraud_stmt = fraud_stmt.where(Transaction.card_present == filters.card_present)
-            if filters.channel:
-                total_stmt = total_stmt.where(Transaction.channel.ilike(f"%{filters.channel}%"))
-                fraud_stmt = fraud_stmt.where(Transaction.channel.ilike(f"%{filters.channel}%"))
-            if filters.device:
-                total_stmt = total_stmt.where(Transaction.device.ilike(f"%{filters.device}%"))
-                fraud_stmt = fraud_stmt.where(Transaction.device.ilike(f"%{filters.device}%"))
-            if filters.distance_from_home:
-                total_stmt = total_stmt.where(Transaction.distance_from_home == filters.distance_from_home)
-                fraud_stmt = fraud_stmt.where(Transaction.distance_from_home == filters.distance_from_home)
-            if filters.high_risk_merchant is not None:
-                total_stmt = total_stmt.where(Transaction.high_risk_merchant == filters.high_risk_merchant)
-                fraud_stmt = fraud_stmt.where(Transaction.high_risk_merchant == filters.high_risk_merchant)
-            if filters.weekend_transaction is not None:
-                total_stmt = total_stmt.where(Transaction.weekend_transaction == filters.weekend_transaction)
-                fraud_stmt = fraud_stmt.where(Transaction.weekend_transaction == filters.weekend_transaction)
-            if filters.customer_id:
-                total_stmt = total_stmt.where(Transaction.customer_id == filters.customer_id)
-                fraud_stmt = fraud_stmt.where(Transaction.customer_id == filters.customer_id)
-            if filters.start_date:
-                total_stmt = total_stmt.where(Transaction.timestamp >= filters.start_date)
-                fraud_stmt = fraud_stmt.where(Transaction.timestamp >= filters.start_date)
-            if filters.end_date:
-                total_stmt = total_stmt.where(Transaction.timestamp <= filters.end_date)
-                fraud_stmt = fraud_stmt.where(Transaction.timestamp <= filters.end_date)
-            if filters.min_amount:
-                total_stmt = total_stmt.where(Transaction.amount >= filters.min_amount)
-                fraud_stmt = fraud_stmt.where(Transaction.amount >= filters.min_amount)
-            if filters.max_amount:
-                total_stmt = total_stmt.where(Transaction.amount <= filters.max_amount)
-                fraud_stmt = fraud_stmt.where(Transaction.amount <= filters.max_amount)
+            # is_fraud is what gets counted here, so it is not part of the filter
+            conditions = filter_conditions(filters.model_copy(update={"is_fraud": None}))
+            total_stmt = select(func.count(Transaction.transaction_id)).where(*conditions)
+            fraud_stmt = select(func.count(Transaction.transaction_id)).where(*conditions, Transaction.is_fraud == True)
 
             total_result = await self.db.execute(total_stmt)
             fraud_result = await self.db.execute(fraud_stmt)
@@ -102,20 +187,18 @@ class TransactionRepository:
     
     async def get_transaction_stats(self) -> dict[str, int]:
         try:
-            total_stmt = select(func.count(Transaction.transaction_id))
-            fraud_stmt = select(func.count(Transaction.transaction_id)).where(Transaction.is_fraud == True)
-            max_amount_stmt = select(func.max(Transaction.amount))
-            min_amount_stmt = select(func.min(Transaction.amount))
-            avg_amount_stmt = select(func.avg(Transaction.amount))
+            counts = await self.counters.get_totals()
+            # In USD; max and min are read from the ends of ix_transactions_amount_usd
+            max_amount_stmt = select(func.max(Transaction.amount_usd))
+            min_amount_stmt = select(func.min(Transaction.amount_usd))
+            avg_amount_stmt = select(func.avg(Transaction.amount_usd))
 
-            total_result = await self.db.execute(total_stmt)
-            fraud_result = await self.db.execute(fraud_stmt)
             max_amount_result = await self.db.execute(max_amount_stmt)
             min_amount_result = await self.db.execute(min_amount_stmt)
             avg_amount_result = await self.db.execute(avg_amount_stmt)
 
-            total = total_result.scalar() or 0
-            frauds = fraud_result.scalar() or 0
+            total = counts["total_transactions"]
+            frauds = counts["fraud_transactions"]
             max_amount = max_amount_result.scalar() or 0.0
             min_amount = min_amount_result.scalar() or 0.0
             avg_amount = avg_amount_result.scalar() or 0.0
@@ -135,44 +218,11 @@ class TransactionRepository:
     
     async def get_filtered_transaction_count(self, filters: TransactionFilter) -> dict[str, int]:
         try:
-            stmt = select(func.count(Transaction.transaction_id))
-
-            if filters.customer_id:
-                stmt = stmt.where(Transaction.customer_id == filters.customer_id)
-            if filters.country:
-                stmt = stmt.where(Transaction.country.ilike(f"%{filters.country}%"))
-            if filters.city:
-                stmt = stmt.where(Transaction.city.ilike(f"%{filters.city}%"))
-            if filters.merchant_category:
-                stmt = stmt.where(Transaction.merchant_category.ilike(f"%{filters.merchant_category}%"))
-            if filters.merchant:
-                stmt = stmt.where(Transaction.merchant.ilike(f"%{filters.merchant}%"))
-            if filters.card_type:
-                stmt = stmt.where(Transaction.card_type.ilike(f"%{filters.card_type}%"))
-            if filters.card_present is not None:
-                stmt = stmt.where(Transaction.card_present == filters.card_present)
-            if filters.channel:
-                stmt = stmt.where(Transaction.channel.ilike(f"%{filters.channel}%"))
-            if filters.device:
-                stmt = stmt.where(Transaction.device.ilike(f"%{filters.device}%"))
-            if filters.distance_from_home:
-                stmt = stmt.where(Transaction.distance_from_home == filters.distance_from_home)
-            if filters.high_risk_merchant is not None:
-                stmt = stmt.where(Transaction.high_risk_merchant == filters.high_risk_merchant)
-            if filters.weekend_transaction is not None:
-                stmt = stmt.where(Transaction.weekend_transaction == filters.weekend_transaction)
-            if filters.start_date:
-                stmt = stmt.where(Transaction.date >= filters.start_date)
-            if filters.end_date:
-                stmt = stmt.where(Transaction.date <= filters.end_date)
-            if filters.min_amount:
-                stmt = stmt.where(Transaction.amount >= filters.min_amount)
-            if filters.max_amount:
-                stmt = stmt.where(Transaction.amount <= filters.max_amount)
-            if filters.is_fraud is not None:
-                stmt = stmt.where(Transaction.is_fraud == filters.is_fraud)
+            if not filter_conditions(filters):
+                counts = await self.counters.get_totals()
+                return {"filtered_transactions": counts["total_transactions"]}
 
-            result = await self.db.execute(stmt)
+            result = await self.db.execute(count_statement(filters))
             count = result.scalar()
             return {
                 "filtered_transactions": count
@@ -183,43 +233,7 @@ class TransactionRepository:
     
     async def get_all_transactions(self, filters: TransactionFilter, limit: int, skip: int) -> List[Transaction]:
         try:
-            stmt = select(Transaction)
-
-            if filters.customer_id:
-                stmt = stmt.where(Transaction.customer_id == filters.customer_id)
-            if filters.country:
-                stmt = stmt.where(Transaction.country.ilike(f"%{filters.country}%"))
-            if filters.city:
-                stmt = stmt.where(Transaction.city.ilike(f"%{filters.city}%"))
-            if filters.merchant_category:
-                stmt = stmt.where(Transaction.merchant_category.ilike(f"%{filters.merchant_category}%"))
-            if filters.merchant:
-                stmt = stmt.where(Transaction.merchant.ilike(f"%{filters.merchant}%"))
-            if filters.card_type:
-                stmt = stmt.where(Transaction.card_type.ilike(f"%{filters.card_type}%"))
-            if filters.card_present is not None:
-                stmt = stmt.where(Transaction.card_present == filters.card_present)
-            if filters.channel:
-                stmt = stmt.where(Transaction.channel.ilike(f"%{filters.channel}%"))
-            if filters.device:
-                stmt = stmt.where(Transaction.device.ilike(f"%{filters.device}%"))
-            if filters.distance_from_home:
-                stmt = stmt.where(Transaction.distance_from_home == filters.distance_from_home)
-            if filters.high_risk_merchant is not None:
-                stmt = stmt.where(Transaction.high_risk_merchant == filters.high_risk_merchant)
-            if filters.weekend_transaction is not None:
-                stmt = stmt.where(Transaction.weekend_transaction == filters.weekend_transaction)
-            if filters.start_date:
-                stmt = stmt.where(Transaction.date >= filters.start_date)
-            if filters.end_date:
-                stmt = stmt.where(Transaction.date <= filters.end_date)
-            if filters.min_amount:
-                stmt = stmt.where(Transaction.amount >= filters.min_amount)
-            if filters.max_amount:
-                stmt = stmt.where(Transaction.amount <= filters.max_amount)
-            if filters.is_fraud is not None:
-                stmt = stmt.where(Transaction.is_fraud == filters.is_fraud)
-
+            stmt = select(Transaction).where(*filter_conditions(filters))
             stmt = stmt.offset(skip).limit(limit)
             result = await self.db.execute(stmt)
             transactions = result.scalars().all()
@@ -228,116 +242,376 @@ class TransactionRepository:
             logger.error(f"Erro ao obter transações: {e}")
             raise DatabaseException("Error accessing the database") from e
     
+    async def get_transaction_rows(self, filters: TransactionFilter, limit: int, skip: int) -> List[Row]:
+        """
+        Read-only variant of get_all_transactions: selects LIST_COLUMNS as Core rows on the
+        session's connection, skipping ORM entity hydration and identity-map bookkeeping.
+        """
+        try:
+            connection = await self.db.connection()
+            result = await connection.execute(page_statement(filters, limit, skip))
+            return result.all()
+        except SQLAlchemyError as e:
+            logger.error(f"Erro ao obter transações: {e}")
+            raise DatabaseException("Error accessing the database") from e
+
+    async def get_customer_timeline(self, customer_id: str, limit: int, after: Optional[tuple[datetime, str]] = None) -> List[Row]:
+        """
+        One page of a customer's transactions, newest first, and the customer's aggregates in a single statement.
+        Keyset pagination: `after` is the (timestamp, transaction_id) of the last row of the previous page.
+        Both parts are served by ix_transactions_customer_timeline. Up to limit + 1 rows are read so the caller
+        knows whether there is a next page. Every row carries the aggregates; when the page is empty a single
+        row with the aggregates and NULL transaction columns is returned.
+        """
+        try:
+            page = select(*LIST_COLUMNS).where(Transaction.customer_id == customer_id)
+            if after is not None:
+                page = page.where(tuple_(Transaction.timestamp, Transaction.transaction_id) < tuple_(*after))
+            page = page.order_by(Transaction.timestamp.desc(), Transaction.transaction_id.desc()).limit(limit + 1).cte("page")
+
+            summary = select(
+                func.count().label("transaction_count"),
+                func.coalesce(func.sum(Transaction.amount_usd), 0.0).label("total_amount_usd"),
+                func.count().filter(Transaction.is_fraud == True).label("fraud_count"),
+                func.min(Transaction.timestamp).label("first_seen"),
+                func.max(Transaction.timestamp).label("last_seen"),
+            ).where(Transaction.customer_id == customer_id).cte("summary")
+
+            stmt = (
+                select(summary, page)
+                .select_from(summary.outerjoin(page, true()))
+                .order_by(page.c.timestamp.desc(), page.c.transaction_id.desc())
+            )
+            connection = await self.db.connection()
+            result = await connection.execute(stmt)
+            return result.all()
+        except SQLAlchemyError as e:
+            logger.error(f"Erro ao obter histórico do cliente {customer_id}: {e}")
+            raise DatabaseException("Error accessing the database") from e
+
+    def _forget(self, ids: Optional[List[str]] = None) -> None:
+        """After a write: drop `ids` (every id when None) from this request's lookups and from transaction_cache."""
+        self._lookups.clear()
+        transaction_cache.invalidate(ids)
+
+    async def _lookup(self, ids: List[str]) -> Dict[str, Transaction]:
+        """
+        Transactions by id, from the lookups of this request, then transaction_cache (as transient
+        instances built from the cached columns), then the database in one round trip for the rest.
+        Ids that do not exist are left out.
+        """
+        found: Dict[str, Transaction] = {}
+        missing: List[str] = []
+        for transaction_id in dict.fromkeys(ids):
+            transaction = self._lookups.get(transaction_id)
+            # Expired by a commit of the session: reloading would be a round trip (and lazy IO) anyway
+            if transaction is not None and not inspect(transaction).expired_attributes:
+                found[transaction_id] = transaction
+                continue
+            row = transaction_cache.get(transaction_id)
+            if row is not None:
+                found[transaction_id] = self._lookups[transaction_id] = Transaction(**row)
+            else:
+                missing.append(transaction_id)
+        if not missing:
+            return found
+
+        generation = transaction_cache.generation
+        if len(missing) == 1:
+            result = await self.db.execute(TRANSACTION_BY_ID, {"transaction_id": missing[0]})
+        else:
+            result = await self.db.execute(TRANSACTIONS_BY_IDS, {"ids": missing})
+        for transaction in result.scalars().all():
+            found[transaction.transaction_id] = self._lookups[transaction.transaction_id] = transaction
+            transaction_cache.put(transaction.transaction_id, _snapshot(transaction), generation)
+        return found
+
     async def get_transaction_id(self, transaction_id: str) -> Transaction:
         try:
-            stmt = select(Transaction).where(Transaction.transaction_id == transaction_id)
-            result = await self.db.execute(stmt)
-            transaction = result.scalar_one_or_none()
-            return transaction
+            return (await self._lookup([transaction_id])).get(transaction_id)
         except SQLAlchemyError as e:
             logger.error(f"Erro ao obter transação por ID {transaction_id}: {e}")
             raise DatabaseException("Error accessing the database") from e
     
+    async def get_transactions_by_ids(self, ids: List[str]) -> List[Transaction]:
+        """
+        Fetch many transactions in one round trip (WHERE transaction_id = ANY($1)), or none when
+        they were all looked up already (see _lookup).
+        Returned in the order of `ids` (first occurrence); ids that do not exist are skipped.
+        """
+        if not ids:
+            return []
+        try:
+            by_id = await self._lookup(list(ids))
+            return [by_id[transaction_id] for transaction_id in dict.fromkeys(ids) if transaction_id in by_id]
+        except SQLAlchemyError as e:
+            logger.error(f"Erro ao obter {len(ids)} transações por ID: {e}")
+            raise DatabaseException("Error accessing the database") from e
+
     async def create_transaction(self, transaction: TransactionCreate) -> Transaction:
         try:
-            db_transaction = Transaction(**transaction.model_dump())
+            values = transaction.model_dump()
+            # The primary key includes timestamp: the same id under another timestamp is a duplicate too
+            await self.db.execute(text(f"LOCK TABLE {Transaction.__tablename__} IN ROW EXCLUSIVE MODE"))
+            await self.db.execute(text(NEW_IDS_LOCK_SQL))
+            if await self.exists_where([Transaction.transaction_id == values["transaction_id"]]):
+                await self.db.rollback()
+                raise TransactionDuplucateError(name="Transição duplicada", message="Transição já existe na base de dados;")
+            db_transaction = Transaction(**values, **velocity_columns_from(values["velocity_last_hour"]))
             self.db.add(db_transaction)
             await self.db.commit()
             await self.db.refresh(db_transaction)
+            distinct_values.observe_rows([db_transaction])
             return db_transaction
         except SQLAlchemyError as e:
             await self.db.rollback()
-            if "duplicate key" in str(e).lower():
+            if is_unique_violation(e):
                 raise TransactionDuplucateError(name="Transição duplicada", message="Transição já existe na base de dados;")
             logger.error(f"Erro ao criar transação: {e}")
             raise DatabaseException("Error creating transaction is database") from e
         
-    async def delete_transaction(self, transaction_id: str):
+    async def bulk_insert_transactions(self, columns: List[str], records: List[tuple]) -> int:
+        """
+        COPY `records` (one per transaction_id) into a per-connection temporary staging table and merge
+        the ids not in transactions yet, whatever their timestamp (insert_new_ids_sql), in a single transaction.
+        Returns:
+            int: Number of rows actually inserted (the rest were duplicates).
+        """
         try:
-            transaction = await self.get_transaction_id(transaction_id)
-            if transaction:
-                await self.db.execute(delete(Transaction).where(Transaction.transaction_id == transaction_id))
-                await self.db.commit()
+            # Take the INSERT's lock first: CREATE TABLE ... LIKE would otherwise take ACCESS SHARE and upgrade it,
+            # deadlocking with a concurrent partition creation (SHARE ROW EXCLUSIVE, then ACCESS EXCLUSIVE)
+            await self.db.execute(text(f"LOCK TABLE {Transaction.__tablename__} IN ROW EXCLUSIVE MODE"))
+            await self.db.execute(text(
+                f"CREATE TEMP TABLE IF NOT EXISTS {STAGING_TABLE} "
+                f"(LIKE {Transaction.__tablename__} INCLUDING DEFAULTS) ON COMMIT DELETE ROWS"
+            ))
+            connection = await self.db.connection()
+            raw_connection = await connection.get_raw_connection()
+            await raw_connection.driver_connection.copy_records_to_table(STAGING_TABLE, records=records, columns=columns)
+
+            # Taken after the COPY: concurrent chunks only wait for each other's merge
+            await self.db.execute(text(NEW_IDS_LOCK_SQL))
+            result = await self.db.execute(text(insert_new_ids_sql(STAGING_TABLE, columns)))
+            inserted = result.rowcount
+            await self.db.commit()
+            if inserted > 0:
+                distinct_values.observe_records(columns, records)
+            return inserted
+        except (SQLAlchemyError, asyncpg.PostgresError) as e:
+            await self.db.rollback()
+            logger.error(f"Erro na inserção em massa de transações: {e}")
+            raise DatabaseException("Error bulk inserting transactions in database") from e
+
+    def _delete_statement(self, conditions: list, limit: Optional[int] = None):
+        """
+        DELETE the transactions matching `conditions` (at most `limit`) and their analysis rows in one statement.
+        Selects (deleted, fraud_deleted, analysis_deleted).
+        """
+        doomed = select(Transaction.transaction_id, Transaction.timestamp).where(*conditions)
+        if limit is not None:
+            doomed = doomed.limit(limit)
+        doomed = doomed.cte("doomed")
+        gone = (
+            delete(Transaction)
+            .where(Transaction.transaction_id == doomed.c.transaction_id, Transaction.timestamp == doomed.c.timestamp)
+            .returning(Transaction.transaction_id, Transaction.is_fraud)
+            .cte("gone")
+        )
+        removed_analysis = (
+            delete(Analysis)
+            .where(Analysis.transaction_id.in_(select(gone.c.transaction_id)))
+            .returning(Analysis.id)
+            .cte("removed_analysis")
+        )
+        return select(
+            select(func.count()).select_from(gone).scalar_subquery(),
+            select(func.count()).select_from(gone).where(gone.c.is_fraud == True).scalar_subquery(),
+            select(func.count()).select_from(removed_analysis).scalar_subquery(),
+        )
+
+    async def delete_transaction(self, transaction_id: str) -> bool:
+        """Delete a transaction and its analysis rows in one statement; False when it does not exist."""
+        try:
+            deleted, _, _ = (await self.db.execute(self._delete_statement([Transaction.transaction_id == transaction_id]))).one()
+            await self.db.commit()
+            self._forget([transaction_id])
+            if deleted:
                 logger.info(f"Transação com ID {transaction_id} removida com sucesso")
-            return transaction
+            return deleted > 0
         except SQLAlchemyError as e:
             await self.db.rollback()
             logger.error(f"Erro ao remover transação com ID {transaction_id}: {e}")
             raise DatabaseException("Erro ao remover a transação na base de dados") from e
-        
-    async def update_transaction(self, updated_transaction: Transaction) -> Transaction:
+
+    async def delete_where(self, conditions: list, batch_rows: int) -> dict[str, int]:
+        """
+        Delete every transaction matching `conditions` (and their analysis rows) in batches of
+        `batch_rows`, committing each batch so no lock or WAL burst outlives a batch.
+        """
+        totals = {"deleted": 0, "fraud_deleted": 0, "analysis_deleted": 0, "batches": 0}
+        stmt = self._delete_statement(conditions, batch_rows)
+        try:
+            while True:
+                deleted, frauds, analysis = (await self.db.execute(stmt)).one()
+                await self.db.commit()
+                if deleted == 0:
+                    return totals
+                # Which ids matched is not known here
+                self._forget()
+                totals["deleted"] += deleted
+                totals["fraud_deleted"] += frauds
+                totals["analysis_deleted"] += analysis
+                totals["batches"] += 1
+        except SQLAlchemyError as e:
+            await self.db.rollback()
+            logger.error(f"Erro na remoção em massa de transações (removidas até agora: {totals['deleted']}): {e}")
+            raise DatabaseException("Error deleting transactions from database") from e
+
+    async def exists_where(self, conditions: list) -> bool:
+        return (await self.db.execute(select(true()).where(*conditions).limit(1))).first() is not None
+
+    async def backfill_batch(self, values: dict, pending: list, after: str, batch_rows: int) -> tuple[Optional[str], int]:
+        """
+        Set `values` (column -> SQL expression) on the rows matching `pending` among the next `batch_rows`
+        transactions after transaction_id `after` (keyset order of the primary key), and commit.
+        The counters and rollup triggers are skipped: backfilled columns are not counted.
+        Returns the last transaction_id of the batch (None once past the end) and the rows updated.
+        """
+        try:
+            await self.counters.skip_counting()
+            batch = (
+                select(Transaction.transaction_id, Transaction.timestamp)
+                .where(Transaction.transaction_id > after)
+                .order_by(Transaction.transaction_id)
+                .limit(batch_rows)
+                .cte("batch")
+            )
+            updated = (
+                update(Transaction)
+                .where(Transaction.transaction_id == batch.c.transaction_id, Transaction.timestamp == batch.c.timestamp, *pending)
+                .values(values)
+                .returning(Transaction.transaction_id)
+                .cte("updated")
+            )
+            stmt = select(
+                select(func.max(batch.c.transaction_id)).scalar_subquery(),
+                select(func.count()).select_from(updated).scalar_subquery(),
+            )
+            last, count = (await self.db.execute(stmt)).one()
+            await self.db.commit()
+            if count:
+                self._forget()
+            return last, count
+        except SQLAlchemyError as e:
+            await self.db.rollback()
+            logger.error(f"Erro ao preencher colunas {list(values)} após {after!r}: {e}")
+            raise DatabaseException("Error backfilling transactions") from e
+
+    async def update_fields(self, transaction_id: str, values: dict) -> Optional[Row]:
+        """
+        Partial update in one round trip: UPDATE ... SET <only the given columns> RETURNING LIST_COLUMNS.
+        Returns the updated row, or None when the transaction does not exist.
+        """
         try:
+            stmt = update(Transaction).where(Transaction.transaction_id == transaction_id).values(**values).returning(*LIST_COLUMNS)
+            row = (await self.db.execute(stmt)).first()
             await self.db.commit()
-            await self.db.refresh(updated_transaction)
-            return updated_transaction
+            self._forget([transaction_id])
+            if row is not None:
+                distinct_values.observe_rows([row])
+            return row
         except SQLAlchemyError as e:
             await self.db.rollback()
-            logger.error(f"Erro ao atualizar transação: {e}")
+            logger.error(f"Erro ao atualizar transação {transaction_id}: {e}")
             raise DatabaseException("Erro ao atualizar a transação na base de dados") from e
 
-    async def get_distinct_values(self, field: str) -> List[str]:
+    async def bulk_update_fields(self, changes: List[dict]) -> List[str]:
+        """
+        Apply many partial updates ({"transaction_id": ..., <column>: <value>, ...}) in one transaction.
+        Changes touching the same columns are joined as UPDATE transactions SET ... FROM (VALUES ...),
+        one statement per column set and chunk of bind parameters.
+        Returns the ids that were updated.
+        """
+        groups: dict[tuple, List[dict]] = {}
+        for change in changes:
+            columns = tuple(sorted(key for key in change if key != "transaction_id"))
+            groups.setdefault(columns, []).append(change)
+
+        updated: List[str] = []
         try:
-            field_mapping = {
-                "country": Transaction.country,
-                "city": Transaction.city,
-                "merchant": Transaction.merchant,
-                "merchant_category": Transaction.merchant_category,
-                "high_risk_merchant": Transaction.high_risk_merchant,
-                "distance_from_home": Transaction.distance_from_home,
-                "weekend_transaction": Transaction.weekend_transaction,
-                "card_type": Transaction.card_type,
-                "channel": Transaction.channel,
-                "device": Transaction.device,
-            }
+            for columns, group in groups.items():
+                source_columns = [column(name, Transaction.__table__.c[name].type) for name in ("transaction_id", *columns)]
+                chunk_rows = max(1, MAX_BIND_PARAMS // len(source_columns))
+                for start in range(0, len(group), chunk_rows):
+                    rows = [tuple(change[c.name] for c in source_columns) for change in group[start:start + chunk_rows]]
+                    source = values(*source_columns, name="changes").data(rows)
+                    stmt = (
+                        update(Transaction)
+                        .where(Transaction.transaction_id == source.c.transaction_id)
+                        .values({name: source.c[name] for name in columns})
+                        .returning(Transaction.transaction_id)
+                    )
+                    updated.extend((await self.db.execute(stmt)).scalars().all())
+            await self.db.commit()
+            self._forget(updated)
+        except SQLAlchemyError as e:
+            await self.db.rollback()
+            logger.error(f"Erro na atualização em massa de {len(changes)} transações: {e}")
+            raise DatabaseException("Error bulk updating transactions in database") from e
+
+        for field in distinct_values.fields:
+            distinct_values.observe(field, (change[field] for change in changes if field in change))
+        return updated
 
-            if field not in field_mapping:
-                raise ValueError(f"Invalid field: {field}")
+    async def get_value_frequencies(self, fields: List[str]) -> dict[str, dict[str, int]]:
+        """
+        {field: {value: number of transactions}} for each text column in `fields`, NULLs excluded.
+        A single scan of transactions: one GROUPING SET per field.
+        """
+        try:
+            columns = [getattr(Transaction, field) for field in fields]
+            stmt = select(*columns, func.count()).group_by(func.grouping_sets(*columns))
+            frequencies: dict[str, dict[str, int]] = {field: {} for field in fields}
+            for row in (await self.db.execute(stmt)).all():
+                # Within a grouping set only that set's column is non NULL
+                for field, value in zip(fields, row[:-1]):
+                    if value is not None:
+                        frequencies[field][value] = row[-1]
+                        break
+            return frequencies
+        except SQLAlchemyError as e:
+            logger.error(f"Erro ao obter frequências de valores para {fields}: {e}")
+            raise DatabaseException("Error accessing the database") from e
 
-            column = field_mapping[field]
+    async def get_distinct_values(self, field: str) -> List[str]:
+        """Distinct values of a filter column: scanned once, then served from distinct_values."""
+        if field not in DISTINCT_FIELDS:
+            raise ValueError(f"Invalid field: {field}")
+        cached = distinct_values.get(field)
+        if cached is not None:
+            return list(cached)
+        try:
+            column = DISTINCT_FIELDS[field]
             stmt = select(column).distinct().where(column.isnot(None))
             result = await self.db.execute(stmt)
-            values = [row[0] for row in result.all()]
-            return values
+            distinct_values.load(field, (row[0] for row in result.all()))
+            return list(distinct_values.get(field))
         except SQLAlchemyError as e:
             logger.error(f"Erro ao obter valores distintos para {field}: {e}")
             raise DatabaseException("Error accessing the database") from e
 
-    async def get_hourly_transaction_stats(self, days: int = 90) -> List[dict]:
-        """
-        Get transaction counts aggregated by hour of day (0-23).
-        Returns list of dicts with: hour (0-23), total_transactions, fraud_transactions
-        """
+    async def get_minute_series(self, start: datetime, end: datetime, filters: TransactionFilter) -> List[tuple]:
+        """(bucket_start, total, fraud) per non-empty minute in [start, end), from the rows themselves (short ranges only)."""
         try:
-            # Use transaction_hour column to group by hour of day (0-23)
+            bucket_start = func.date_trunc("minute", Transaction.timestamp).label("bucket_start")
             stmt = (
-                select(
-                    Transaction.transaction_hour.label('hour'),
-                    func.count(Transaction.transaction_id).label('total'),
-                    func.sum(cast(Transaction.is_fraud, Integer)).label('frauds')
-                )
-                .where(Transaction.transaction_hour.isnot(None))
-                .group_by(Transaction.transaction_hour)
-                .order_by(Transaction.transaction_hour)
+                select(bucket_start, func.count(), func.count().filter(Transaction.is_fraud == True))
+                .where(Transaction.timestamp >= start, Transaction.timestamp < end, *filter_conditions(filters))
+                .group_by(bucket_start)
+                .order_by(bucket_start)
             )
-
-            result = await self.db.execute(stmt)
-            rows = result.all()
-
-            # Ensure we have all 24 hours (0-23), fill with 0 if no data
-            hour_data = {row.hour: {
-                "total_transactions": int(row.total or 0),
-                "fraud_transactions": int(row.frauds or 0)
-            } for row in rows}
-
-            return [
-                {
-                    "hour": hour,
-                    "total_transactions": hour_data.get(hour, {}).get("total_transactions", 0),
-                    "fraud_transactions": hour_data.get(hour, {}).get("fraud_transactions", 0)
-                }
-                for hour in range(24)
-            ]
+            return [tuple(row) for row in (await self.db.execute(stmt)).all()]
         except SQLAlchemyError as e:
-            logger.error(f"Error getting hourly transaction stats: {e}")
+            logger.error(f"Erro ao ler série temporal de transações: {e}")
             raise DatabaseException("Error accessing the database") from e
 
@@ -0,0 +1,35 @@
+from fastapi import APIRouter, Depends, Query
+from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.settings.database import get_read_db
+from app.schemas.transaction_schema import CustomerTimelineResponse
+from app.service.transaction_service import TransactionService
+from app.infra.logger import setup_logger
+from app.infra.json_response import FastJSONResponse
+
+router = APIRouter(
+    prefix="/customers",
+    tags=["customers"]
+)
+
+logger = setup_logger(__name__)
+
+def get_transaction_service(db: AsyncSession = Depends(get_read_db)) -> TransactionService:
+    """ Dependency to get the TransactionService for the read-only customer routes (read replica when available). """
+    return TransactionService(db)
+
+@router.get("/{customer_id}/transactions", response_model=CustomerTimelineResponse, response_class=FastJSONResponse)
+async def customer_transactions(customer_id: str, limit: int = Query(20, ge=1, le=100), cursor: Optional[str] = None,
+    service: TransactionService = Depends(get_transaction_service)):
+    """
+    Transaction history of a customer, newest first, with the customer's aggregates.
+
+    - **customer_id**: The customer whose transactions are listed.
+    - **limit**: Maximum number of transactions to return (default is 20, maximum is 100).
+    - **cursor**: `next_cursor` of the previous page; omit it for the most recent transactions.
+
+    Returns the page, `next_cursor` (null on the last page) and the customer's transaction count,
+    total amount in USD and fraud count.
+    """
+    response = await service.get_customer_timeline(customer_id, limit, cursor)
+    return FastJSONResponse(response)
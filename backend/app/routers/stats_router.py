@@ -1,11 +1,15 @@
-from fastapi import APIRouter, Depends, Query
-from typing import List
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import List, Literal, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.settings.database import get_db
+from app.settings.database import get_db, get_read_db
 from app.service.transaction_service import TransactionService
 from app.service.stats_cache_service import StatsCacheService
+from app.service.stats_view_service import StatsViewService
+from app.service.timeseries_service import TransactionTimeseriesService
 from app.infra.logger import setup_logger
-from app.schemas.filter_schema import TransactionFilter
+from app.infra.json_response import FastJSONResponse
+from app.schemas.filter_schema import TimeseriesFilter, TransactionFilter
 import asyncio
 
 router = APIRouter(
@@ -15,17 +19,44 @@ router = APIRouter(
 
 logger = setup_logger(__name__)
 
-def get_transaction_service(db: AsyncSession = Depends(get_db)) -> TransactionService:
-    """ Dependency to get the TransactionService with a database session. """
+def get_transaction_service(db: AsyncSession = Depends(get_read_db)) -> TransactionService:
+    """ Dependency to get the TransactionService for the read-only stats routes (read replica when available). """
     return TransactionService(db)
 
 def get_stats_cache_service(db: AsyncSession = Depends(get_db)) -> StatsCacheService:
     """ Dependency to get the StatsCacheService with a database session. """
     return StatsCacheService(db)
 
+def get_stats_view_service(db: AsyncSession = Depends(get_db)) -> StatsViewService:
+    """ Dependency to get the StatsViewService with a database session. """
+    return StatsViewService(db)
+
+def get_timeseries_service(db: AsyncSession = Depends(get_read_db)) -> TransactionTimeseriesService:
+    """ Dependency to get the TransactionTimeseriesService (read replica when available). """
+    return TransactionTimeseriesService(db)
+
 # ------------------------------------------ Routers
 
-@router.get('/countries')
+@router.get('/timeseries', response_class=FastJSONResponse)
+async def get_stats_timeseries(
+    bucket: Literal["minute", "hour", "day"] = "hour",
+    start: Optional[datetime] = Query(None, alias="from"),
+    end: Optional[datetime] = Query(None, alias="to"),
+    filters: TimeseriesFilter = Depends(),
+    timeseries_service: TransactionTimeseriesService = Depends(get_timeseries_service),
+):
+    """
+    Transaction and fraud counts per time bucket, empty buckets included.
+
+    - **bucket**: minute, hour or day.
+    - **from** / **to**: Range (defaults: the 90 days, or 1 day for minutes, up to the most recent transaction).
+    - **country**, **merchant_category**, **channel**, **high_risk_merchant**: Optional filters.
+
+    Hour and day buckets are summed from the hourly rollup; minute buckets read the transactions and are limited to short ranges.
+    """
+    return FastJSONResponse(await timeseries_service.get_series(bucket, start, end, filters))
+
+@router.get('/countries', response_class=FastJSONResponse)
 async def get_stats_countries( transaction_service : TransactionService = Depends(get_transaction_service)):
     countries = await transaction_service.get_distinct_filter("country")
 
@@ -43,9 +74,9 @@ async def get_stats_countries( transaction_service : TransactionService = Depend
         for country, result in zip(countries, results)
     }
 
-    return response
+    return FastJSONResponse(response)
 
-@router.get('/merchant_category')
+@router.get('/merchant_category', response_class=FastJSONResponse)
 async def get_stats_merchant_category( transaction_service : TransactionService = Depends(get_transaction_service)):
     merchant_category = await transaction_service.get_distinct_filter("merchant_category")
 
@@ -63,9 +94,9 @@ async def get_stats_merchant_category( transaction_service : TransactionService
         for merchant_cat, result in zip(merchant_category, results)
     }
 
-    return response
+    return FastJSONResponse(response)
 
-@router.get('/device')
+@router.get('/device', response_class=FastJSONResponse)
 async def get_stats_device( transaction_service : TransactionService = Depends(get_transaction_service)):
     devices = await transaction_service.get_distinct_filter("device")
 
@@ -83,9 +114,9 @@ async def get_stats_device( transaction_service : TransactionService = Depends(g
         for device, result in zip(devices, results)
     }
 
-    return response
+    return FastJSONResponse(response)
 
-@router.get('/channel')
+@router.get('/channel', response_class=FastJSONResponse)
 async def get_stats_channel( transaction_service : TransactionService = Depends(get_transaction_service)):
     channels = await transaction_service.get_distinct_filter("device")
 
@@ -103,9 +134,9 @@ async def get_stats_channel( transaction_service : TransactionService = Depends(
         for channel, result in zip(channels, results)
     }
 
-    return response
+    return FastJSONResponse(response)
 
-@router.get('/high_risk_merchant')
+@router.get('/high_risk_merchant', response_class=FastJSONResponse)
 async def get_stats_high_risk_merchant( transaction_service : TransactionService = Depends(get_transaction_service)):
     high_risk_merchants = [True, False]
 
@@ -123,9 +154,9 @@ async def get_stats_high_risk_merchant( transaction_service : TransactionService
         for high_risk_merchant, result in zip(high_risk_merchants, results)
     }
 
-    return response
+    return FastJSONResponse(response)
 
-@router.get('/distance_from_home')
+@router.get('/distance_from_home', response_class=FastJSONResponse)
 async def get_stats_distance_from_home( transaction_service : TransactionService = Depends(get_transaction_service)):
      # Boolean field: True and False
     distances = [1, 0]
@@ -144,9 +175,9 @@ async def get_stats_distance_from_home( transaction_service : TransactionService
         for distance, result in zip(distances, results)
     }
 
-    return response
+    return FastJSONResponse(response)
 
-@router.get('/weekend_transaction')
+@router.get('/weekend_transaction', response_class=FastJSONResponse)
 async def get_stats_weekend_transaction( transaction_service : TransactionService = Depends(get_transaction_service)):
     # Boolean field: True and False
     weekend_values = [True, False]
@@ -165,23 +196,23 @@ async def get_stats_weekend_transaction( transaction_service : TransactionServic
         for value, result in zip(weekend_values, results)
     }
 
-    return response
+    return FastJSONResponse(response)
 
-@router.get('/overview')
+@router.get('/overview', response_class=FastJSONResponse)
 async def get_stats_overview( force_refresh: bool = Query(False, description="Force refresh the cache"), stats_cache_service: StatsCacheService = Depends(get_stats_cache_service)):
     """
         Get stats overview. Returns cached data if available and not stale.
         Use force_refresh=true to bypass cache and recompute.
     """
-    return await stats_cache_service.get_stats_overview(force_refresh=force_refresh)
+    return FastJSONResponse(await stats_cache_service.get_stats_overview(force_refresh=force_refresh))
 
-@router.get('/geral_stats')
+@router.get('/geral_stats', response_class=FastJSONResponse)
 async def get_geral_stats( force_refresh: bool = Query(False, description="Force refresh the cache"), stats_cache_service: StatsCacheService = Depends(get_stats_cache_service)):
     """
         Get stats overview. Returns cached data if available and not stale.
         Use force_refresh=true to bypass cache and recompute.
     """
-    return await stats_cache_service.get_geral_stats(force_refresh=force_refresh)
+    return FastJSONResponse(await stats_cache_service.get_geral_stats(force_refresh=force_refresh))
 
 @router.post('/refresh-cache')
 async def refresh_stats_cache(stats_cache_service: StatsCacheService = Depends(get_stats_cache_service)):
@@ -194,3 +225,25 @@ async def refresh_stats_cache(stats_cache_service: StatsCacheService = Depends(g
         "message": "Stats cache refreshed successfully",
         "data": result
     }
+
+@router.get('/views')
+async def get_stats_views_status(stats_view_service: StatsViewService = Depends(get_stats_view_service)):
+    """
+    Stats source in use and the last materialized views refresh (time and duration per view).
+    """
+    return stats_view_service.status()
+
+@router.post('/views/refresh')
+async def refresh_stats_views(stats_view_service: StatsViewService = Depends(get_stats_view_service)):
+    """
+    Refresh the materialized views concurrently (dashboard reads are not blocked) and the cached overview.
+    Only with STATS_SOURCE=materialized_views.
+    """
+    if not stats_view_service.enabled():
+        raise HTTPException(status_code=409, detail="Stats materialized views are disabled (STATS_SOURCE=counters)")
+    report = await stats_view_service.refresh()
+    return {
+        "status": "success" if report else "skipped",
+        "message": "Stats views refreshed" if report else "A refresh is already running",
+        "data": report
+    }
@@ -1,11 +1,21 @@
 # app/routers/transactions.py
-from fastapi import APIRouter, Depends, HTTPException, Query
-from typing import List
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from typing import List, Literal, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.settings.database import get_db
-from app.schemas.transaction_schema import ResponseWithMessage, TransactionCreate, TransactionResponse, TransactionPredictionResponse
+from app.settings.database import get_db, get_read_db, get_read_session_factory, AsyncSessionLocal
+from app.schemas.transaction_schema import (
+    BulkIngestResponse, ResponseWithMessage, TransactionCreate, TransactionResponse, TransactionPredictionResponse,
+    TransactionLookupRequest, TransactionLookupResponse, TransactionPatch, TransactionBulkPatchRequest, BulkPatchResponse, BulkDeleteResponse,
+    TRANSACTION_LIST_ADAPTER, TRANSACTION_LOOKUP_ADAPTER, TRANSACTION_RESPONSE_ADAPTER,
+)
 from app.service.transaction_service import TransactionService
+from app.service.ingest_service import BulkIngestService
+from app.service.export_service import EXPORT_FORMATS, TransactionExportService
+from app.service.stats_view_service import StatsViewService
+from app.service.suggest_service import FilterSuggestService
 from app.infra.logger import setup_logger
+from app.infra.json_response import FastJSONResponse
 from app.schemas.filter_schema import TransactionFilter
 from app.service.user_service import AnalysisService
 from app.repositories.user_repo import AnalysisRepository
@@ -29,6 +39,18 @@ def get_transaction_service(db: AsyncSession = Depends(get_db)) -> TransactionSe
     """ Dependency to get the TransactionService with a database session. """
     return TransactionService(db)
 
+def get_read_transaction_service(db: AsyncSession = Depends(get_read_db)) -> TransactionService:
+    """ Dependency to get the TransactionService for read-only routes (read replica when available). """
+    return TransactionService(db)
+
+def get_bulk_ingest_service(db: AsyncSession = Depends(get_db)) -> BulkIngestService:
+    """ Dependency to get the BulkIngestService with a database session. """
+    return BulkIngestService(db)
+
+def get_export_service(session_factory = Depends(get_read_session_factory)) -> TransactionExportService:
+    """ Dependency to get the TransactionExportService; it opens its own session (replica or primary) for the duration of the stream. """
+    return TransactionExportService(session_factory)
+
 def get_analysis_service(db: AsyncSession = Depends(get_db)) -> AnalysisService:
     """ Dependency to get the ReportService with a ReportRepository. """
     analysis_repo = AnalysisRepository(db)
@@ -37,7 +59,7 @@ def get_analysis_service(db: AsyncSession = Depends(get_db)) -> AnalysisService:
 # --- router ------------------------
 
 @router.get("/count", response_model=ResponseWithMessage)
-async def count_transactions(service: TransactionService = Depends(get_transaction_service)):
+async def count_transactions(service: TransactionService = Depends(get_read_transaction_service)):
     """
     Count the total number of transactions in the database.
 
@@ -50,7 +72,7 @@ async def count_transactions(service: TransactionService = Depends(get_transacti
     )
 
 @router.get("/filtered/count", response_model=ResponseWithMessage)
-async def count_filtered_transactions(filters: TransactionFilter = Depends(), service: TransactionService = Depends(get_transaction_service)):
+async def count_filtered_transactions(filters: TransactionFilter = Depends(), service: TransactionService = Depends(get_read_transaction_service)):
     """
     Count the number of transactions in the database that match the given filters.
     - **filters**: Optional filters to apply (e.g., date range, amount range, merchant).
@@ -62,8 +84,8 @@ async def count_filtered_transactions(filters: TransactionFilter = Depends(), se
         data=response
     )
 
-@router.get("/stats")
-async def transaction_stats(service: TransactionService = Depends(get_transaction_service)):
+@router.get("/stats", response_class=FastJSONResponse)
+async def transaction_stats(service: TransactionService = Depends(get_read_transaction_service)):
     """
     Get statistics about transactions, including total count, fraudulent count, and non-fraudulent count.
 
@@ -71,17 +93,48 @@ async def transaction_stats(service: TransactionService = Depends(get_transactio
     """
     response = await service.get_transaction_stats()
     logger.info(f"Response of router transaction_stats: {response}")
-    return {
+    return FastJSONResponse({
         "total_transactions": response.get("total_transactions", 0),
         "fraudulent_transactions": response.get("fraudulent_transactions", 0),
         "fraud_rate": response.get("fraud_rate", 0.0),
         "average_amount": response.get("avg_amount", 0.0),
         "max_amount": response.get("max_amount", 0),
         "min_amount": response.get("min_amount", 0)
-    }
+    })
+
+@router.get("/export")
+async def export_transactions(filters: TransactionFilter = Depends(), format: Literal["ndjson", "csv", "parquet"] = "ndjson", service: TransactionExportService = Depends(get_export_service)):
+    """
+    Export every transaction matching the filters, without pagination.
+
+    - **filters**: Optional filters to apply (e.g., date range, amount range, merchant).
+    - **format**: `ndjson` (default), `csv` or `parquet`.
+
+    Rows are read from a server-side cursor and streamed in encoded chunks.
+    """
+    stream = await service.export(filters, format)
+    return StreamingResponse(
+        stream,
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="transactions.{format}"'},
+    )
+
+@router.get("/filters/{field}/suggest", response_class=FastJSONResponse)
+async def suggest_filter_values(field: str, q: str = "", limit: int = Query(10, ge=1, le=50)):
+    """
+    Autocomplete for the filter dropdowns: values of `field` starting with `q`, most frequent first.
+
+    - **field**: merchant, city, country, merchant_category, card_type, channel or device.
+    - **q**: Case-insensitive prefix (empty returns the most frequent values).
+    - **limit**: Maximum number of suggestions (default is 10, maximum is 50).
+
+    Served from an in-memory index, no database query. Answers 503 until the index is built at
+    startup, or when suggestions are disabled (SUGGEST_INDEX_REBUILD_INTERVAL_SECONDS=0).
+    """
+    return FastJSONResponse(FilterSuggestService.suggest(field, q, limit))
 
 @router.get("/{transaction_id}/predict", response_model=TransactionPredictionResponse)
-async def predict_transaction(transaction_id: str, service: TransactionService = Depends(get_transaction_service)):
+async def predict_transaction(transaction_id: str, service: TransactionService = Depends(get_read_transaction_service)):
     """
     Predict if a transaction is fraudulent based on its ID.
 
@@ -93,9 +146,9 @@ async def predict_transaction(transaction_id: str, service: TransactionService =
     logger.info(f"Response of router predict_transaction: {response}")
     return response
     
-@router.get("/", response_model=List[TransactionResponse])
+@router.get("/", response_model=List[TransactionResponse], response_class=FastJSONResponse)
 async def list_transactions(filters: TransactionFilter = Depends(), include_predictions : bool = False, limit: int = Query(20, ge=1, le=100),
-    skip: int = Query(0, ge=0) ,service: TransactionService = Depends(get_transaction_service),):
+    skip: int = Query(0, ge=0) ,service: TransactionService = Depends(get_read_transaction_service),):
     """
     List transactions with optional filtering and pagination.
     
@@ -104,11 +157,16 @@ async def list_transactions(filters: TransactionFilter = Depends(), include_pred
     - **skip**: Number of transactions to skip for pagination (default is 0).
     
     Returns a list of transactions matching the criteria."""
+    if not include_predictions:
+        # Read-only fast path: rows are already shaped like TransactionResponse, so the
+        # response is returned directly and FastAPI skips re-validating it (the schema stays documented)
+        rows = await service.get_transactions_projection(filters, limit, skip)
+        return FastJSONResponse(rows)
     response_list = await service.get_transactions(filters, limit, skip, include_predictions)
-    return response_list
+    return FastJSONResponse.from_model(TRANSACTION_LIST_ADAPTER, response_list)
 
-@router.get("/{transaction_id}", response_model=TransactionResponse)
-async def get_transaction(transaction_id: str, include_predictions : bool = False, service: TransactionService = Depends(get_transaction_service)):
+@router.get("/{transaction_id}", response_model=TransactionResponse, response_class=FastJSONResponse)
+async def get_transaction(transaction_id: str, include_predictions : bool = False, service: TransactionService = Depends(get_read_transaction_service)):
     """
     Get a transaction by its ID.
     
@@ -118,7 +176,21 @@ async def get_transaction(transaction_id: str, include_predictions : bool = Fals
     """
     response = await service.get_transaction_id(transaction_id)
     logger.info(f"Response of get transaction_id {transaction_id}: {response}")
-    return response
+    return FastJSONResponse.from_model(TRANSACTION_RESPONSE_ADAPTER, response)
+
+@router.post("/lookup", response_model=TransactionLookupResponse, response_class=FastJSONResponse)
+async def lookup_transactions(lookup: TransactionLookupRequest, service: TransactionService = Depends(get_read_transaction_service)):
+    """
+    Fetch many transactions by ID in a single query.
+
+    - **ids**: Transaction IDs (1 to 1000).
+    - **include_predictions**: Add the fraud probability, predicted for the whole batch at once.
+
+    Returns the transactions in the order of `ids` and the IDs that were not found.
+    """
+    response = await service.get_transactions_by_ids(lookup.ids, lookup.include_predictions)
+    logger.info(f"Lookup of {len(lookup.ids)} transactions: {len(response.missing)} missing")
+    return FastJSONResponse.from_model(TRANSACTION_LOOKUP_ADAPTER, response)
 
 @router.post("/create_transaction", response_model=ResponseWithMessage)
 async def create_new_transaction(new_transaction: TransactionCreate, service: TransactionService = Depends(get_transaction_service)):
@@ -135,6 +207,41 @@ async def create_new_transaction(new_transaction: TransactionCreate, service: Tr
         data=response
     )
 
+@router.post("/bulk", response_model=BulkIngestResponse)
+async def bulk_create_transactions(request: Request, background_tasks: BackgroundTasks, format: Optional[Literal["ndjson", "csv"]] = None, service: BulkIngestService = Depends(get_bulk_ingest_service)):
+    """
+    Bulk load transactions from an NDJSON or CSV request body.
+
+    - **format**: `ndjson` or `csv`; when omitted it is taken from the Content-Type (`text/csv` means CSV).
+
+    Rows are validated in chunks, loaded with COPY and merged skipping the transaction ids already stored.
+    Returns the number of received, inserted, duplicate and rejected (invalid or unparseable) rows.
+    With STATS_SOURCE=materialized_views the stats views are refreshed after the response is sent.
+    """
+    if format is None:
+        content_type = request.headers.get("content-type", "")
+        format = "csv" if "csv" in content_type else "ndjson"
+    response = await service.ingest(request.stream(), format)
+    logger.info(f"Bulk ingest finished: {response}")
+    if response["inserted"] and StatsViewService.enabled():
+        background_tasks.add_task(StatsViewService.refresh_with, AsyncSessionLocal)
+    return BulkIngestResponse(**response)
+
+@router.delete("/", response_model=BulkDeleteResponse)
+async def delete_transactions(background_tasks: BackgroundTasks, filters: TransactionFilter = Depends(), service: TransactionService = Depends(get_transaction_service)):
+    """
+    Delete every transaction matching the filters, with its analysis rows.
+
+    - **filters**: Same filters as the listing; at least one is required.
+
+    Rows are deleted in batches of DELETE_BATCH_ROWS, one commit per batch.
+    Returns how many transactions (and how many of them frauds) and analyses were deleted.
+    """
+    response = await service.delete_transactions(filters)
+    if response["deleted"] and StatsViewService.enabled():
+        background_tasks.add_task(StatsViewService.refresh_with, AsyncSessionLocal)
+    return BulkDeleteResponse(**response)
+
 @router.delete("/{transaction_id}", response_model=ResponseWithMessage)
 async def delete_transaction(transaction_id: str, service: TransactionService = Depends(get_transaction_service)):
     """
@@ -167,6 +274,38 @@ async def update_transaction(transaction_id: str, updated_transaction: Transacti
         data=response
     )
 
+@router.patch("/bulk", response_model=BulkPatchResponse)
+async def bulk_patch_transactions(request: TransactionBulkPatchRequest, background_tasks: BackgroundTasks, service: TransactionService = Depends(get_transaction_service)):
+    """
+    Apply many partial updates (e.g. relabeling fraud verdicts) in one transaction.
+
+    - **updates**: Up to 50000 objects with a `transaction_id` and the fields to change; null fields are ignored.
+
+    Changes touching the same fields are written by a single `UPDATE ... FROM (VALUES ...)` statement.
+    Returns how many transactions were updated and the IDs that do not exist.
+    """
+    changes = [item.model_dump(exclude_unset=True, exclude_none=True) for item in request.updates]
+    response = await service.bulk_patch_transactions(changes)
+    if response["updated"] and StatsViewService.enabled():
+        background_tasks.add_task(StatsViewService.refresh_with, AsyncSessionLocal)
+    return BulkPatchResponse(**response)
+
+@router.patch("/{transaction_id}", response_model=ResponseWithMessage)
+async def patch_transaction(transaction_id: str, patch: TransactionPatch, service: TransactionService = Depends(get_transaction_service)):
+    """
+    Partially update a transaction: only the fields sent are written (null fields are ignored).
+
+    - **transaction_id**: The ID of the transaction to update.
+    - **patch**: The fields to change, e.g. `{"is_fraud": true}`.
+
+    Returns the updated transaction, read back from the same `UPDATE ... RETURNING` statement.
+    """
+    response = await service.patch_transaction(transaction_id, patch.model_dump(exclude_unset=True, exclude_none=True))
+    return ResponseWithMessage(
+        message=f"Transaction with id {transaction_id} updated successfully",
+        data=response
+    )
+
 @router.get("/analysis/transaction_id")
 async def get_analysis_by_transaction_id(transaction_id: str, analysis_service: AnalysisService = Depends(get_analysis_service), service: TransactionService = Depends(get_transaction_service)):
     try:
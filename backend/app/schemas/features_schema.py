@@ -26,6 +26,16 @@ conversion_rates = {
     'USD': 1.0
 }
 
+# Rate of a currency missing from conversion_rates
+DEFAULT_USD_RATE = 1.28
+
+# Rules of the derived features, shared by extract_features and the generated columns of transactions
+BUSINESS_HOURS = (9, 17)  # off hours: before the first or after the last
+HIGH_AMOUNT_USD = 1000
+LOW_AMOUNT_USD = 100
+SUSPICIOUS_DEVICES = ["NFC Payment", "Magnetic Stripe", "Chip Reader"]
+HIGH_RISK_COUNTRIES = ["Brazil", "Mexico", "Nigeria", "Russia"]
+
 KEYMAP = {
     "device_android_app": "device_Android App",
     "device_ios_app": "device_iOS App",
@@ -21,7 +21,31 @@ class TransactionFilter(BaseModel):
     start_date: Optional[datetime] = None
     end_date: Optional[datetime] = None
     is_fraud: Optional[bool] = None
+    # Derived features (generated columns, see FEATURE_FLAGS)
+    is_off_hours: Optional[bool] = None
+    is_high_amount: Optional[bool] = None
+    is_low_amount: Optional[bool] = None
+    suspicious_device: Optional[bool] = None
+    high_risk_transaction: Optional[bool] = None
+    # Ranges (inclusive) over the typed velocity columns (velocity_last_hour)
+    min_velocity_num_transactions: Optional[int] = None
+    max_velocity_num_transactions: Optional[int] = None
+    min_velocity_total_amount: Optional[float] = None
+    max_velocity_total_amount: Optional[float] = None
+    min_velocity_unique_merchants: Optional[int] = None
+    max_velocity_unique_merchants: Optional[int] = None
+    min_velocity_unique_countries: Optional[int] = None
+    max_velocity_unique_countries: Optional[int] = None
+    min_velocity_max_single_amount: Optional[float] = None
+    max_velocity_max_single_amount: Optional[float] = None
 
 class TransactionTypeFilter(BaseModel):
     """Schema for filtering transactions by type."""
-    transaction_type: Optional[str] = None
\ No newline at end of file
+    transaction_type: Optional[str] = None
+
+class TimeseriesFilter(BaseModel):
+    """Filters of /stats/timeseries: the dimensions of the hourly rollup (see app/models/rollup_model.py)."""
+    country: Optional[str] = None
+    merchant_category: Optional[str] = None
+    channel: Optional[str] = None
+    high_risk_merchant: Optional[bool] = None
@@ -2,7 +2,7 @@ from __future__ import annotations
 import datetime
 from typing import List, Literal, Optional
 import numpy as np
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
 
 class TransactionRequest(BaseModel):
     channel: str
@@ -48,10 +48,38 @@ class TransactionResponse(BaseModel):
     is_fraud: bool
     fraud_probability: float
 
+class CustomerSummary(BaseModel):
+    transaction_count: int
+    total_amount_usd: float
+    fraud_count: int
+    fraud_rate: float
+    first_seen: datetime.datetime
+    last_seen: datetime.datetime
+
+class CustomerTimelineResponse(BaseModel):
+    customer_id: str
+    summary: CustomerSummary
+    transactions: List[TransactionResponse]
+    next_cursor: Optional[str] = None
+
+class TransactionLookupRequest(BaseModel):
+    ids: List[str] = Field(..., min_length=1, max_length=1000)
+    include_predictions: bool = False
+
+class TransactionLookupResponse(BaseModel):
+    transactions: List[TransactionResponse]
+    missing: List[str]
+
 class ResponseWithMessage(BaseModel):
     message: str
     data: TransactionResponse | str | None | dict
 
+class BulkIngestResponse(BaseModel):
+    received: int
+    inserted: int
+    duplicates: int
+    rejected: int
+
 class TransactionCreate(BaseModel):
     transaction_id : str 
     customer_id: str
@@ -77,6 +105,51 @@ class TransactionCreate(BaseModel):
     weekend_transaction: bool
     velocity_last_hour: VelocityResponse 
 
+class TransactionPatch(BaseModel):
+    """Partial update: only the fields that are sent are written."""
+    model_config = ConfigDict(extra="forbid")
+
+    customer_id: Optional[str] = None
+    card_number: Optional[str] = None
+    timestamp: Optional[datetime.datetime] = None
+    merchant: Optional[str] = None
+    merchant_category: Optional[str] = None
+    merchant_type: Optional[str] = None
+    amount: Optional[float] = None
+    currency: Optional[str] = None
+    country: Optional[str] = None
+    city: Optional[str] = None
+    city_size: Optional[str] = None
+    card_type: Optional[str] = None
+    card_present: Optional[int] = None
+    device: Optional[str] = None
+    channel: Optional[str] = None
+    device_fingerprint: Optional[str] = None
+    ip_address: Optional[str] = None
+    distance_from_home: Optional[int] = None
+    high_risk_merchant: Optional[bool] = None
+    transaction_hour: Optional[int] = None
+    weekend_transaction: Optional[bool] = None
+    velocity_last_hour: Optional[VelocityResponse] = None
+    is_fraud: Optional[bool] = None
+
+class TransactionBulkPatchItem(TransactionPatch):
+    transaction_id: str
+
+class TransactionBulkPatchRequest(BaseModel):
+    updates: List[TransactionBulkPatchItem] = Field(..., min_length=1, max_length=50000)
+
+class BulkPatchResponse(BaseModel):
+    requested: int
+    updated: int
+    missing: List[str]
+
+class BulkDeleteResponse(BaseModel):
+    deleted: int
+    fraud_deleted: int
+    analysis_deleted: int
+    batches: int
+
 class VelocityResponse(BaseModel):
     num_transactions: int 
     total_amount: float
@@ -84,7 +157,7 @@ class VelocityResponse(BaseModel):
     unique_countries: int
     max_single_amount: float
 
-
-
-
-
+# Precomputed serializers for FastJSONResponse.from_model
+TRANSACTION_RESPONSE_ADAPTER = TypeAdapter(TransactionResponse)
+TRANSACTION_LIST_ADAPTER = TypeAdapter(List[TransactionResponse])
+TRANSACTION_LOOKUP_ADAPTER = TypeAdapter(TransactionLookupResponse)
@@ -0,0 +1,226 @@
+import asyncio
+import os
+from datetime import date, datetime, timedelta
+from typing import AsyncIterator, Callable, List, Optional
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+from sqlalchemy import column, delete, exists, func, select, table
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.transaction_model import FEATURE_FLAGS, VELOCITY_COLUMNS, Transaction
+from app.models.user_model import Analysis
+from app.repositories.partition_repo import PartitionRepository
+from app.repositories.transaction_repo import transaction_cache
+from app.schemas.filter_schema import TransactionFilter
+from app.service.partition_service import PartitionService, add_months, partition_month
+from app.infra.parquet_archive import ArchiveFile, ParquetArchive, publish, sample_ids
+from app.exception.transaction_exceptions import DatabaseException
+from app.settings.config import settings
+from app.infra.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+transaction_archive = ParquetArchive(settings.ARCHIVE_DIR)
+
+# Transaction ids of a leftover .tmp file looked up to tell whether its rows were deleted from Postgres
+RECOVERY_SAMPLE_IDS = 1000
+
+# Same semantics as transaction_repo.filter_conditions (ILIKE '%value%' -> case-insensitive substring)
+_SUBSTRING_FILTERS = ["country", "city", "merchant_category", "merchant", "card_type", "channel", "device"]
+_EQUALITY_FILTERS = ["customer_id", "distance_from_home", "high_risk_merchant", "weekend_transaction", "is_fraud", *FEATURE_FLAGS]
+
+def archive_expression(filters: TransactionFilter) -> Optional[ds.Expression]:
+    """Translate a TransactionFilter into a pyarrow filter over the archived files."""
+    conditions = []
+    if filters.start_date:
+        conditions.append(ds.field("timestamp") >= filters.start_date)
+    if filters.end_date:
+        conditions.append(ds.field("timestamp") <= filters.end_date)
+    for name in _SUBSTRING_FILTERS:
+        value = getattr(filters, name)
+        if value:
+            conditions.append(pc.match_substring(ds.field(name), value, ignore_case=True))
+    for name in _EQUALITY_FILTERS:
+        value = getattr(filters, name)
+        if value is not None and value != "":
+            conditions.append(ds.field(name) == value)
+    if filters.card_present is not None:
+        conditions.append(ds.field("card_present") == bool(filters.card_present))
+    if filters.min_amount is not None:
+        conditions.append(ds.field("amount_usd") >= filters.min_amount)
+    if filters.max_amount is not None:
+        conditions.append(ds.field("amount_usd") <= filters.max_amount)
+    for name in VELOCITY_COLUMNS.values():
+        low, high = getattr(filters, f"min_{name}"), getattr(filters, f"max_{name}")
+        if low is not None:
+            conditions.append(ds.field(name) >= low)
+        if high is not None:
+            conditions.append(ds.field(name) <= high)
+    if not conditions:
+        return None
+    expression = conditions[0]
+    for condition in conditions[1:]:
+        expression = expression & condition
+    return expression
+
+async def scan_archive(filters: TransactionFilter, batch_rows: int) -> AsyncIterator[List[dict]]:
+    """Archived transactions matching `filters`, as lists of dicts; file reads run off the event loop."""
+    batches = transaction_archive.scan(archive_expression(filters), filters.start_date, filters.end_date, batch_rows)
+    while (batch := await asyncio.to_thread(next, batches, None)) is not None:
+        if batch.num_rows:
+            yield batch.to_pylist()
+
+def _month_start(month: date) -> datetime:
+    return datetime.combine(month, datetime.min.time())
+
+def _month_end(month: date) -> datetime:
+    return datetime.combine(add_months(month, 1), datetime.min.time())
+
+def rows_file_name(month: date, end: datetime) -> str:
+    """
+    Name of the file holding the rows of `month` before `end`: a re-run of the same range writes the same
+    .tmp file. Rows written later into a range already published (backdated) get a file of their own.
+    """
+    name = f"rows-until-{end:%Y%m%dT%H%M%S}"
+    published = {os.path.basename(path) for path in transaction_archive.files(_month_start(month), _month_start(month))}
+    suffix = 1
+    while f"{name}.parquet" in published:
+        suffix += 1
+        name = f"rows-until-{end:%Y%m%dT%H%M%S}-{suffix}"
+    return name
+
+class TransactionArchiveService:
+    """
+    Moves transactions older than ARCHIVE_AFTER_DAYS from Postgres to Parquet files (see
+    app/infra/parquet_archive.py). Rows are only removed from Postgres once the file holds
+    exactly as many rows as the source:
+    - monthly partitions entirely before the horizon are detached first (so nothing can be written
+      to them any more), copied, verified and dropped; tables detached earlier by
+      PARTITION_RETENTION_MONTHS are archived the same way;
+    - the remaining old rows (the month the horizon falls in, the default partition) are copied
+      month by month from a REPEATABLE READ snapshot and deleted in that same snapshot, so a row
+      written meanwhile is neither archived nor deleted.
+    The analysis rows of archived transactions are deleted with them, as the retention purge does.
+    Files are published (renamed from .tmp) only after the commit; a .tmp file left by a run that
+    stopped in between is published by the next run if its rows are gone from Postgres, dropped otherwise.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.partitions = PartitionRepository(db)
+
+    async def archive(self, now: Optional[datetime] = None) -> dict:
+        if settings.ARCHIVE_AFTER_DAYS <= 0:
+            return {"tables": [], "rows": 0}
+
+        horizon = (now or datetime.now()) - timedelta(days=settings.ARCHIVE_AFTER_DAYS)
+        await self._recover_files()
+        if await self.partitions.is_partitioned():
+            for name in await self.partitions.list_partitions():
+                month = partition_month(name)
+                if month is not None and _month_end(month) <= horizon:
+                    await self.partitions.detach_partition(name)
+                    PartitionService._known_months.discard(month)
+
+        tables, rows = [], 0
+        for name in await self.partitions.list_detached_partitions():
+            rows += await self._archive_table(name)
+            tables.append(name)
+        rows += await self._archive_rows(horizon)
+
+        summary = {"tables": tables, "rows": rows}
+        if rows:
+            logger.info(f"Archived transactions before {horizon.isoformat()}: {summary}")
+        return summary
+
+    @classmethod
+    async def archive_with(cls, session_factory: Callable[[], AsyncSession]) -> dict:
+        """Archive in a session of its own (scheduler job)."""
+        async with session_factory() as session:
+            return await cls(session).archive()
+
+    async def _archive_table(self, name: str) -> int:
+        """Copy a detached monthly table to <month>/<name>.parquet, verify and drop it."""
+        source = table(name, *[column(c.name, c.type) for c in Transaction.__table__.columns])
+        expected = (await self.db.execute(select(func.count()).select_from(source))).scalar_one()
+        archive_file = transaction_archive.new_file(partition_month(name), name, settings.ARCHIVE_ROW_GROUP_ROWS)
+        await self._copy(select(*source.columns).order_by(source.c.timestamp), archive_file, expected)
+        await self.db.commit()
+
+        archive_file.publish()
+        while await self.partitions.delete_analysis_batch(name, settings.DELETE_BATCH_ROWS) > 0:
+            pass
+        await self.partitions.drop_table(name)
+        return expected
+
+    async def _archive_rows(self, horizon: datetime) -> int:
+        month = func.date_trunc("month", Transaction.timestamp).label("month")
+        stmt = select(month).where(Transaction.timestamp < horizon).group_by(month).order_by(month)
+        months = [row[0].date() for row in (await self.db.execute(stmt)).all()]
+        await self.db.commit()
+
+        archived = 0
+        for month in months:
+            archived += await self._archive_month(month, min(_month_end(month), horizon))
+        return archived
+
+    async def _archive_month(self, month: date, end: datetime) -> int:
+        in_range = [Transaction.timestamp >= _month_start(month), Transaction.timestamp < end]
+        archive_file = transaction_archive.new_file(month, rows_file_name(month, end), settings.ARCHIVE_ROW_GROUP_ROWS)
+        try:
+            # Count, copy and delete see the same snapshot
+            await self.db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+            expected = (await self.db.execute(select(func.count()).select_from(Transaction).where(*in_range))).scalar_one()
+            columns = list(Transaction.__table__.columns)
+            await self._copy(select(*columns).where(*in_range).order_by(Transaction.timestamp), archive_file, expected)
+            gone = delete(Transaction).where(*in_range).returning(Transaction.transaction_id).cte("gone")
+            removed_analysis = (
+                delete(Analysis)
+                .where(Analysis.transaction_id.in_(select(gone.c.transaction_id)))
+                .returning(Analysis.id)
+                .cte("removed_analysis")
+            )
+            deleted, _ = (await self.db.execute(select(
+                select(func.count()).select_from(gone).scalar_subquery(),
+                select(func.count()).select_from(removed_analysis).scalar_subquery(),
+            ))).one()
+            if deleted != expected:
+                raise DatabaseException(f"Archive of {month:%Y-%m}: deleted {deleted} rows, archived {expected}")
+            await self.db.commit()
+        except Exception:
+            await self.db.rollback()
+            archive_file.discard()
+            raise
+
+        transaction_cache.invalidate()
+        archive_file.publish()
+        return expected
+
+    async def _recover_files(self) -> None:
+        """Publish or drop the .tmp files of a run that stopped between writing and publishing them."""
+        for tmp_path in transaction_archive.unpublished():
+            name = os.path.basename(tmp_path)[:-len(".parquet.tmp")]
+            ids = await asyncio.to_thread(sample_ids, tmp_path, RECOVERY_SAMPLE_IDS)
+            # Detached tables are archived again (same file name) until they are dropped
+            committed = partition_month(name) is None and ids is not None and not (await self.db.execute(
+                select(exists().where(Transaction.transaction_id.in_(ids)))
+            )).scalar_one()
+            await self.db.commit()
+            if committed:
+                publish(tmp_path)
+                logger.info(f"Published archive file left unpublished by a previous run: {tmp_path}")
+            else:
+                os.remove(tmp_path)
+
+    async def _copy(self, stmt, archive_file: ArchiveFile, expected: int) -> None:
+        """Stream `stmt` into `archive_file` (one row group per batch) and check the rows in its footer."""
+        batch_rows = settings.ARCHIVE_ROW_GROUP_ROWS
+        try:
+            result = await self.db.stream(stmt.execution_options(yield_per=batch_rows))
+            async for rows in result.partitions(batch_rows):
+                await asyncio.to_thread(archive_file.write, rows)
+            written = await asyncio.to_thread(archive_file.close)
+            if not written == archive_file.rows == expected:
+                raise DatabaseException(f"Archive file {archive_file.path}: {written} rows written, {expected} expected")
+        except Exception:
+            archive_file.discard()
+            raise
@@ -0,0 +1,61 @@
+from typing import Callable, Dict, List, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.currency_model import usd_rate_expression
+from app.models.transaction_model import Transaction, velocity_column_expressions
+from app.repositories.transaction_repo import TransactionRepository
+from app.settings.config import settings
+from app.infra.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Columns derived from data the rows already hold, filled for rows written without them (before the
+# columns existed, or by a writer that does not set them):
+# name -> (conditions of the rows still to fill, column -> SQL expression of its value)
+# Each pending condition has a partial index (ix_transactions_*_pending in transaction_model).
+BACKFILLS: Dict[str, Tuple[List, Dict]] = {
+    "velocity": (
+        [Transaction.velocity_num_transactions.is_(None), Transaction.velocity_last_hour.isnot(None)],
+        velocity_column_expressions(),
+    ),
+    "usd_amount": (
+        [Transaction.usd_rate.is_(None)],
+        {
+            "usd_rate": usd_rate_expression(Transaction.currency, Transaction.timestamp),
+            "amount_usd": Transaction.amount * usd_rate_expression(Transaction.currency, Transaction.timestamp),
+        },
+    ),
+}
+
+class ColumnBackfillService:
+    """
+    Fills the BACKFILLS columns of existing transactions in keyset batches of BACKFILL_BATCH_ROWS,
+    each committed on its own, so adding a column never means one long UPDATE of the whole table.
+    Every run checks each backfill again: rows may have been written without the columns since.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.repo = TransactionRepository(db)
+
+    async def run(self) -> Dict[str, int]:
+        """Rows filled per backfill in this run."""
+        filled = {}
+        for name, (pending, values) in BACKFILLS.items():
+            if not await self.repo.exists_where(pending):
+                continue
+            filled[name] = await self._backfill(pending, values)
+            logger.info(f"Backfill '{name}': {filled[name]} rows filled")
+        return filled
+
+    async def _backfill(self, pending: List, values: Dict) -> int:
+        filled, after = 0, ""
+        while True:
+            after, updated = await self.repo.backfill_batch(values, pending, after, settings.BACKFILL_BATCH_ROWS)
+            if after is None:
+                return filled
+            filled += updated
+
+    @classmethod
+    async def run_with(cls, session_factory: Callable[[], AsyncSession]) -> Dict[str, int]:
+        """Run in a session of its own (scheduler job)."""
+        async with session_factory() as session:
+            return await cls(session).run()
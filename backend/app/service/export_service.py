@@ -0,0 +1,156 @@
+import csv
+import io
+import json
+from typing import AsyncIterator, Callable, List
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.transaction_model import Transaction
+from app.repositories.transaction_repo import filter_conditions
+from app.service.archive_service import scan_archive
+from app.infra.parquet_archive import json_column_names, rows_to_table, transaction_schema
+from app.schemas.filter_schema import TransactionFilter
+from app.exception.transaction_exceptions import TransactionInvalidDataError
+from app.settings.config import settings
+from app.infra.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+def _export_columns() -> list:
+    """Every transactions column, with the card number masked in SQL like in TransactionService.mask_card."""
+    columns = []
+    for column in Transaction.__table__.columns:
+        if column.name == "card_number":
+            masked = func.concat(func.repeat("*", func.greatest(func.length(column) - 4, 0)), func.right(column, 4))
+            columns.append(masked.label("card_number"))
+        else:
+            columns.append(column)
+    return columns
+
+def _json_default(value):
+    return value.isoformat() if hasattr(value, "isoformat") else str(value)
+
+def _mask_card(value: str) -> str:
+    return "*" * max(len(value) - 4, 0) + value[-4:]
+
+class _StreamSink:
+    """Write-only file object handed to the Parquet writer; the bytes written are drained after every row group."""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+class TransactionExportService:
+    """
+    Streams filtered transactions from a Postgres server-side cursor, encoding one batch of
+    EXPORT_BATCH_ROWS rows at a time, so memory does not depend on the size of the result.
+    Transactions already moved to the Parquet archive (see archive_service.py) are streamed
+    first, so a date range reaching back before the archive horizon is still complete.
+    """
+
+    def __init__(self, session_factory: Callable[[], AsyncSession]):
+        # The export outlives the request-scoped session, so it opens its own
+        self.session_factory = session_factory
+
+    async def export(self, filters: TransactionFilter, fmt: str) -> AsyncIterator[bytes]:
+        if fmt not in EXPORT_FORMATS:
+            raise TransactionInvalidDataError(name="Invalid format", message=f"Unsupported export format '{fmt}'")
+        encoder = {"ndjson": self._encode_ndjson, "csv": self._encode_csv, "parquet": self._encode_parquet}[fmt]
+        return encoder(self._batches(filters))
+
+    async def _batches(self, filters: TransactionFilter) -> AsyncIterator[List[tuple]]:
+        batch_rows = settings.EXPORT_BATCH_ROWS
+        stmt = (
+            select(*_export_columns())
+            .where(*filter_conditions(filters))
+            .execution_options(yield_per=batch_rows)
+        )
+        exported = 0
+        names = self._names()
+        async for records in scan_archive(filters, batch_rows):
+            exported += len(records)
+            yield [self._archived_row(record, names) for record in records]
+
+        async with self.session_factory() as session:
+            result = await session.stream(stmt)
+            async for partition in result.partitions(batch_rows):
+                exported += len(partition)
+                yield partition
+        logger.info(f"Exported {exported} transactions")
+
+    @staticmethod
+    def _archived_row(record: dict, names: List[str]) -> tuple:
+        """Archived record -> row shaped like the SQL export (masked card, JSON decoded)."""
+        if record.get("card_number"):
+            record["card_number"] = _mask_card(record["card_number"])
+        for name in json_column_names():
+            if record.get(name) is not None:
+                record[name] = json.loads(record[name])
+        return tuple(record.get(name) for name in names)
+
+    @staticmethod
+    def _names() -> List[str]:
+        return [column.name for column in Transaction.__table__.columns]
+
+    async def _encode_ndjson(self, batches: AsyncIterator[List[tuple]]) -> AsyncIterator[bytes]:
+        names = self._names()
+        async for rows in batches:
+            yield "".join(json.dumps(dict(zip(names, row)), default=_json_default) + "\n" for row in rows).encode()
+
+    async def _encode_csv(self, batches: AsyncIterator[List[tuple]]) -> AsyncIterator[bytes]:
+        names = self._names()
+        json_columns = [i for i, column in enumerate(Transaction.__table__.columns) if isinstance(column.type, JSONB)]
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(names)
+        async for rows in batches:
+            for row in rows:
+                if json_columns:
+                    row = list(row)
+                    for i in json_columns:
+                        row[i] = json.dumps(row[i]) if row[i] is not None else None
+                writer.writerow(row)
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue().encode()
+
+    async def _encode_parquet(self, batches: AsyncIterator[List[tuple]]) -> AsyncIterator[bytes]:
+        schema = transaction_schema()
+        json_columns = json_column_names()
+        sink = _StreamSink()
+        # One row group per batch of EXPORT_BATCH_ROWS rows
+        with pq.ParquetWriter(pa.PythonFile(sink, mode="w"), schema, compression="zstd") as writer:
+            async for rows in batches:
+                writer.write_table(rows_to_table(rows, schema, json_columns))
+                yield sink.drain()
+        yield sink.drain()
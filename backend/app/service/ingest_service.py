@@ -0,0 +1,236 @@
+import ast
+import csv
+import io
+import json
+import warnings
+from typing import Any, AsyncIterator, List, Optional, Tuple
+import pandas as pd
+from pandas.errors import ParserError, ParserWarning
+from sqlalchemy import Boolean, DateTime, Float, Integer, String
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.transaction_model import USD_COLUMNS, VELOCITY_COLUMNS, Transaction
+from app.repositories.transaction_repo import TransactionRepository
+from app.service.partition_service import PartitionService
+from app.service.suggest_service import FilterSuggestService
+from app.exception.transaction_exceptions import TransactionInvalidDataError
+from app.settings.config import settings
+from app.infra.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+SUPPORTED_FORMATS = ("ndjson", "csv")
+
+# Columns loaded by COPY, in table order (generated columns and USD_COLUMNS are computed by Postgres)
+INGEST_COLUMNS: List[str] = [c.name for c in Transaction.__table__.columns if c.computed is None and c.name not in USD_COLUMNS]
+REQUIRED_COLUMNS: List[str] = [c.name for c in Transaction.__table__.columns if c.computed is None and not c.nullable]
+
+_BOOL_VALUES = {"true": True, "1": True, "1.0": True, "t": True, "yes": True,
+                "false": False, "0": False, "0.0": False, "f": False, "no": False}
+
+def _parse_velocity(value: Any) -> Any:
+    """velocity_last_hour arrives as a dict (NDJSON), a JSON string or a Python dict repr (raw CSV)."""
+    if value is None or (isinstance(value, float) and pd.isna(value)) or value == "":
+        return None
+    if isinstance(value, dict):
+        return value
+    try:
+        return json.loads(value)
+    except (TypeError, ValueError):
+        pass
+    try:
+        return ast.literal_eval(str(value))
+    except (ValueError, SyntaxError):
+        return None
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+def _fill_velocity_columns(df: pd.DataFrame, velocity: pd.Series) -> None:
+    """
+    Typed velocity columns (VELOCITY_COLUMNS) not sent as such are taken from the parsed velocity_last_hour,
+    with the rules of velocity_columns_from (missing or non-numeric entries count as 0).
+    """
+    velocity = velocity.dropna()
+    if velocity.empty:
+        return
+    records = pd.DataFrame.from_records([value if isinstance(value, dict) else {} for value in velocity], index=velocity.index)
+    for key, name in VELOCITY_COLUMNS.items():
+        if key in records:
+            entries = records[key]
+            if entries.dtype.kind not in "if":
+                # Mixed values (strings, booleans...): only real numbers count
+                entries = pd.to_numeric(entries.where(entries.map(_is_number)), errors="coerce")
+            values = entries.fillna(0)
+        else:
+            values = pd.Series(0, index=velocity.index)
+        if df[name].dtype == "Int64":
+            values = values.round()
+        df[name] = df[name].fillna(values.astype(df[name].dtype))
+
+def normalize_chunk(df: pd.DataFrame) -> Tuple[pd.DataFrame, int]:
+    """
+    Vectorized validation and type coercion of one chunk of raw rows.
+    Args:
+        df (pd.DataFrame): Raw rows, any column order; unknown columns are ignored.
+    Returns:
+        Tuple[pd.DataFrame, int]: The valid rows with INGEST_COLUMNS in order, and the number of rejected rows.
+    """
+    df = df.reindex(columns=INGEST_COLUMNS)
+    valid = pd.Series(True, index=df.index)
+    velocity = pd.Series(None, index=df.index, dtype=object)
+
+    for name in INGEST_COLUMNS:
+        column = Transaction.__table__.c[name]
+        raw = df[name]
+
+        if isinstance(column.type, DateTime):
+            series = pd.to_datetime(raw, errors="coerce", utc=True, format="ISO8601").dt.tz_localize(None)
+        elif isinstance(column.type, Float):
+            series = pd.to_numeric(raw, errors="coerce")
+        elif isinstance(column.type, Integer):
+            numeric = pd.to_numeric(raw, errors="coerce")
+            valid &= numeric.isna() | (numeric == numeric.round())
+            series = numeric.round().astype("Int64")
+        elif isinstance(column.type, Boolean):
+            series = raw.astype(str).str.strip().str.lower().map(_BOOL_VALUES)
+            if column.default is not None:
+                series = series.where(raw.notna(), column.default.arg)
+        elif isinstance(column.type, JSONB):
+            velocity = raw.map(_parse_velocity, na_action="ignore")
+            series = velocity.map(json.dumps, na_action="ignore")
+        else:
+            series = raw.astype("string")
+            if isinstance(column.type, String) and column.type.length:
+                valid &= series.isna() | (series.str.len() <= column.type.length)
+
+        # A value that was present but could not be coerced makes the whole row invalid
+        valid &= raw.isna() | series.notna()
+        df[name] = series
+
+    _fill_velocity_columns(df, velocity)
+    valid &= df[REQUIRED_COLUMNS].notna().all(axis=1)
+    return df[valid], int((~valid).sum())
+
+def to_records(df: pd.DataFrame) -> List[tuple]:
+    """Rows as plain Python tuples (None for missing values), as expected by asyncpg COPY."""
+    return list(df.astype(object).where(df.notna(), None).itertuples(index=False, name=None))
+
+_PARSE_ERRORS = (ValueError, ParserError, ParserWarning)
+
+def _parse_lines(lines: List[bytes], fmt: str, header: Optional[bytes]) -> pd.DataFrame:
+    if fmt == "csv":
+        with warnings.catch_warnings():
+            # A first row with more fields than the header would otherwise be read with shifted columns
+            warnings.simplefilter("error", ParserWarning)
+            return pd.read_csv(io.BytesIO(header + b"\n" + b"\n".join(lines)), dtype=str, index_col=False)
+    return pd.read_json(io.BytesIO(b"\n".join(lines)), lines=True, dtype=False, convert_dates=False)
+
+def _is_parseable(line: bytes, fmt: str, fields: int) -> bool:
+    """One line checked with the stdlib parsers: a JSON object, or a CSV record of at most `fields` fields."""
+    try:
+        if fmt == "csv":
+            return len(next(csv.reader([line.decode()], strict=True))) <= fields
+        return isinstance(json.loads(line), dict)
+    except (ValueError, csv.Error, StopIteration):
+        return False
+
+def _lines_to_frame(lines: List[bytes], fmt: str, header: Optional[bytes]) -> Tuple[pd.DataFrame, int]:
+    """
+    DataFrame of `lines` and how many of them could not be parsed (left out of it).
+    The whole chunk is parsed at once; only when that fails (or does not give one row per line:
+    an unterminated CSV quote joins the lines up to the next quote) are its lines checked one by one.
+    """
+    try:
+        frame = _parse_lines(lines, fmt, header)
+        if len(frame) == len(lines):
+            return frame, 0
+    except _PARSE_ERRORS:
+        pass
+    fields = len(next(csv.reader([header.decode(errors="replace")]))) if fmt == "csv" else 0
+    parseable = [line for line in lines if _is_parseable(line, fmt, fields)]
+    try:
+        frame = _parse_lines(parseable, fmt, header) if parseable else pd.DataFrame()
+        if len(frame) != len(parseable):
+            raise ParserError(f"{len(frame)} rows parsed from {len(parseable)} lines")
+    except _PARSE_ERRORS:
+        # Accepted by the stdlib but not by pandas: parse what can be parsed line by line
+        frames = []
+        for line in parseable:
+            try:
+                frames.append(_parse_lines([line], fmt, header))
+            except _PARSE_ERRORS:
+                pass
+        frame = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    return frame, len(lines) - len(frame)
+
+async def iter_frames(stream: AsyncIterator[bytes], fmt: str, chunk_rows: int) -> AsyncIterator[Tuple[pd.DataFrame, int]]:
+    """
+    Split a streamed NDJSON/CSV body into DataFrames of at most `chunk_rows` rows,
+    so memory stays bounded by the chunk size and not by the request size.
+    Yields each DataFrame with the number of lines of the chunk that could not be parsed.
+    CSV records must not contain embedded newlines.
+    """
+    if fmt not in SUPPORTED_FORMATS:
+        raise TransactionInvalidDataError(name="Invalid format", message=f"Unsupported format '{fmt}', expected one of {SUPPORTED_FORMATS}")
+
+    header: Optional[bytes] = None
+    pending = b""
+    lines: List[bytes] = []
+    async for block in stream:
+        pending += block
+        *complete, pending = pending.split(b"\n")
+        for line in complete:
+            line = line.rstrip(b"\r")
+            if not line.strip():
+                continue
+            if fmt == "csv" and header is None:
+                header = line
+                continue
+            lines.append(line)
+        if len(lines) >= chunk_rows:
+            yield _lines_to_frame(lines, fmt, header)
+            lines = []
+
+    if pending.strip():
+        if fmt == "csv" and header is None:
+            header = pending.rstrip(b"\r")
+        else:
+            lines.append(pending.rstrip(b"\r"))
+    if lines:
+        yield _lines_to_frame(lines, fmt, header)
+
+class BulkIngestService:
+    """
+    Loads transactions in chunks through COPY into a staging table, merged skipping the ids already stored.
+    Each chunk is committed on its own, so a failure keeps the chunks already loaded.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.repo = TransactionRepository(db)
+        self.partitions = PartitionService(db)
+
+    async def ingest(self, stream: AsyncIterator[bytes], fmt: str) -> dict:
+        totals = {"received": 0, "inserted": 0, "duplicates": 0, "rejected": 0}
+
+        async for frame, unparseable in iter_frames(stream, fmt, settings.BULK_INGEST_CHUNK_ROWS):
+            valid, rejected = normalize_chunk(frame) if len(frame) > 0 else (frame, 0)
+            # Lines that are not a JSON object / CSV record are rejected like invalid rows
+            rejected += unparseable
+            inserted = 0
+            if len(valid) > 0:
+                unique = valid.drop_duplicates(subset="transaction_id", keep="first")
+                months = pd.DatetimeIndex(unique["timestamp"]).to_period("M").unique().to_timestamp()
+                await self.partitions.ensure_partitions_for(months.to_pydatetime())
+                inserted = await self.repo.bulk_insert_transactions(INGEST_COLUMNS, to_records(unique))
+                if inserted > 0:
+                    # Duplicates in a partly inserted chunk are counted too; the periodic rebuild corrects it
+                    FilterSuggestService.record_frame(unique)
+
+            totals["received"] += len(frame) + unparseable
+            totals["rejected"] += rejected
+            totals["inserted"] += inserted
+            totals["duplicates"] += len(valid) - inserted
+            logger.info(f"Bulk ingest chunk: rows={len(frame) + unparseable} inserted={inserted} rejected={rejected}")
+
+        return totals
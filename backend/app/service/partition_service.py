@@ -0,0 +1,86 @@
+from datetime import date, datetime
+from typing import Iterable, List, Optional, Set
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.repositories.partition_repo import PartitionRepository, PARENT_TABLE
+from app.settings.config import settings
+from app.infra.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+def month_start(value: date) -> date:
+    return date(value.year, value.month, 1)
+
+def add_months(value: date, months: int) -> date:
+    index = value.year * 12 + (value.month - 1) + months
+    return date(index // 12, index % 12 + 1, 1)
+
+def partition_name(month: date) -> str:
+    return f"{PARENT_TABLE}_p{month.year:04d}_{month.month:02d}"
+
+def partition_month(name: str) -> Optional[date]:
+    """Inverse of partition_name; returns None for the default partition or foreign tables."""
+    prefix = f"{PARENT_TABLE}_p"
+    if not name.startswith(prefix):
+        return None
+    try:
+        year, month = name[len(prefix):].split("_")
+        return date(int(year), int(month), 1)
+    except ValueError:
+        return None
+
+class PartitionService:
+    """
+    Keeps one partition per calendar month on transactions.timestamp.
+    - maintain(): creates the current month plus PARTITION_MONTHS_AHEAD future months and
+      detaches months older than PARTITION_RETENTION_MONTHS (0 disables detaching).
+    - ensure_partitions_for(): called by the write paths so that back-dated rows get their own
+      partition instead of piling up in the default one.
+    """
+
+    # Months known to have a partition, shared by every instance in the process
+    _known_months: Set[date] = set()
+
+    def __init__(self, db: AsyncSession):
+        self.repo = PartitionRepository(db)
+
+    async def maintain(self, today: Optional[date] = None) -> dict:
+        if not await self.repo.is_partitioned():
+            logger.warning(f"Table '{PARENT_TABLE}' is not partitioned; skipping partition maintenance")
+            return {"created": [], "detached": []}
+
+        await self.repo.ensure_default_partition()
+        current = month_start(today or date.today())
+        wanted = [add_months(current, offset) for offset in range(settings.PARTITION_MONTHS_AHEAD + 1)]
+        created = await self._create_missing(wanted)
+
+        detached = []
+        if settings.PARTITION_RETENTION_MONTHS > 0:
+            horizon = add_months(current, -settings.PARTITION_RETENTION_MONTHS)
+            for name in await self.repo.list_partitions():
+                month = partition_month(name)
+                if month is not None and month < horizon:
+                    await self.repo.detach_partition(name)
+                    self._known_months.discard(month)
+                    detached.append(name)
+
+        if created or detached:
+            logger.info(f"Partition maintenance: created={created} detached={detached}")
+        return {"created": created, "detached": detached}
+
+    async def ensure_partitions_for(self, timestamps: Iterable[datetime]) -> List[str]:
+        months = {month_start(ts) for ts in timestamps if ts is not None}
+        missing = months - self._known_months
+        if not missing or not await self.repo.is_partitioned():
+            return []
+        return await self._create_missing(sorted(missing))
+
+    async def _create_missing(self, months: List[date]) -> List[str]:
+        existing = set(await self.repo.list_partitions())
+        created = []
+        for month in months:
+            name = partition_name(month)
+            if name not in existing:
+                await self.repo.create_partition(name, month, add_months(month, 1))
+                created.append(name)
+            self._known_months.add(month)
+        return created
@@ -0,0 +1,55 @@
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.transaction_model import Transaction
+from app.repositories.partition_repo import PartitionRepository
+from app.repositories.transaction_repo import TransactionRepository
+from app.service.partition_service import PartitionService, add_months, partition_month
+from app.settings.config import settings
+from app.infra.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+class RetentionService:
+    """
+    Removes transactions older than RETENTION_DAYS, together with their analysis rows.
+    Monthly partitions that lie entirely before the horizon are detached and dropped (no
+    per-row delete, no dead tuples); what is left (the month the horizon falls in, the
+    default partition) is deleted DELETE_BATCH_ROWS at a time, one commit per batch.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.partitions = PartitionRepository(db)
+        self.transactions = TransactionRepository(db)
+
+    async def purge(self, now: Optional[datetime] = None) -> dict:
+        if settings.RETENTION_DAYS <= 0:
+            return {"dropped": [], "deleted": 0, "analysis_deleted": 0}
+
+        horizon = (now or datetime.now()) - timedelta(days=settings.RETENTION_DAYS)
+        batch_rows = settings.DELETE_BATCH_ROWS
+        dropped, analysis_deleted = [], 0
+
+        if await self.partitions.is_partitioned():
+            for name in await self.partitions.list_partitions():
+                month = partition_month(name)
+                if month is None or datetime.combine(add_months(month, 1), datetime.min.time()) > horizon:
+                    continue
+                while (removed := await self.partitions.delete_analysis_batch(name, batch_rows)) > 0:
+                    analysis_deleted += removed
+                await self.partitions.detach_partition(name)
+                await self.partitions.drop_table(name)
+                PartitionService._known_months.discard(month)
+                dropped.append(name)
+
+        result = await self.transactions.delete_where([Transaction.timestamp < horizon], batch_rows)
+        summary = {"dropped": dropped, "deleted": result["deleted"], "analysis_deleted": analysis_deleted + result["analysis_deleted"]}
+        if dropped or result["deleted"]:
+            logger.info(f"Retention purge before {horizon.isoformat()}: {summary}")
+        return summary
+
+    @classmethod
+    async def purge_with(cls, session_factory: Callable[[], AsyncSession]) -> dict:
+        """Purge in a session of its own (scheduler job)."""
+        async with session_factory() as session:
+            return await cls(session).purge()
@@ -1,8 +1,13 @@
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import Boolean, Integer
 from app.repositories.stats_cache_repo import StatsCacheRepository
+from app.repositories.counter_repo import TransactionCounterRepository
+from app.repositories.stats_view_repo import StatsViewRepository
+from app.models.counter_model import DIMENSIONS
+from app.models.transaction_model import Transaction
 from app.service.transaction_service import TransactionService
-from app.schemas.filter_schema import TransactionFilter
 from datetime import datetime, timedelta
+from app.settings.config import settings
 from app.infra.logger import setup_logger
 
 logger = setup_logger(__name__)
@@ -13,8 +18,15 @@ class StatsCacheService:
     STATS_OVERVIEW_KEY = "stats_overview"
     GERAL_STATS_KEY="geral_stats_overview"
 
+    # Response keys that differ from the dimension (column) name
+    OVERVIEW_CATEGORIES = {"country": "countries"}
+    # Window of the hourly histogram, up to the most recent transaction
+    HOURLY_STATS_DAYS = 90
+
     def __init__(self, db: AsyncSession):
         self.cache_repo = StatsCacheRepository(db)
+        self.counter_repo = TransactionCounterRepository(db)
+        self.view_repo = StatsViewRepository(db)
         self.transaction_service = TransactionService(db)
 
     async def get_stats_overview(self, force_refresh: bool = False) -> dict:
@@ -82,84 +94,51 @@ class StatsCacheService:
         return stats_data
 
     async def _compute_stats_overview(self) -> dict:
-        """Compute stats overview (original logic from stats_router)."""
-        # Step 1: Fetch all distinct values
-        countries = await self.transaction_service.get_distinct_filter("country")
-        merchant_categories = await self.transaction_service.get_distinct_filter("merchant_category")
-        devices = await self.transaction_service.get_distinct_filter("device")
-        channels = await self.transaction_service.get_distinct_filter("channel")
-        distances = await self.transaction_service.get_distinct_filter("distance_from_home")
-
-        high_risk_values = [True, False]
-        weekend_values = [True, False]
-
-        # Step 2: Create all filter objects
-        all_filters = []
-        filter_keys = []
-
-        # Countries
-        for country in countries:
-            all_filters.append(TransactionFilter(country=country))
-            filter_keys.append(("countries", country))
-
-        # Merchant categories
-        for cat in merchant_categories:
-            all_filters.append(TransactionFilter(merchant_category=cat))
-            filter_keys.append(("merchant_category", cat))
-
-        # Devices
-        for device in devices:
-            all_filters.append(TransactionFilter(device=device))
-            filter_keys.append(("device", device))
-
-        # Channels
-        for channel in channels:
-            all_filters.append(TransactionFilter(channel=channel))
-            filter_keys.append(("channel", channel))
-
-        # High risk merchant
-        for value in high_risk_values:
-            all_filters.append(TransactionFilter(high_risk_merchant=value))
-            filter_keys.append(("high_risk_merchant", value))
-
-        # Distance from home
-        for distance in distances:
-            all_filters.append(TransactionFilter(distance_from_home=distance))
-            filter_keys.append(("distance_from_home", distance))
-
-        # Weekend transaction
-        for value in weekend_values:
-            all_filters.append(TransactionFilter(weekend_transaction=value))
-            filter_keys.append(("weekend_transaction", value))
-
-        # Step 3: Fetch all stats sequentially
-        results = []
-        for f in all_filters:
-            result = await self.transaction_service.get_filtered_transactions_stats(f)
-            results.append(result)
-
-        # Step 4: Build categorized response
-        response = {
-            "countries": {},
-            "merchant_category": {},
-            "device": {},
-            "channel": {},
-            "high_risk_merchant": {},
-            "distance_from_home": {},
-            "weekend_transaction": {}
-        }
-
-        for (category, key), result in zip(filter_keys, results):
-            response[category][key] = result
-
-        # Step 5: Add hourly time-series data for charts
+        """
+        Compute stats overview from dimension_counters (kept up to date by triggers on transactions)
+        or, with STATS_SOURCE=materialized_views, from the stats views.
+        """
+        use_views = settings.STATS_SOURCE == "materialized_views"
+
+        # Step 1: Per-value counts of every dimension, one read of a small table
+        if use_views:
+            dimension_totals = await self.view_repo.get_dimension_totals()
+        else:
+            dimension_totals = await self.counter_repo.get_dimension_totals()
+
+        # Step 2: Build categorized response, with the values converted back to the column types
+        response = {}
+        for dimension in DIMENSIONS:
+            category = self.OVERVIEW_CATEGORIES.get(dimension, dimension)
+            column_type = Transaction.__table__.columns[dimension].type
+            response[category] = {
+                self._parse_value(column_type, value): result
+                for value, result in dimension_totals.get(dimension, {}).items()
+            }
+
+        # Boolean dimensions always report both values
+        for category in ("high_risk_merchant", "weekend_transaction"):
+            for value in (True, False):
+                response[category].setdefault(value, {"total_transactions": 0, "fraud_transactions": 0})
+
+        # Step 3: Add hourly time-series data for charts, from hourly_rollup with either source
         logger.info("Fetching hourly transaction stats for time-series chart...")
-        hourly_stats = await self.transaction_service.get_hourly_transaction_stats(days=90)
-        response["hourly_stats"] = hourly_stats
+        response["hourly_stats"] = await self.transaction_service.get_hourly_transaction_stats(days=self.HOURLY_STATS_DAYS)
 
         return response
 
+    @staticmethod
+    def _parse_value(column_type, value: str):
+        """dimension_counters stores values as text (Postgres casts: 'true'/'false', '12')."""
+        if isinstance(column_type, Boolean):
+            return value == "true"
+        if isinstance(column_type, Integer):
+            return int(value)
+        return value
+
     async def _compute_geral_stats(self) -> dict:
+        if settings.STATS_SOURCE == "materialized_views":
+            return await self.view_repo.get_general_stats()
         return await self.transaction_service.get_transaction_stats()
 
     async def refresh_cache(self) -> dict:
@@ -0,0 +1,54 @@
+from datetime import datetime
+from typing import Callable, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.repositories.stats_view_repo import StatsViewRepository
+from app.service.stats_cache_service import StatsCacheService
+from app.settings.config import settings
+from app.infra.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+class StatsViewService:
+    """Refreshes the dashboard materialized views and keeps track of the last refresh."""
+
+    # Shared by every instance of the process, reported by GET /stats/views
+    last_refresh: Optional[dict] = None
+
+    def __init__(self, db: AsyncSession):
+        self.repo = StatsViewRepository(db)
+        self.stats_cache = StatsCacheService(db)
+
+    @staticmethod
+    def enabled() -> bool:
+        return settings.STATS_SOURCE == "materialized_views"
+
+    async def refresh(self) -> Optional[dict]:
+        """
+        Refresh the views concurrently, then the cached overview built from them.
+        Returns the refresh report, or None when the views are disabled or a refresh is already running.
+        """
+        if not self.enabled():
+            return None
+        durations = await self.repo.refresh()
+        if durations is None:
+            logger.info("Stats views refresh skipped, another refresh is running")
+            return None
+        await self.stats_cache.refresh_cache()
+
+        report = {
+            "refreshed_at": datetime.now().isoformat(),
+            "total_ms": round(sum(durations.values()), 1),
+            "views_ms": durations,
+        }
+        StatsViewService.last_refresh = report
+        logger.info(f"Stats views refreshed in {report['total_ms']} ms: {durations}")
+        return report
+
+    @classmethod
+    async def refresh_with(cls, session_factory: Callable[[], AsyncSession]) -> Optional[dict]:
+        """Refresh in a session of its own (scheduler job, background task after a bulk import)."""
+        async with session_factory() as session:
+            return await cls(session).refresh()
+
+    def status(self) -> dict:
+        return {"source": settings.STATS_SOURCE, "last_refresh": self.last_refresh}
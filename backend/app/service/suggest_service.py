@@ -0,0 +1,70 @@
+from typing import Callable, Iterable, List, Mapping
+import pandas as pd
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.repositories.transaction_repo import TransactionRepository, distinct_values
+from app.infra.suggest_index import PrefixSuggestIndex
+from app.exception.transaction_exceptions import SuggestIndexNotReadyError, TransactionInvalidDataError
+from app.settings.config import settings
+from app.infra.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Text filters offered by GET /transactions/filters/{field}/suggest
+SUGGEST_FIELDS: List[str] = ["merchant", "city", "country", "merchant_category", "card_type", "channel", "device"]
+
+# Shared by the whole process: rebuilt by the "suggest-index-rebuild" job, updated on ingest
+suggest_index = PrefixSuggestIndex(SUGGEST_FIELDS)
+
+class FilterSuggestService:
+    """Prefix autocomplete of filter values, answered from memory (see app/infra/suggest_index.py)."""
+
+    def __init__(self, db: AsyncSession):
+        self.repo = TransactionRepository(db)
+
+    async def rebuild(self) -> int:
+        """Reload every field from the database (also corrects deletes and updates, which are not tracked)."""
+        frequencies = await self.repo.get_value_frequencies(SUGGEST_FIELDS)
+        suggest_index.load(frequencies)
+        # Same scan gives the distinct values, including rows written by other processes (e.g. data/load_data.py)
+        for field, values in frequencies.items():
+            distinct_values.load(field, values.keys())
+        logger.info(f"Suggest index rebuilt: {suggest_index.size()} values")
+        return suggest_index.size()
+
+    @classmethod
+    async def rebuild_with(cls, session_factory: Callable[[], AsyncSession]) -> int:
+        """Rebuild in a session of its own (scheduler job)."""
+        async with session_factory() as session:
+            return await cls(session).rebuild()
+
+    @staticmethod
+    def suggest(field: str, q: str, limit: int) -> List[dict]:
+        if field not in SUGGEST_FIELDS:
+            raise TransactionInvalidDataError(name="Invalid Field", message=f"Suggestions are available for: {', '.join(SUGGEST_FIELDS)}")
+        if not suggest_index.ready:
+            # An empty list would read as "no value matches"
+            if settings.SUGGEST_INDEX_REBUILD_INTERVAL_SECONDS <= 0:
+                message = "Filter suggestions are disabled (SUGGEST_INDEX_REBUILD_INTERVAL_SECONDS=0)."
+            else:
+                message = "Filter suggestions are not available yet: the index is still being built."
+            raise SuggestIndexNotReadyError(name="Suggestions Unavailable", message=message)
+        return suggest_index.suggest(field, q, limit)
+
+    @staticmethod
+    def record(rows: Iterable[Mapping]) -> None:
+        """Count the values of newly inserted transactions (dicts or models exposing the SUGGEST_FIELDS)."""
+        rows = list(rows)
+        for field in SUGGEST_FIELDS:
+            counts: dict[str, int] = {}
+            for row in rows:
+                value = row.get(field) if isinstance(row, Mapping) else getattr(row, field, None)
+                if value is not None:
+                    counts[value] = counts.get(value, 0) + 1
+            suggest_index.add(field, counts)
+
+    @staticmethod
+    def record_frame(frame: pd.DataFrame) -> None:
+        """Same as record, for a bulk ingest chunk."""
+        for field in SUGGEST_FIELDS:
+            if field in frame.columns:
+                suggest_index.add(field, frame[field].dropna().value_counts().to_dict())
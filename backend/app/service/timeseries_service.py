@@ -0,0 +1,87 @@
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.repositories.rollup_repo import RollupRepository
+from app.repositories.transaction_repo import TransactionRepository
+from app.schemas.filter_schema import TimeseriesFilter, TransactionFilter
+from app.exception.transaction_exceptions import TransactionInvalidDataError
+
+BUCKETS = {"minute": timedelta(minutes=1), "hour": timedelta(hours=1), "day": timedelta(days=1)}
+
+# Range used when `from` is not given: the last DEFAULT_DAYS days (one day for minute buckets)
+DEFAULT_DAYS = 90
+
+# Points a single series may have; also what bounds the raw-row scan of minute buckets (about 3.5 days)
+MAX_POINTS = 5000
+
+def naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """`from`/`to` as the columns store them: naive UTC (an offset is converted, a naive value kept)."""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+def truncate(value: datetime, bucket: str) -> datetime:
+    if bucket == "day":
+        return value.replace(hour=0, minute=0, second=0, microsecond=0)
+    if bucket == "hour":
+        return value.replace(minute=0, second=0, microsecond=0)
+    return value.replace(second=0, microsecond=0)
+
+class TransactionTimeseriesService:
+    """
+    Transaction and fraud counts per time bucket. Hour and day buckets are sums of hourly_rollup
+    rows, so their cost depends on the number of hours in the range, not on the number of
+    transactions; minute buckets are finer than the rollup and are counted from the rows, which
+    MAX_POINTS limits to short ranges.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.rollup = RollupRepository(db)
+        self.transactions = TransactionRepository(db)
+
+    async def get_series(self, bucket: str, start: Optional[datetime], end: Optional[datetime], filters: TimeseriesFilter) -> dict:
+        if bucket not in BUCKETS:
+            raise TransactionInvalidDataError(name="Invalid Bucket", message=f"bucket must be one of: {', '.join(BUCKETS)}")
+        step = BUCKETS[bucket]
+        start, end = naive_utc(start), naive_utc(end)
+
+        if end is None:
+            # Up to the most recent transaction rather than now, so older datasets still get a chart
+            latest = await self.rollup.latest_bucket()
+            end = (latest or datetime.now()) + timedelta(hours=1)
+        # Whole buckets only: `to` is rounded up, `from` down
+        if truncate(end, bucket) < end:
+            end = truncate(end, bucket) + step
+        if start is None:
+            start = end - (timedelta(days=1) if bucket == "minute" else timedelta(days=DEFAULT_DAYS))
+        start = truncate(start, bucket)
+        if start >= end:
+            raise TransactionInvalidDataError(name="Invalid Range", message="'from' must be before 'to'")
+        points = (end - start) // step
+        if points > MAX_POINTS:
+            raise TransactionInvalidDataError(name="Range Too Large", message=f"{points} {bucket} buckets requested, at most {MAX_POINTS}: use a larger bucket or a shorter range")
+
+        dimensions = filters.model_dump(exclude_none=True)
+        if bucket == "minute":
+            rows = await self.transactions.get_minute_series(start, end, TransactionFilter(**dimensions))
+        else:
+            rows = await self.rollup.get_series(bucket, start, end, dimensions)
+
+        return {
+            "bucket": bucket,
+            "from": start,
+            "to": end,
+            "filters": dimensions,
+            "points": self._fill(rows, start, points, step),
+        }
+
+    @staticmethod
+    def _fill(rows: List[tuple], start: datetime, points: int, step: timedelta) -> List[dict]:
+        """One point per bucket of the range, empty buckets included."""
+        counts = {bucket_start: (total, fraud) for bucket_start, total, fraud in rows}
+        series = []
+        for i in range(points):
+            bucket_start = start + i * step
+            total, fraud = counts.get(bucket_start, (0, 0))
+            series.append({"bucket_start": bucket_start, "total_transactions": total, "fraud_transactions": fraud})
+        return series
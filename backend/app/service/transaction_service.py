@@ -1,18 +1,23 @@
 # services/transaction_service.py
-from typing import List
+import base64
+import datetime
+from typing import List, Optional
 import numpy as np
 import pandas as pd
 import logging
 from sklearn.exceptions import NotFittedError
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.models.transaction_model import FEATURE_COLUMNS, Transaction
-from app.schemas.transaction_schema import TransactionCreate, TransactionPredictionResponse, TransactionRequest, TransactionResponse
-from app.repositories.transaction_repo import TransactionRepository
+from app.models.transaction_model import FEATURE_COLUMNS, STORED_FEATURES, Transaction, velocity_columns_from, velocity_of
+from app.schemas.transaction_schema import TransactionCreate, TransactionLookupResponse, TransactionPredictionResponse, TransactionRequest, TransactionResponse
+from app.repositories.transaction_repo import TransactionRepository, filter_conditions
+from app.repositories.rollup_repo import RollupRepository
+from app.service.partition_service import PartitionService
+from app.service.suggest_service import FilterSuggestService
 from app.infra.model_loader import ModelLoader
 from app.exception.transaction_exceptions import TransactionInvalidDataError, TransactionNotFoundError, ModelNotLoadedError
-from app.schemas.features_schema import TransactionFeatures, conversion_rates
+from app.schemas.features_schema import BUSINESS_HOURS, DEFAULT_USD_RATE, HIGH_AMOUNT_USD, HIGH_RISK_COUNTRIES, LOW_AMOUNT_USD, SUSPICIOUS_DEVICES, TransactionFeatures, conversion_rates
 from app.schemas.filter_schema import TransactionFilter
-import asyncio
+from app.settings.config import settings
 
 logger = logging.getLogger(__name__)
 
@@ -20,6 +25,8 @@ class TransactionService:
 
     def __init__(self, db: AsyncSession):
         self.repo = TransactionRepository(db)
+        self.rollup = RollupRepository(db)
+        self.partitions = PartitionService(db)
         self.artifacts = ModelLoader.load()
         try:
             self.artifacts = ModelLoader.load()
@@ -51,15 +58,62 @@ class TransactionService:
         if not include_predictions:
             return [self._to_response(ts) for ts in transaction_list]
         else:
-            predictions = await asyncio.gather(*[
-                self.predict_transaction(ts.transaction_id) for ts in transaction_list
-            ])
+            predictions = self.predict_transactions(transaction_list)
             transactions_with_probability = [
                 self._to_response(transaction, prediction.probability)
                 for transaction, prediction in zip(transaction_list, predictions)
             ]
             return transactions_with_probability
     
+    async def get_transactions_projection(self, filters: TransactionFilter, limit: int, skip: int) -> List[dict]:
+        """
+        Lightweight read path for list endpoints: Core rows straight to JSON-ready dicts shaped
+        like TransactionResponse, without ORM entities or Pydantic validation.
+        """
+        rows = await self.repo.get_transaction_rows(filters, limit, skip)
+        return [self._row_to_dict(row) for row in rows]
+
+    async def get_customer_timeline(self, customer_id: str, limit: int, cursor: Optional[str] = None) -> dict:
+        """
+        Page of a customer's history (newest first) with the customer's aggregates.
+        `cursor` is the next_cursor of the previous page; None starts from the most recent transaction.
+        """
+        after = self.decode_cursor(cursor) if cursor else None
+        rows = await self.repo.get_customer_timeline(customer_id, limit, after)
+
+        summary = rows[0]
+        if summary.transaction_count == 0:
+            raise TransactionNotFoundError(name="Customer Not Found", message=f"No transactions found for customer {customer_id}.")
+
+        page = [row for row in rows if row.transaction_id is not None]
+        next_cursor = self.encode_cursor(page[limit - 1]) if len(page) > limit else None
+        return {
+            "customer_id": customer_id,
+            "summary": {
+                "transaction_count": summary.transaction_count,
+                "total_amount_usd": round(summary.total_amount_usd, 2),
+                "fraud_count": summary.fraud_count,
+                "fraud_rate": round(summary.fraud_count / summary.transaction_count * 100, 2),
+                "first_seen": summary.first_seen.isoformat(),
+                "last_seen": summary.last_seen.isoformat(),
+            },
+            "transactions": [self._row_to_dict(row) for row in page[:limit]],
+            "next_cursor": next_cursor,
+        }
+
+    @staticmethod
+    def encode_cursor(row) -> str:
+        """Opaque keyset cursor: the (timestamp, transaction_id) of the last row of a page."""
+        return base64.urlsafe_b64encode(f"{row.timestamp.isoformat()}|{row.transaction_id}".encode()).decode()
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> tuple[datetime.datetime, str]:
+        try:
+            timestamp, transaction_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|", 1)
+            return datetime.datetime.fromisoformat(timestamp), transaction_id
+        except ValueError as e:
+            raise TransactionInvalidDataError(name="Invalid Cursor", message="Invalid pagination cursor") from e
+
     async def get_transaction_id(self, transaction_id: str, include_predictions: bool = False) -> TransactionResponse:
         if transaction_id is None:
             logger.error(f"{transaction_id} cannot be None for prediction.")
@@ -73,7 +127,8 @@ class TransactionService:
         if not include_predictions:
             return self._to_response(transaction)
         else:
-            prediction = await self.predict_transaction(transaction.transaction_id)
+            # Predicted from the row just loaded, not looked up again through predict_transaction
+            prediction = self.predict_transactions([transaction])[0]
             return self._to_response(transaction, prediction.probability)
             
     async def predict_transaction(self, transaction_id: str) -> dict:
@@ -88,80 +143,149 @@ class TransactionService:
         if transaction is None:
             logger.warning(f"Transaction with ID {transaction_id} not found for prediction.")
             raise TransactionNotFoundError(name="Transaction Not Found", message=f"Transaction with ID {transaction_id} does not exist.")
-        
-        transaction_request = TransactionRequest(
+
+        return self.predict_transactions([transaction])[0]
+
+    @staticmethod
+    def _to_request(transaction: Transaction) -> TransactionRequest:
+        velocity = velocity_of(transaction) or {}
+        return TransactionRequest(
             channel=transaction.channel,
             device=transaction.device,
             country=transaction.country,
             city=transaction.city,
             transaction_hour=transaction.transaction_hour,
             amount=transaction.amount,
-            max_single_amount = transaction.velocity_last_hour.get("max_single_amount", 0.0),
-            total_amount = transaction.velocity_last_hour.get("total_amount", 0.0),
+            max_single_amount=velocity.get("max_single_amount") or 0.0,
+            total_amount=velocity.get("total_amount") or 0.0,
             distance_from_home=transaction.distance_from_home,
             currency=transaction.currency,
             card_present=transaction.card_present
         )
 
-        transaction_data = self.extract_features(transaction_request, conversion_rates)
-        if transaction_data is None:
-            raise TransactionInvalidDataError("Transaction data for prediction is none.")
-        logger.info(f"Current transaction data for prediction is -> {transaction_data}")
+    @staticmethod
+    def _stored_features(transaction: Transaction) -> Optional[dict]:
+        """STORED_FEATURES of a loaded transaction, from its generated columns; None if one is not computed yet."""
+        values = {}
+        for feature, name in STORED_FEATURES.items():
+            value = getattr(transaction, name, None)
+            if value is None:
+                return None
+            values[feature] = int(value) if isinstance(value, bool) else value
+        return values
+
+    def predict_transactions(self, transactions: List[Transaction]) -> List[TransactionPredictionResponse]:
+        """
+        Predict already loaded transactions: one feature frame and a single scaler/model call for the
+        whole batch, in the order given. The derived features come from the generated columns.
+        """
+        if not transactions:
+            return []
+
+        features = []
+        for transaction in transactions:
+            transaction_data = self.extract_features(self._to_request(transaction), conversion_rates, self._stored_features(transaction))
+            if transaction_data is None:
+                raise TransactionInvalidDataError("Transaction data for prediction is none.")
+            features.append(transaction_data.model_dump(by_alias=True))
 
         try:
-            transaction_data_dataframe = pd.DataFrame([transaction_data.model_dump(by_alias=True)], columns=FEATURE_COLUMNS)
+            transaction_data_dataframe = pd.DataFrame(features, columns=FEATURE_COLUMNS)
 
-            logger.info("Feature columns received: %s", list(transaction_data_dataframe.columns))
             assert list(transaction_data_dataframe.columns) == FEATURE_COLUMNS, "Ordem das colunas incorreta!"
             # Se tens scaler + modelo separados:
             X_scaled = self.scaler.transform(transaction_data_dataframe)
-            y_pred = int(self.model.predict(X_scaled)[0])
+            y_pred = np.asarray(self.model.predict(X_scaled)).astype(int).ravel()
 
             probas = getattr(self.model, "predict_proba", None)
             if probas is not None:
                 p = self.model.predict_proba(X_scaled)
-                p_pos = float(np.asarray(p)[..., -1].ravel()[0])   # robusto (pega a última coluna)
+                p_pos = [float(v) for v in np.asarray(p)[:, -1]]   # robusto (pega a última coluna)
             else:
                 # fallback caso não exista predict_proba
-                p_pos = None
+                p_pos = [None] * len(transactions)
 
         except NotFittedError as e:
             logger.error("Model pipeline not fitted", exc_info=True)
             raise ModelNotLoadedError("Model not fitted; load a trained artifact.") from e
 
-        logger.info(f"Prediction for transaction ID {transaction_id}: {y_pred} with probability of being fraudulent {p_pos}") 
+        logger.info(f"Predicted {len(transactions)} transactions: {int(y_pred.sum())} fraudulent")
+
+        return [
+            TransactionPredictionResponse(is_fraud=bool(pred == 1), probability=probability)
+            for pred, probability in zip(y_pred, p_pos)
+        ]
+
+    async def get_transactions_by_ids(self, ids: List[str], include_predictions: bool = False) -> TransactionLookupResponse:
+        """Transactions of `ids` in request order (one query), and the ids that do not exist."""
+        transactions = await self.repo.get_transactions_by_ids(ids)
+        found = {ts.transaction_id for ts in transactions}
+        missing = [transaction_id for transaction_id in dict.fromkeys(ids) if transaction_id not in found]
+
+        if include_predictions:
+            predictions = self.predict_transactions(transactions)
+            responses = [self._to_response(ts, prediction.probability) for ts, prediction in zip(transactions, predictions)]
+        else:
+            responses = [self._to_response(ts) for ts in transactions]
+        return TransactionLookupResponse(transactions=responses, missing=missing)
 
-        return TransactionPredictionResponse(
-            is_fraud=True if y_pred == 1 else False,
-            probability=p_pos
-        )
-    
     async def create_transaction(self, new_transaction: TransactionCreate) -> TransactionResponse:
+        await self.partitions.ensure_partitions_for([new_transaction.timestamp])
         created_transaction = await self.repo.create_transaction(new_transaction)
+        FilterSuggestService.record([created_transaction])
         return self._to_response(created_transaction)
     
     async def delete_transaction(self, transaction_id: str) -> str:
-        transaction = await self.repo.get_transaction_id(transaction_id)
-        if transaction is None:
+        if not await self.repo.delete_transaction(transaction_id):
             logger.error(f"Transaction with ID {transaction_id} not found for deletion.")
             raise TransactionNotFoundError(name="Transaction Not Found", message=f"Transaction with ID {transaction_id} does not exist.")
-
-        await self.repo.delete_transaction(transaction_id)
         return f"Transaction with ID {transaction_id} deleted successfully."
 
-    async def update_transaction(self, transaction_id: str, updated_transaction: TransactionCreate) -> TransactionResponse:
-        existing_transaction : Transaction = await self.repo.get_transaction_id(transaction_id)
+    async def delete_transactions(self, filters: TransactionFilter) -> dict[str, int]:
+        """Delete every transaction matching `filters` (and its analysis) in batches of DELETE_BATCH_ROWS."""
+        conditions = filter_conditions(filters)
+        if not conditions:
+            raise TransactionInvalidDataError(name="Missing Filter", message="At least one filter is required to delete transactions.")
+        result = await self.repo.delete_where(conditions, settings.DELETE_BATCH_ROWS)
+        logger.info(f"Deleted transactions matching {filters.model_dump(exclude_none=True)}: {result}")
+        return result
 
-        if existing_transaction is None:
+    async def update_transaction(self, transaction_id: str, updated_transaction: TransactionCreate) -> TransactionResponse:
+        values = {key: value for key, value in updated_transaction.model_dump().items() if key != "transaction_id" and value is not None}
+        return await self.patch_transaction(transaction_id, values)
+
+    async def patch_transaction(self, transaction_id: str, values: dict) -> TransactionResponse:
+        """Write only `values` with a single UPDATE ... RETURNING (no SELECT before or after)."""
+        if not values:
+            raise TransactionInvalidDataError(name="Empty Update", message="No fields to update were given.")
+        if "timestamp" in values:
+            await self.partitions.ensure_partitions_for([values["timestamp"]])
+        if "velocity_last_hour" in values:
+            values = {**values, **velocity_columns_from(values["velocity_last_hour"])}
+
+        updated_row = await self.repo.update_fields(transaction_id, values)
+        if updated_row is None:
             logger.error(f"Transaction with ID {transaction_id} not found for update.")
             raise TransactionNotFoundError(name="Transaction Not Found", message=f"Transaction with ID {transaction_id} does not exist.")
+        return self._to_response(updated_row)
 
-        for key, value in updated_transaction.__dict__.items():
-                if key != "transaction_id" and value is not None:
-                    setattr(existing_transaction, key, value)
-
-        updated_result = await self.repo.update_transaction(existing_transaction)
-        return self._to_response(updated_result)
+    async def bulk_patch_transactions(self, changes: List[dict]) -> dict:
+        """
+        Apply many partial updates with UPDATE ... FROM (VALUES ...).
+        A transaction_id sent more than once keeps its last change; entries without any field are ignored.
+        """
+        latest = {change["transaction_id"]: change for change in changes if len(change) > 1}
+        for transaction_id, change in latest.items():
+            if "velocity_last_hour" in change:
+                latest[transaction_id] = {**change, **velocity_columns_from(change["velocity_last_hour"])}
+        timestamps = [change["timestamp"] for change in latest.values() if "timestamp" in change]
+        if timestamps:
+            await self.partitions.ensure_partitions_for(timestamps)
+
+        updated = set(await self.repo.bulk_update_fields(list(latest.values())))
+        missing = [transaction_id for transaction_id in latest if transaction_id not in updated]
+        logger.info(f"Bulk patch: requested={len(latest)} updated={len(updated)} missing={len(missing)}")
+        return {"requested": len(latest), "updated": len(updated), "missing": missing}
     
     async def get_distinct_filter(self, filter_value: str) -> List[str]:
         return await self.repo.get_distinct_values(field=filter_value)
@@ -180,6 +304,16 @@ class TransactionService:
             return card
         return f"{'*'*(len(card)-4)}{card[-4:]}"
 
+    @staticmethod
+    def amount_usd(record) -> float:
+        """
+        Amount in USD as stored at write time (amount_usd); converted here only for a row
+        the backfill has not reached yet.
+        """
+        if record.amount_usd is not None:
+            return record.amount_usd
+        return record.amount * conversion_rates.get(record.currency, DEFAULT_USD_RATE)
+
     @classmethod
     def _to_response(cls, ts: Transaction, fraud_probability: float = 0.0) -> TransactionResponse:
         """
@@ -200,8 +334,8 @@ class TransactionService:
             merchant=ts.merchant,
             merchant_category=ts.merchant_category,
             merchant_type=ts.merchant_type,
-            amount=ts.amount * conversion_rates.get(ts.currency, 1.28),  # Convert to USD
-            currency='USD',  # Assuming all amounts are converted to USD
+            amount=cls.amount_usd(ts),
+            currency='USD',
             country=ts.country,
             city=ts.city,
             city_size=ts.city_size,
@@ -215,13 +349,51 @@ class TransactionService:
             high_risk_merchant=ts.high_risk_merchant,
             transaction_hour=ts.transaction_hour,
             weekend_transaction=ts.weekend_transaction,
-            velocity_last_hour=ts.velocity_last_hour,
+            velocity_last_hour=velocity_of(ts),
             is_fraud=ts.is_fraud,
             fraud_probability=fraud_probability
         )
     
+    @classmethod
+    def _row_to_dict(cls, row, fraud_probability: float = 0.0) -> dict:
+        """
+        Same mapping as _to_response, for Core rows selected with LIST_COLUMNS.
+        Returns a plain dict that can be JSON encoded as-is (timestamp as ISO string).
+        """
+        return {
+            "transaction_id": row.transaction_id,
+            "customer_id": row.customer_id,
+            "card_number": cls.mask_card(row.card_number),
+            "timestamp": row.timestamp.isoformat(),
+            "merchant": row.merchant,
+            "merchant_category": row.merchant_category,
+            "merchant_type": row.merchant_type,
+            "amount": cls.amount_usd(row),
+            "currency": "USD",
+            "country": row.country,
+            "city": row.city,
+            "city_size": row.city_size,
+            "card_type": row.card_type,
+            "card_present": int(row.card_present),
+            "device": row.device,
+            "channel": row.channel,
+            "device_fingerprint": row.device_fingerprint,
+            "ip_address": row.ip_address,
+            "distance_from_home": row.distance_from_home,
+            "high_risk_merchant": row.high_risk_merchant,
+            "transaction_hour": row.transaction_hour,
+            "weekend_transaction": row.weekend_transaction,
+            "velocity_last_hour": velocity_of(row),
+            "is_fraud": row.is_fraud,
+            "fraud_probability": fraud_probability,
+        }
+
     @staticmethod
-    def extract_features(transaction_request: TransactionRequest, conversion_rates: dict) -> TransactionFeatures:
+    def extract_features(transaction_request: TransactionRequest, conversion_rates: dict, stored: Optional[dict] = None) -> TransactionFeatures:
+        """
+        Model features of a transaction. `stored` holds the STORED_FEATURES already computed by Postgres
+        (generated columns); without it they are computed here with the same rules.
+        """
         if transaction_request is None:
             raise TransactionInvalidDataError("Transaction request cannot be None for feature extraction.")
 
@@ -245,12 +417,26 @@ class TransactionService:
                     f"Transaction {field} cannot be None for feature extraction."
                 )
 
+        if stored is None:
+            rate = conversion_rates.get(transaction_request.currency, DEFAULT_USD_RATE)
+            amount_usd = transaction_request.amount * rate
+            suspicious_device = transaction_request.device in SUSPICIOUS_DEVICES
+            stored = {
+                "USD_converted_amount": amount_usd,
+                "USD_converted_total_amount": transaction_request.total_amount * rate,
+                "max_single_amount": transaction_request.max_single_amount * rate,
+                "is_off_hours": 1 if transaction_request.transaction_hour < BUSINESS_HOURS[0] or transaction_request.transaction_hour > BUSINESS_HOURS[1] else 0,
+                "is_high_amount": 1 if amount_usd > HIGH_AMOUNT_USD else 0,
+                "is_low_amount": 1 if amount_usd < LOW_AMOUNT_USD else 0,
+                "suspicious_device": 1 if suspicious_device else 0,
+                "high_risk_transaction": 1 if transaction_request.country in HIGH_RISK_COUNTRIES and suspicious_device else 0,
+            }
+
         return TransactionFeatures(
             channel_medium=1 if transaction_request.channel == "medium" else 0,
             **{"device_Android App": 1 if transaction_request.device == "Android App" else 0},
             device_Safari=1 if transaction_request.device == "Safari" else 0,
             device_Firefox=1 if transaction_request.device == "Firefox" else 0,
-            USD_converted_total_amount=transaction_request.total_amount * conversion_rates.get(transaction_request.currency, 1.28),
             device_Chrome=1 if transaction_request.device == "Chrome" else 0,
             **{"device_iOS App": 1 if transaction_request.device == "iOS App" else 0},
             **{"city_Unknown City": 1 if transaction_request.city == "Unknown City" else 0},
@@ -268,27 +454,21 @@ class TransactionService:
             country_Brazil=1 if transaction_request.country == "Brazil" else 0,
             country_Russia=1 if transaction_request.country == "Russia" else 0,
             country_Mexico=1 if transaction_request.country == "Mexico" else 0,
-            is_off_hours=1 if transaction_request.transaction_hour < 9 or transaction_request.transaction_hour > 17 else 0,
-            max_single_amount=transaction_request.max_single_amount * conversion_rates.get(transaction_request.currency, 1.28),
-            USD_converted_amount=transaction_request.amount * conversion_rates.get(transaction_request.currency, 1.28),
             channel_web=1 if transaction_request.channel == "web" else 0,
-            is_high_amount=1 if (transaction_request.amount * conversion_rates.get(transaction_request.currency, 1.28)) > 1000 else 0,
-            is_low_amount=1 if (transaction_request.amount * conversion_rates.get(transaction_request.currency, 1.28)) < 100 else 0,
             transaction_hour=transaction_request.transaction_hour,
             hour=transaction_request.transaction_hour,
             **{"device_NFC Payment": 1 if transaction_request.device == "NFC Payment" else 0},
             **{"device_Magnetic Stripe": 1 if transaction_request.device == "Magnetic Stripe" else 0},
             **{"device_Chip Reader": 1 if transaction_request.device == "Chip Reader" else 0},
-            high_risk_transaction=1 if transaction_request.country in ['Brazil', 'Mexico', 'Nigeria', 'Russia']and transaction_request.device in ['Magnetic Stripe', 'NFC Payment', 'Chip Reader'] else 0,
             channel_pos=1 if transaction_request.channel == "pos" else 0,
-            suspicious_device= 1 if transaction_request.device in ["NFC Payment", "Magnetic Stripe", "Chip Reader"] else 0,
             card_present=1 if transaction_request.card_present else 0,
             distance_from_home=transaction_request.distance_from_home,
+            **stored,
         )
 
     async def get_hourly_transaction_stats(self, days: int = 90) -> List[dict]:
-        """Get hourly transaction statistics for the last N days."""
-        return await self.repo.get_hourly_transaction_stats(days=days)
+        """Get hourly transaction statistics for the last N days (from hourly_rollup, never the raw rows)."""
+        return await self.rollup.get_hour_of_day_stats(days=days)
 
 
     
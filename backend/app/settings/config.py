@@ -5,4 +5,77 @@ class Settings:
     ENV: str = os.getenv("ENV", "dev")  # dev | prod
     LOG_LEVEL: str = "DEBUG" if ENV == "dev" else "INFO"
 
-settings = Settings()
\ No newline at end of file
+    # Connection pool of each engine (primary and read replica)
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+    DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "false").lower() == "true"
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "-1"))  # seconds, -1 = never
+    # Prepared statements cached per connection by asyncpg (0 behind pgbouncer in transaction mode);
+    # the hot statements of the repositories (app/infra/prepared_statements.py) are prepared into it at checkout
+    DB_STATEMENT_CACHE_SIZE: int = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "100"))
+
+    # Monthly partitions of the transactions table
+    PARTITION_MONTHS_AHEAD: int = int(os.getenv("PARTITION_MONTHS_AHEAD", "3"))
+    PARTITION_RETENTION_MONTHS: int = int(os.getenv("PARTITION_RETENTION_MONTHS", "0"))  # 0 = never detach
+    PARTITION_MAINTENANCE_INTERVAL_SECONDS: int = int(os.getenv("PARTITION_MAINTENANCE_INTERVAL_SECONDS", "3600"))
+
+    # Retention purge: transactions older than RETENTION_DAYS (0 = keep everything) are removed every
+    # RETENTION_INTERVAL_SECONDS, with their analysis rows. Fully expired monthly partitions are dropped,
+    # the rest is deleted DELETE_BATCH_ROWS at a time (also the batch size of DELETE /transactions/).
+    # PARTITION_RETENTION_MONTHS detaches (keeps) whole months instead.
+    RETENTION_DAYS: int = int(os.getenv("RETENTION_DAYS", "0"))
+    RETENTION_INTERVAL_SECONDS: int = int(os.getenv("RETENTION_INTERVAL_SECONDS", "3600"))
+    DELETE_BATCH_ROWS: int = int(os.getenv("DELETE_BATCH_ROWS", "5000"))
+
+    # Columns added to an existing database are filled from the data the rows already hold, BACKFILL_BATCH_ROWS
+    # rows per transaction; checked every BACKFILL_INTERVAL_SECONDS. Covers the typed velocity columns and
+    # usd_rate/amount_usd: until a row is filled, amount filters and USD stats (min/max/avg amount) leave it out.
+    BACKFILL_BATCH_ROWS: int = int(os.getenv("BACKFILL_BATCH_ROWS", "5000"))
+    BACKFILL_INTERVAL_SECONDS: int = int(os.getenv("BACKFILL_INTERVAL_SECONDS", "3600"))
+
+    # Cold storage: transactions older than ARCHIVE_AFTER_DAYS (0 = disabled) are moved to Parquet files under
+    # ARCHIVE_DIR every ARCHIVE_INTERVAL_SECONDS, in row groups of ARCHIVE_ROW_GROUP_ROWS rows; GET /transactions/export
+    # reads them back. Monthly tables detached by PARTITION_RETENTION_MONTHS are archived (and dropped) too. The
+    # analysis rows of archived transactions are deleted, as by the retention purge.
+    ARCHIVE_DIR: str = os.getenv("ARCHIVE_DIR", "archive")
+    ARCHIVE_AFTER_DAYS: int = int(os.getenv("ARCHIVE_AFTER_DAYS", "0"))
+    ARCHIVE_INTERVAL_SECONDS: int = int(os.getenv("ARCHIVE_INTERVAL_SECONDS", "86400"))
+    ARCHIVE_ROW_GROUP_ROWS: int = int(os.getenv("ARCHIVE_ROW_GROUP_ROWS", "131072"))
+
+    # Rows validated and COPY'd per chunk by POST /transactions/bulk
+    BULK_INGEST_CHUNK_ROWS: int = int(os.getenv("BULK_INGEST_CHUNK_ROWS", "50000"))
+
+    # Rows fetched from the server-side cursor and encoded per chunk by GET /transactions/export
+    EXPORT_BATCH_ROWS: int = int(os.getenv("EXPORT_BATCH_ROWS", "10000"))
+
+    # Source of /stats/overview and /stats/geral_stats: "counters" (trigger-maintained tables)
+    # or "materialized_views" (refreshed concurrently every STATS_VIEWS_REFRESH_INTERVAL_SECONDS and after bulk imports)
+    STATS_SOURCE: str = os.getenv("STATS_SOURCE", "counters")
+    STATS_VIEWS_REFRESH_INTERVAL_SECONDS: int = int(os.getenv("STATS_VIEWS_REFRESH_INTERVAL_SECONDS", "300"))
+
+    # In-memory index behind GET /transactions/filters/{field}/suggest: built at startup, updated on ingest
+    # and rebuilt from the database on this interval (picks up deletes and updates); 0 disables suggestions.
+    # Until the first build (or when disabled) the endpoint answers 503.
+    SUGGEST_INDEX_REBUILD_INTERVAL_SECONDS: int = int(os.getenv("SUGGEST_INDEX_REBUILD_INTERVAL_SECONDS", "3600"))
+
+    # Statement timeout of the read-only routes (SET LOCAL statement_timeout), in ms; 0 = no limit.
+    # QUERY_TIMEOUTS_MS overrides it per route path template, e.g. "/transactions/filtered/count=3000,/stats/*=10000".
+    # A query is also cancelled on the server when its client disconnects (checked every QUERY_DISCONNECT_POLL_SECONDS).
+    QUERY_TIMEOUT_MS: int = int(os.getenv("QUERY_TIMEOUT_MS", "15000"))
+    QUERY_TIMEOUTS_MS: str = os.getenv("QUERY_TIMEOUTS_MS", "")
+    QUERY_DISCONNECT_POLL_SECONDS: float = float(os.getenv("QUERY_DISCONNECT_POLL_SECONDS", "0.5"))
+
+    # Process-wide LRU of the transactions looked up by id (GET /transactions/{id}, /predict, /lookup, reports),
+    # invalidated by this process's writes; other workers' writes are seen after TRANSACTION_CACHE_TTL_SECONDS.
+    # 0 rows disables it (lookups are still shared within a request)
+    TRANSACTION_CACHE_ROWS: int = int(os.getenv("TRANSACTION_CACHE_ROWS", "0"))
+    TRANSACTION_CACHE_TTL_SECONDS: float = float(os.getenv("TRANSACTION_CACHE_TTL_SECONDS", "30"))
+
+    # Read replica (READ_DATABASE_URL): read-only routes fall back to the primary when it lags more than this
+    REPLICA_MAX_LAG_SECONDS: float = float(os.getenv("REPLICA_MAX_LAG_SECONDS", "5"))
+    REPLICA_LAG_CHECK_INTERVAL_SECONDS: float = float(os.getenv("REPLICA_LAG_CHECK_INTERVAL_SECONDS", "1"))
+    # A lag probe (connect included) taking longer counts as an unreachable replica
+    REPLICA_LAG_PROBE_TIMEOUT_SECONDS: float = float(os.getenv("REPLICA_LAG_PROBE_TIMEOUT_SECONDS", "1"))
+
+settings = Settings()
@@ -1,22 +1,64 @@
+import asyncio
 import os
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+import time
+from typing import Callable, Optional
+from fastapi import Request
+from sqlalchemy import make_url, text
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 from dotenv import load_dotenv
+from app.settings.config import settings
+from app.infra.logger import setup_logger
+from app.infra.db_pool import InstrumentedAsyncPool
+from app.infra.prepared_statements import hot_statements
+from app.infra.query_budget import QueryBudgets, parse_budgets, query_budget
 
 # Load environment variables
 load_dotenv()
 
+logger = setup_logger(__name__)
+
 DATABASE_URL = os.getenv("DATABASE_URL")
-print(DATABASE_URL)
 
 if not DATABASE_URL:
     raise ValueError("DATABASE_URL environment variable is not set")
 
-# Convert postgresql:// to postgresql+asyncpg:// for async support
-if DATABASE_URL.startswith("postgresql://"):
-    DATABASE_URL = DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://")
+# Optional streaming replica used by read-only routes (see get_read_db)
+READ_DATABASE_URL = os.getenv("READ_DATABASE_URL")
+
+def _async_url(url: str) -> str:
+    # Convert postgresql:// to postgresql+asyncpg:// for async support
+    if url.startswith("postgresql://"):
+        return url.replace("postgresql://", "postgresql+asyncpg://")
+    return url
+
+DATABASE_URL = _async_url(DATABASE_URL)
 
-async_engine = create_async_engine(DATABASE_URL, echo=False)
+def _create_engine(url: str) -> AsyncEngine:
+    """
+    Async engine with the pool configured from settings and instrumented for GET /health/db-pool;
+    the hot statements of the repositories are prepared on its connections at checkout.
+    """
+    logger.info(f"Database engine: {make_url(url).render_as_string(hide_password=True)} (pool_size={settings.DB_POOL_SIZE}, max_overflow={settings.DB_MAX_OVERFLOW})")
+    engine = create_async_engine(
+        url,
+        echo=False,
+        poolclass=InstrumentedAsyncPool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        # asyncpg's own statement cache and SQLAlchemy's prepared statement cache of the adapter
+        connect_args={
+            "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+            "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        },
+    )
+    hot_statements.attach(engine)
+    return engine
+
+async_engine = _create_engine(DATABASE_URL)
 AsyncSessionLocal = sessionmaker(
     bind=async_engine,
     class_=AsyncSession,
@@ -24,7 +66,100 @@ AsyncSessionLocal = sessionmaker(
     autoflush=False
 )
 
+read_engine = _create_engine(_async_url(READ_DATABASE_URL)) if READ_DATABASE_URL else None
+AsyncReadSessionLocal = sessionmaker(
+    bind=read_engine,
+    class_=AsyncSession,
+    autocommit=False,
+    autoflush=False
+) if read_engine else None
+
+# Replay lag of a standby in seconds; 0 when it has replayed everything it received
+# (or is not a standby at all), NULL when it never replayed a transaction
+REPLICA_LAG_SQL = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+    END
+""")
+
+class ReplicaRouter:
+    """
+    Decides, per request, whether read-only sessions go to the replica or the primary.
+    The replica lag is measured at most every `check_interval` seconds and shared by all requests.
+    Requests only read the last measurement: a stale one starts a probe in the background, so a slow
+    or unreachable replica never holds up a request. Only the first requests, before any measurement,
+    wait for the probe, at most `probe_timeout` seconds.
+    """
+
+    def __init__(self, max_lag_seconds: float, check_interval_seconds: float, probe_timeout_seconds: float = settings.REPLICA_LAG_PROBE_TIMEOUT_SECONDS):
+        self.max_lag_seconds = max_lag_seconds
+        self.check_interval_seconds = check_interval_seconds
+        self.probe_timeout_seconds = probe_timeout_seconds
+        self.last_lag: Optional[float] = None
+        self._checked_at = float("-inf")
+        self._probe: Optional[asyncio.Task] = None
+
+    async def measure_lag(self) -> Optional[float]:
+        """Replay lag in seconds, None when the replica is unreachable or has never replayed anything."""
+        try:
+            async with read_engine.connect() as conn:
+                lag = (await conn.execute(REPLICA_LAG_SQL)).scalar()
+                return float(lag) if lag is not None else None
+        except Exception as e:
+            logger.warning(f"Read replica unavailable, using the primary: {e}")
+            return None
+
+    async def refresh(self) -> None:
+        """Measure the lag once; a probe slower than `probe_timeout` counts as an unreachable replica."""
+        try:
+            self.last_lag = await asyncio.wait_for(self.measure_lag(), self.probe_timeout_seconds)
+        except asyncio.TimeoutError:
+            logger.warning(f"Read replica lag probe timed out after {self.probe_timeout_seconds}s, using the primary")
+            self.last_lag = None
+        self._checked_at = time.monotonic()
+        if self.last_lag is not None and self.last_lag > self.max_lag_seconds:
+            logger.warning(f"Read replica lags {self.last_lag:.1f}s (max {self.max_lag_seconds}s), using the primary")
+
+    async def replica_usable(self) -> bool:
+        if read_engine is None:
+            return False
+        if time.monotonic() - self._checked_at >= self.check_interval_seconds and (self._probe is None or self._probe.done()):
+            self._probe = asyncio.create_task(self.refresh())
+        if self._checked_at == float("-inf"):
+            # Never measured yet: shielded, so a cancelled request does not cancel the probe the others wait for
+            await asyncio.shield(self._probe)
+        return self.last_lag is not None and self.last_lag <= self.max_lag_seconds
+
+replica_router = ReplicaRouter(settings.REPLICA_MAX_LAG_SECONDS, settings.REPLICA_LAG_CHECK_INTERVAL_SECONDS, settings.REPLICA_LAG_PROBE_TIMEOUT_SECONDS)
+
+query_budgets = QueryBudgets(settings.QUERY_TIMEOUT_MS, parse_budgets(settings.QUERY_TIMEOUTS_MS))
+
+def pool_stats() -> dict:
+    """Live pool metrics of the primary and (if configured) read replica engines."""
+    return {
+        "primary": async_engine.pool.stats(),
+        "replica": read_engine.pool.stats() if read_engine is not None else None,
+    }
+
 async def get_db():
     """Dependency to get async database session"""
     async with AsyncSessionLocal() as session:
         yield session
+
+async def get_read_session_factory() -> Callable[[], AsyncSession]:
+    """Session factory of the replica when it is configured and fresh enough, of the primary otherwise."""
+    if await replica_router.replica_usable():
+        return AsyncReadSessionLocal
+    return AsyncSessionLocal
+
+async def get_read_db(request: Request):
+    """
+    Dependency to get an async database session for read-only routes (replica or primary),
+    with the route's statement timeout (see app/infra/query_budget.py)
+    """
+    session_factory = await get_read_session_factory()
+    async with session_factory() as session:
+        async with query_budget(request, session, query_budgets, settings.QUERY_DISCONNECT_POLL_SECONDS):
+            yield session
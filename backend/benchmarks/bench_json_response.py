@@ -0,0 +1,73 @@
+"""
+Requests per second of the high-volume read endpoints, served in-process through
+httpx's ASGI transport (no network, so encoding cost is not hidden behind I/O),
+plus the encoding cost alone: jsonable_encoder + stdlib json versus FastJSONResponse.
+
+Needs a populated database (DATABASE_URL).
+
+Usage (from backend/):
+    python -m benchmarks.bench_json_response --seconds 5 --concurrency 8
+"""
+import argparse
+import asyncio
+import time
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+import httpx
+from app.main import app
+from app.settings.database import async_engine
+from app.infra.json_response import FastJSONResponse
+
+ENDPOINTS = [
+    "/transactions/?limit=100",
+    "/transactions/?limit=100&include_predictions=false&country=USA",
+    "/stats/overview",
+]
+
+async def rps(client: httpx.AsyncClient, url: str, seconds: float, concurrency: int) -> float:
+    done = 0
+    deadline = time.perf_counter() + seconds
+
+    async def worker():
+        nonlocal done
+        while time.perf_counter() < deadline:
+            response = await client.get(url)
+            response.raise_for_status()
+            done += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    return done / (time.perf_counter() - start)
+
+def encode_cost(payload, repeat: int = 200) -> tuple:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        JSONResponse(jsonable_encoder(payload))
+    stdlib = (time.perf_counter() - start) / repeat
+    start = time.perf_counter()
+    for _ in range(repeat):
+        FastJSONResponse(payload)
+    fast = (time.perf_counter() - start) / repeat
+    return stdlib, fast
+
+async def main(seconds: float, concurrency: int) -> None:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        print(f"{'endpoint':<65} {'req/s':>8}")
+        for url in ENDPOINTS:
+            await client.get(url)  # warm-up (connection pool, stats cache)
+            print(f"{url:<65} {await rps(client, url, seconds, concurrency):>8.1f}")
+
+        print(f"\n{'payload':<20} {'stdlib ms':>10} {'orjson ms':>10}")
+        for name, url in (("list (100 rows)", ENDPOINTS[0]), ("stats overview", ENDPOINTS[2])):
+            payload = (await client.get(url)).json()
+            stdlib, fast = encode_cost(payload)
+            print(f"{name:<20} {stdlib * 1000:>10.3f} {fast * 1000:>10.3f}")
+    await async_engine.dispose()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+    asyncio.run(main(args.seconds, args.concurrency))
@@ -0,0 +1,64 @@
+"""
+Per-row cost of the GET /transactions/ list path: ORM entities + TransactionResponse
+validation/serialization (what FastAPI does with response_model) versus the projection
+path (Core rows -> dicts -> JSONResponse).
+
+Needs a populated database (DATABASE_URL), e.g. loaded with data/load_data.py.
+
+Usage (from backend/):
+    python -m benchmarks.bench_list_path --pages 100 10000 --repeat 5
+"""
+import argparse
+import asyncio
+import time
+from typing import List
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+from app.settings.database import AsyncSessionLocal, async_engine
+from app.schemas.filter_schema import TransactionFilter
+from app.schemas.transaction_schema import TransactionResponse
+from app.service.transaction_service import TransactionService
+import app.models.user_model  # noqa: F401  (registers Analysis for the Transaction mapper)
+
+RESPONSE_ADAPTER = TypeAdapter(List[TransactionResponse])
+
+async def orm_path(limit: int) -> bytes:
+    async with AsyncSessionLocal() as session:
+        service = TransactionService(session)
+        items = await service.get_transactions(TransactionFilter(), limit, 0, False)
+        # FastAPI: validate against response_model, dump, then encode
+        validated = RESPONSE_ADAPTER.validate_python([item.model_dump() for item in items])
+        return JSONResponse(jsonable_encoder(RESPONSE_ADAPTER.dump_python(validated, mode="json"))).body
+
+async def projection_path(limit: int) -> bytes:
+    async with AsyncSessionLocal() as session:
+        service = TransactionService(session)
+        rows = await service.get_transactions_projection(TransactionFilter(), limit, 0)
+        return JSONResponse(rows).body
+
+async def measure(fn, limit: int, repeat: int) -> tuple:
+    await fn(limit)  # warm-up (connection, statement cache)
+    timings = []
+    rows = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = await fn(limit)
+        timings.append(time.perf_counter() - start)
+        rows = body.count(b'"transaction_id"')
+    return min(timings), rows
+
+async def main(pages: List[int], repeat: int) -> None:
+    print(f"{'page':>7} {'path':>11} {'rows':>7} {'best ms':>9} {'us/row':>8}")
+    for limit in pages:
+        for name, fn in (("orm", orm_path), ("projection", projection_path)):
+            best, rows = await measure(fn, limit, repeat)
+            print(f"{limit:>7} {name:>11} {rows:>7} {best * 1000:>9.1f} {best * 1e6 / max(rows, 1):>8.1f}")
+    await async_engine.dispose()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, nargs="+", default=[100, 10_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.pages, args.repeat))
@@ -0,0 +1,89 @@
+"""
+Latency of the lookup by id (GET /transactions/{transaction_id}) before and after the hot
+statement registry (app/infra/prepared_statements.py):
+- first lookup on a new connection: prepared and planned at execution (before) versus at checkout (after);
+- steady state: select() built and its cache key computed on every call (before) versus the
+  registered statement executed with a parameter (after, TransactionRepository.get_transaction_id).
+
+Needs a populated database (DATABASE_URL).
+
+Usage (from backend/):
+    python -m benchmarks.bench_lookup_by_id --lookups 2000 --connections 50
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from typing import List
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.pool import NullPool
+from app.settings.config import settings
+from app.settings.database import DATABASE_URL, async_engine
+from app.models.transaction_model import Transaction
+from app.infra.prepared_statements import hot_statements
+from app.repositories.transaction_repo import TransactionRepository
+import app.models.user_model  # noqa: F401  (registers Analysis for the Transaction mapper)
+
+def percentiles(timings: List[float]) -> str:
+    timings = sorted(timings)
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    return f"{statistics.median(timings) * 1000:>8.3f} {p95 * 1000:>8.3f}"
+
+async def built_lookup(session: AsyncSession, transaction_id: str) -> Transaction:
+    # What the repository did before: a new select() per call
+    result = await session.execute(select(Transaction).where(Transaction.transaction_id == transaction_id))
+    return result.scalar_one_or_none()
+
+async def registered_lookup(session: AsyncSession, transaction_id: str) -> Transaction:
+    return await TransactionRepository(session).get_transaction_id(transaction_id)
+
+async def first_lookup(ids: List[str], prepared: bool) -> List[float]:
+    """First lookup served by each of len(ids) new connections (NullPool: one per session)."""
+    engine = create_async_engine(
+        DATABASE_URL,
+        poolclass=NullPool,
+        connect_args={"statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE, "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE},
+    )
+    if prepared:
+        hot_statements.attach(engine)
+    timings = []
+    for transaction_id in [ids[0], *ids]:
+        async with AsyncSession(engine) as session:
+            await session.connection()  # connect (and prepare) outside the timing
+            start = time.perf_counter()
+            await built_lookup(session, transaction_id)
+            timings.append(time.perf_counter() - start)
+    await engine.dispose()
+    return timings[1:]  # the first one also compiled the statement
+
+async def steady_lookup(ids: List[str], lookup) -> List[float]:
+    timings = []
+    async with AsyncSession(async_engine) as session:
+        await lookup(session, ids[0])  # warm-up
+        for transaction_id in ids:
+            start = time.perf_counter()
+            await lookup(session, transaction_id)
+            timings.append(time.perf_counter() - start)
+            session.expunge_all()
+    return timings
+
+async def main(lookups: int, connections: int) -> None:
+    async with async_engine.connect() as conn:
+        ids = list((await conn.scalars(select(Transaction.transaction_id).limit(lookups))).all())
+    if not ids:
+        raise SystemExit("No transactions: load data first")
+
+    print(f"{'case':<34} {'p50 ms':>8} {'p95 ms':>8}")
+    for name, prepared in (("new connection, before", False), ("new connection, after", True)):
+        print(f"{name:<34} {percentiles(await first_lookup(ids[:connections], prepared))}")
+    for name, lookup in (("steady state, before", built_lookup), ("steady state, after", registered_lookup)):
+        print(f"{name:<34} {percentiles(await steady_lookup(ids, lookup))}")
+    await async_engine.dispose()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lookups", type=int, default=2000)
+    parser.add_argument("--connections", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(main(args.lookups, args.connections))
@@ -41,13 +41,14 @@ async def pg_sessionmaker(pg_url):
 def client(pg_sessionmaker):
     # import tardio — agora a DATABASE_URL já aponta para o container
     from app.main import app
-    from app.settings.database import get_db
+    from app.settings.database import get_db, get_read_db
 
     async def _override_get_db():
         async with pg_sessionmaker() as session:
             yield session
 
     app.dependency_overrides[get_db] = _override_get_db
+    app.dependency_overrides[get_read_db] = _override_get_db
     with TestClient(app) as c:
         yield c
     app.dependency_overrides.clear()
\ No newline at end of file
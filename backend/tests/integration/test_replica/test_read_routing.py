@@ -0,0 +1,88 @@
+import asyncio
+import pytest
+from testcontainers.postgres import PostgresContainer
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+from fastapi.testclient import TestClient
+from app.settings.base import Base
+
+# Two independent Postgres instances stand in for primary and replica: a row written only to the
+# primary tells which one served the request. Real streaming replication: docker-compose.replica.yml
+
+def _async_url(url: str) -> str:
+    return url.replace("postgresql+psycopg2://", "postgresql+asyncpg://").replace("postgresql://", "postgresql+asyncpg://")
+
+@pytest.fixture(scope="module")
+def replica_sessionmaker(pg_url):
+    with PostgresContainer("postgres:16") as replica:
+        engine = create_async_engine(_async_url(replica.get_connection_url()), echo=False)
+
+        async def create_tables():
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+        asyncio.run(create_tables())
+
+        yield engine, sessionmaker(bind=engine, class_=AsyncSession, autocommit=False, autoflush=False)
+
+@pytest.fixture
+def routed_client(pg_url, replica_sessionmaker, monkeypatch):
+    # import tardio — a DATABASE_URL já aponta para o container primário
+    from app.main import app
+    from app.settings import database
+
+    engine, session_factory = replica_sessionmaker
+    monkeypatch.setattr(database, "read_engine", engine)
+    monkeypatch.setattr(database, "AsyncReadSessionLocal", session_factory)
+    monkeypatch.setattr(database, "replica_router", database.ReplicaRouter(max_lag_seconds=5, check_interval_seconds=0))
+    with TestClient(app) as c:
+        yield c, database.replica_router
+
+def _payload(transaction_id: str) -> dict:
+    return {
+        "transaction_id": transaction_id, "customer_id": "CUST_R", "card_number": "1234567890123456",
+        "timestamp": "2024-09-30T00:00:01.000000", "merchant": "Loja", "merchant_category": "GROCERY",
+        "merchant_type": "physical", "amount": 10.0, "currency": "USD", "country": "Portugal", "city": "Lisboa",
+        "city_size": "large", "card_type": "VISA", "card_present": 1, "device": "Chrome", "channel": "web",
+        "device_fingerprint": "fp", "ip_address": "1.1.1.1", "distance_from_home": 0, "high_risk_merchant": False,
+        "transaction_hour": 0, "weekend_transaction": False,
+        "velocity_last_hour": {"num_transactions": 1, "total_amount": 10.0, "unique_merchants": 1, "unique_countries": 1, "max_single_amount": 10.0},
+    }
+
+def test_reads_go_to_replica_and_writes_to_primary(routed_client):
+    client, _ = routed_client
+    assert client.post("/transactions/create_transaction", json=_payload("TX_PRIMARY_ONLY")).status_code == 200
+    # Written on the primary, absent from the replica
+    assert client.get("/transactions/TX_PRIMARY_ONLY").status_code == 404
+
+def test_lagging_replica_falls_back_to_primary(routed_client):
+    client, router = routed_client
+    client.post("/transactions/create_transaction", json=_payload("TX_LAG"))
+    router.max_lag_seconds = -1  # any lag is too much
+    assert client.get("/transactions/TX_LAG").status_code == 200
+
+def _refresh(client, router) -> None:
+    # Requests only read the last measurement; probe now instead of waiting for the background one
+    client.portal.call(router.refresh)
+
+def test_unreachable_replica_falls_back_to_primary(routed_client, monkeypatch):
+    client, router = routed_client
+    client.post("/transactions/create_transaction", json=_payload("TX_DOWN"))
+
+    async def unreachable():
+        return None
+    monkeypatch.setattr(router, "measure_lag", unreachable)
+    _refresh(client, router)
+    assert client.get("/transactions/TX_DOWN").status_code == 200
+
+def test_slow_replica_probe_does_not_block_reads(routed_client, monkeypatch):
+    client, router = routed_client
+    client.post("/transactions/create_transaction", json=_payload("TX_SLOW"))
+
+    async def black_holed():
+        await asyncio.sleep(60)
+    monkeypatch.setattr(router, "measure_lag", black_holed)
+    router.probe_timeout_seconds = 0.2
+    _refresh(client, router)
+    assert router.last_lag is None
+    # Probes keep timing out in the background; the request neither waits for them nor uses the replica
+    assert client.get("/transactions/TX_SLOW").status_code == 200
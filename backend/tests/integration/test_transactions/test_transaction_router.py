@@ -253,6 +253,18 @@ def test_get_transaction_found(client, pg_sessionmaker):
     data = r.json()
     assert data["amount"] == 100.0
 
+def test_lookup_transactions_in_request_order(client, pg_sessionmaker):
+    db = pg_sessionmaker()
+    db.add_all([build_transaction(transaction_id=f"tx_lookup_{i}", amount=100.0 + i) for i in range(3)])
+    db.commit()
+
+    r = client.post("/transactions/lookup", json={"ids": ["tx_lookup_2", "UNKNOWN_ID", "tx_lookup_0"], "include_predictions": True})
+    assert r.status_code == 200
+    data = r.json()
+    assert [tx["transaction_id"] for tx in data["transactions"]] == ["tx_lookup_2", "tx_lookup_0"]
+    assert data["missing"] == ["UNKNOWN_ID"]
+    assert all(0.0 <= tx["fraud_probability"] <= 1.0 for tx in data["transactions"])
+
 def test_health_check(client):
     r = client.get("/health")
     assert r.status_code == 200
@@ -342,4 +354,50 @@ def test_update_transaction_not_found(client):
     assert r.status_code == 404
     data = r.json()
     assert "does not exist" in data.get("message", "")
-    
\ No newline at end of file
+    
+def test_patch_transaction_updates_only_sent_fields(client, pg_sessionmaker):
+    db = pg_sessionmaker()
+    db.add(build_transaction(transaction_id="tx_patch", merchant="Before"))
+    db.commit()
+
+    r = client.patch("/transactions/tx_patch", json={"is_fraud": True})
+    assert r.status_code == 200
+    data = r.json()["data"]
+    assert data["is_fraud"] is True
+    assert data["merchant"] == "Before"
+
+    assert client.patch("/transactions/ID_NOT_FOUND", json={"is_fraud": True}).status_code == 404
+    assert client.patch("/transactions/tx_patch", json={}).status_code == 400
+
+def test_bulk_patch_transactions(client, pg_sessionmaker):
+    db = pg_sessionmaker()
+    db.add_all([build_transaction(transaction_id=f"tx_bulk_patch_{i}") for i in range(3)])
+    db.commit()
+
+    updates = [
+        {"transaction_id": "tx_bulk_patch_0", "is_fraud": True},
+        {"transaction_id": "tx_bulk_patch_1", "is_fraud": True},
+        {"transaction_id": "tx_bulk_patch_2", "country": "ES", "city": "Madrid"},
+        {"transaction_id": "ID_NOT_FOUND", "is_fraud": True},
+    ]
+    r = client.patch("/transactions/bulk", json={"updates": updates})
+    assert r.status_code == 200
+    assert r.json() == {"requested": 4, "updated": 3, "missing": ["ID_NOT_FOUND"]}
+
+    data = client.get("/transactions/tx_bulk_patch_2").json()
+    assert (data["country"], data["city"], data["is_fraud"]) == ("ES", "Madrid", False)
+    assert client.get("/transactions/tx_bulk_patch_0").json()["is_fraud"] is True
+
+def test_delete_transactions_by_filter(client, pg_sessionmaker):
+    db = pg_sessionmaker()
+    db.add_all([build_transaction(transaction_id=f"tx_bulk_delete_{i}", customer_id="CUST_BULK_DELETE", is_fraud=i == 0) for i in range(3)])
+    db.add(build_transaction(transaction_id="tx_bulk_keep", customer_id="CUST_BULK_KEEP"))
+    db.commit()
+
+    assert client.delete("/transactions/").status_code == 400
+    r = client.delete("/transactions/", params={"customer_id": "CUST_BULK_DELETE"})
+    assert r.status_code == 200
+    assert r.json()["deleted"] == 3
+    assert r.json()["fraud_deleted"] == 1
+    assert client.get("/transactions/tx_bulk_delete_0").status_code == 404
+    assert client.get("/transactions/tx_bulk_keep").status_code == 200
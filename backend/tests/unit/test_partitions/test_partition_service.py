@@ -0,0 +1,43 @@
+from datetime import date, datetime
+import pytest
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+from app.models.transaction_model import Transaction
+from app.models import user_model  # noqa: F401 - registers Analysis for the Transaction mapper
+from app.repositories.transaction_repo import filter_conditions
+from app.schemas.filter_schema import TransactionFilter
+from app.service.partition_service import add_months, month_start, partition_month, partition_name
+
+@pytest.mark.parametrize(
+    "value,months,expected",
+    [
+        (date(2024, 1, 1), 1, date(2024, 2, 1)),
+        (date(2024, 12, 1), 1, date(2025, 1, 1)),
+        (date(2024, 1, 1), -1, date(2023, 12, 1)),
+        (date(2024, 3, 1), -14, date(2023, 1, 1)),
+        (date(2024, 3, 1), 0, date(2024, 3, 1)),
+    ]
+)
+def test_add_months(value, months, expected):
+    assert add_months(value, months) == expected
+
+def test_month_start_accepts_datetime():
+    assert month_start(datetime(2024, 9, 30, 23, 59, 59)) == date(2024, 9, 1)
+
+def test_partition_name_roundtrip():
+    name = partition_name(date(2024, 9, 1))
+    assert name == "transactions_p2024_09"
+    assert partition_month(name) == date(2024, 9, 1)
+
+@pytest.mark.parametrize("name", ["transactions_default", "transactions_pfoo", "other_p2024_01"])
+def test_partition_month_ignores_unknown_tables(name):
+    assert partition_month(name) is None
+
+def test_date_filters_compare_raw_partition_key():
+    filters = TransactionFilter(start_date=datetime(2024, 9, 1), end_date=datetime(2024, 9, 7), distance_from_home=0)
+    stmt = select(Transaction.transaction_id).where(*filter_conditions(filters))
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+    assert "transactions.timestamp >= " in sql
+    assert "transactions.timestamp <= " in sql
+    # 0 is a real value for distance_from_home and must not be dropped
+    assert "transactions.distance_from_home = " in sql
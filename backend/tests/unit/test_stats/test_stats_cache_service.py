@@ -0,0 +1,55 @@
+import asyncio
+from app.models.counter_model import dimension_delta_sql
+from app.service.stats_cache_service import StatsCacheService
+import app.models.user_model  # noqa: F401  (registers Analysis for the Transaction mapper)
+
+class FakeCounterRepo:
+    async def get_dimension_totals(self):
+        return {
+            "country": {"USA": {"total_transactions": 3, "fraud_transactions": 1}},
+            "high_risk_merchant": {"true": {"total_transactions": 2, "fraud_transactions": 1}},
+            "distance_from_home": {"0": {"total_transactions": 1, "fraud_transactions": 0}},
+        }
+
+class FakeTransactionService:
+    def __init__(self):
+        self.hourly_days = []
+
+    async def get_hourly_transaction_stats(self, days: int = 90):
+        self.hourly_days.append(days)
+        return []
+
+class FakeViewRepo:
+    async def get_dimension_totals(self):
+        return {"country": {"UK": {"total_transactions": 5, "fraud_transactions": 0}}}
+
+def test_overview_from_dimension_counters():
+    service = StatsCacheService.__new__(StatsCacheService)
+    service.counter_repo = FakeCounterRepo()
+    service.transaction_service = FakeTransactionService()
+
+    overview = asyncio.run(service._compute_stats_overview())
+
+    assert overview["countries"] == {"USA": {"total_transactions": 3, "fraud_transactions": 1}}
+    assert overview["high_risk_merchant"][True] == {"total_transactions": 2, "fraud_transactions": 1}
+    assert overview["high_risk_merchant"][False] == {"total_transactions": 0, "fraud_transactions": 0}
+    assert overview["distance_from_home"] == {0: {"total_transactions": 1, "fraud_transactions": 0}}
+    assert overview["device"] == {}
+    assert overview["hourly_stats"] == []
+
+def test_overview_from_views_reads_hourly_stats_from_rollup(monkeypatch):
+    monkeypatch.setattr("app.service.stats_cache_service.settings.STATS_SOURCE", "materialized_views")
+    service = StatsCacheService.__new__(StatsCacheService)
+    service.view_repo = FakeViewRepo()
+    service.transaction_service = FakeTransactionService()
+
+    overview = asyncio.run(service._compute_stats_overview())
+
+    assert overview["countries"] == {"UK": {"total_transactions": 5, "fraud_transactions": 0}}
+    # Same window as with the counters
+    assert service.transaction_service.hourly_days == [StatsCacheService.HOURLY_STATS_DAYS]
+
+def test_dimension_delta_sql_covers_every_dimension():
+    sql = dimension_delta_sql("old_rows", "-")
+    assert "FROM old_rows r" in sql and "-1 AS total" in sql
+    assert "('weekend_transaction', r.weekend_transaction::text)" in sql
@@ -0,0 +1,62 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+import pytest
+from app.exception.transaction_exceptions import TransactionInvalidDataError
+from app.models.rollup_model import rollup_delta_sql, rollup_upsert_sql
+from app.schemas.filter_schema import TimeseriesFilter
+from app.service.timeseries_service import TransactionTimeseriesService
+import app.models.user_model  # noqa: F401  (registers Analysis for the Transaction mapper)
+
+class FakeRollupRepo:
+    def __init__(self):
+        self.calls = []
+
+    async def latest_bucket(self):
+        return datetime(2024, 6, 30, 23)
+
+    async def get_series(self, bucket, start, end, dimensions):
+        self.calls.append((bucket, start, end, dimensions))
+        return [(datetime(2024, 6, 29), 10, 2)]
+
+def build_service() -> TransactionTimeseriesService:
+    service = TransactionTimeseriesService.__new__(TransactionTimeseriesService)
+    service.rollup = FakeRollupRepo()
+    return service
+
+def test_day_series_defaults_to_90_days_up_to_latest_transaction():
+    service = build_service()
+    series = asyncio.run(service.get_series("day", None, None, TimeseriesFilter(country="USA")))
+
+    assert series["to"] == datetime(2024, 7, 1)
+    assert series["from"] == datetime(2024, 4, 2)
+    assert len(series["points"]) == 90
+    assert series["points"][-2] == {"bucket_start": datetime(2024, 6, 29), "total_transactions": 10, "fraud_transactions": 2}
+    assert series["points"][-1]["total_transactions"] == 0
+    assert service.rollup.calls == [("day", datetime(2024, 4, 2), datetime(2024, 7, 1), {"country": "USA"})]
+
+def test_range_rounded_to_whole_buckets():
+    service = build_service()
+    series = asyncio.run(service.get_series("hour", datetime(2024, 6, 1, 10, 30), datetime(2024, 6, 1, 12, 15), TimeseriesFilter()))
+    assert (series["from"], series["to"]) == (datetime(2024, 6, 1, 10), datetime(2024, 6, 1, 13))
+    assert len(series["points"]) == 3
+
+def test_aware_bounds_converted_to_naive_utc():
+    service = build_service()
+    # Only `from` given: `to` comes from the (naive) latest rollup bucket
+    series = asyncio.run(service.get_series("day", datetime(2024, 6, 1, tzinfo=timezone.utc), None, TimeseriesFilter()))
+    assert (series["from"], series["to"]) == (datetime(2024, 6, 1), datetime(2024, 7, 1))
+
+    lisbon_summer = timezone(timedelta(hours=1))
+    series = asyncio.run(service.get_series("hour", datetime(2024, 6, 1, 10, tzinfo=lisbon_summer), datetime(2024, 6, 1, 12, tzinfo=lisbon_summer), TimeseriesFilter()))
+    assert (series["from"], series["to"]) == (datetime(2024, 6, 1, 9), datetime(2024, 6, 1, 11))
+    assert series["from"].tzinfo is None
+
+def test_too_many_points_rejected():
+    service = build_service()
+    with pytest.raises(TransactionInvalidDataError):
+        asyncio.run(service.get_series("minute", datetime(2024, 5, 1), datetime(2024, 6, 1), TimeseriesFilter()))
+
+def test_rollup_sql_keys_and_signs():
+    sql = rollup_upsert_sql(rollup_delta_sql("old_rows", "-"))
+    assert "date_trunc('hour', r.timestamp)" in sql and "-1 AS total" in sql
+    assert "ON CONFLICT (bucket_start, country, merchant_category, channel, high_risk_merchant)" in sql
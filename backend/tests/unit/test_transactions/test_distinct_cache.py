@@ -0,0 +1,27 @@
+from app.infra.distinct_cache import DistinctValuesCache
+
+def test_get_is_none_until_loaded():
+    cache = DistinctValuesCache(["country"])
+    assert cache.get("country") is None
+
+    cache.load("country", ["USA", "UK", None])
+    assert cache.get("country") == ["UK", "USA"]
+
+def test_version_bumped_only_for_new_values():
+    cache = DistinctValuesCache(["country", "channel"])
+    cache.load("country", ["USA", "UK"])
+    version = cache.version("country")
+
+    assert cache.observe("country", ["USA", "UK", None]) is False
+    assert cache.version("country") == version
+
+    assert cache.observe("country", ["USA", "Brazil"]) is True
+    assert cache.version("country") == version + 1
+    assert cache.get("country") == ["Brazil", "UK", "USA"]
+
+def test_values_observed_before_load_are_kept():
+    cache = DistinctValuesCache(["channel"])
+    cache.observe_records(["transaction_id", "channel"], [("TX_1", "pos"), ("TX_2", None)])
+    cache.load("channel", ["web"])
+
+    assert cache.get("channel") == ["pos", "web"]
@@ -0,0 +1,113 @@
+import asyncio
+import json
+import pandas as pd
+import pytest
+from app.service.ingest_service import INGEST_COLUMNS, iter_frames, normalize_chunk, to_records
+
+def valid_row(**overrides) -> dict:
+    base = dict(
+        transaction_id="TX_1",
+        customer_id="CUST_1",
+        card_number="1234567890123456",
+        timestamp="2024-09-30T00:00:01.034820+00:00",
+        amount="100.5",
+        currency="EUR",
+        card_present="False",
+        distance_from_home="1",
+        transaction_hour="12",
+        velocity_last_hour="{'num_transactions': 1, 'total_amount': 100.0}",
+        is_fraud="1",
+    )
+    base.update(overrides)
+    return base
+
+async def _collect_with_counts(body: bytes, fmt: str, chunk_rows: int) -> list:
+    async def stream():
+        yield body
+    return [chunk async for chunk in iter_frames(stream(), fmt, chunk_rows)]
+
+async def _collect(body: bytes, fmt: str, chunk_rows: int, block_size: int = 7) -> list:
+    async def stream():
+        for start in range(0, len(body), block_size):
+            yield body[start:start + block_size]
+    return [frame async for frame, _ in iter_frames(stream(), fmt, chunk_rows)]
+
+def test_normalize_chunk_coerces_types():
+    valid, rejected = normalize_chunk(pd.DataFrame([valid_row()]))
+    assert rejected == 0
+    assert list(valid.columns) == INGEST_COLUMNS
+    record = dict(zip(INGEST_COLUMNS, to_records(valid)[0]))
+    assert record["amount"] == 100.5
+    assert record["card_present"] is False
+    assert record["is_fraud"] is True
+    assert record["distance_from_home"] == 1
+    assert record["timestamp"].tzinfo is None
+    assert json.loads(record["velocity_last_hour"]) == {"num_transactions": 1, "total_amount": 100.0}
+    assert record["merchant"] is None
+
+def test_normalize_chunk_fills_typed_velocity_columns():
+    rows = [
+        valid_row(),
+        valid_row(transaction_id="TX_2", velocity_last_hour={"num_transactions": 2.6, "total_amount": "5", "unique_merchants": True}),
+        valid_row(transaction_id="TX_3", velocity_last_hour=None),
+        valid_row(transaction_id="TX_4", velocity_num_transactions="8"),
+    ]
+    valid, rejected = normalize_chunk(pd.DataFrame(rows))
+    assert rejected == 0
+    records = {record[0]: dict(zip(INGEST_COLUMNS, record)) for record in to_records(valid)}
+
+    assert records["TX_1"]["velocity_num_transactions"] == 1
+    assert records["TX_1"]["velocity_total_amount"] == 100.0
+    assert records["TX_1"]["velocity_max_single_amount"] == 0.0
+    # Non-numeric entries count as 0, like in the features
+    assert records["TX_2"]["velocity_num_transactions"] == 3
+    assert records["TX_2"]["velocity_total_amount"] == 0.0
+    assert records["TX_2"]["velocity_unique_merchants"] == 0
+    assert records["TX_3"]["velocity_num_transactions"] is None
+    # Sent as a column: kept
+    assert records["TX_4"]["velocity_num_transactions"] == 8
+
+@pytest.mark.parametrize(
+    "overrides",
+    [
+        {"timestamp": "not a date"},
+        {"amount": "abc"},
+        {"transaction_hour": "1.5"},
+        {"card_present": "maybe"},
+        {"card_number": "9" * 40},
+        {"customer_id": None},
+    ]
+)
+def test_normalize_chunk_rejects_invalid_rows(overrides):
+    valid, rejected = normalize_chunk(pd.DataFrame([valid_row(), valid_row(transaction_id="TX_2", **overrides)]))
+    assert rejected == 1
+    assert valid["transaction_id"].tolist() == ["TX_1"]
+
+def test_iter_frames_csv_chunks_keep_header():
+    frame = pd.DataFrame([valid_row(transaction_id=f"TX_{i}") for i in range(5)])
+    body = frame.to_csv(index=False).encode()
+    frames = asyncio.run(_collect(body, "csv", chunk_rows=2))
+    assert sum(len(f) for f in frames) == 5
+    assert all("transaction_id" in f.columns for f in frames)
+
+def test_iter_frames_ndjson():
+    body = "\n".join(json.dumps(valid_row(transaction_id=f"TX_{i}")) for i in range(3)).encode()
+    frames = asyncio.run(_collect(body, "ndjson", chunk_rows=10))
+    assert len(frames) == 1
+    assert frames[0]["transaction_id"].tolist() == ["TX_0", "TX_1", "TX_2"]
+
+def test_iter_frames_counts_malformed_ndjson_lines():
+    lines = [json.dumps(valid_row(transaction_id="TX_0")), "{not json", json.dumps(valid_row(transaction_id="TX_1")), "[1, 2]"]
+    [(frame, unparseable)] = asyncio.run(_collect_with_counts("\n".join(lines).encode(), "ndjson", chunk_rows=10))
+    assert unparseable == 2
+    assert frame["transaction_id"].tolist() == ["TX_0", "TX_1"]
+
+@pytest.mark.parametrize("bad_line", ["TX_9,too,many" + ",x" * 20, '"TX_9,unterminated'])
+@pytest.mark.parametrize("position", [0, 2])
+def test_iter_frames_counts_malformed_csv_lines(bad_line, position):
+    frame = pd.DataFrame([valid_row(transaction_id=f"TX_{i}") for i in range(3)])
+    header, *lines = frame.to_csv(index=False).splitlines()
+    lines.insert(position, bad_line)
+    [(parsed, unparseable)] = asyncio.run(_collect_with_counts("\n".join([header, *lines]).encode(), "csv", chunk_rows=10))
+    assert unparseable == 1
+    assert parsed["transaction_id"].tolist() == ["TX_0", "TX_1", "TX_2"]
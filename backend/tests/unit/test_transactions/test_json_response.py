@@ -0,0 +1,28 @@
+import datetime
+import json
+from decimal import Decimal
+from app.infra.json_response import FastJSONResponse
+from app.schemas.transaction_schema import TRANSACTION_LIST_ADAPTER, TransactionResponse, VelocityResponse
+
+def make_response(**overrides) -> TransactionResponse:
+    base = dict(
+        transaction_id="TX_1", customer_id="CUST_1", card_number="************3456",
+        timestamp=datetime.datetime(2024, 9, 30, 0, 0, 1, 34820), merchant="Amazon", merchant_category="Retail",
+        merchant_type="online", amount=99.99, currency="USD", country="USA", city="Unknown City", city_size="medium",
+        card_type="Visa", card_present=0, device="Chrome", channel="web", device_fingerprint="fp", ip_address="1.1.1.1",
+        distance_from_home=0, high_risk_merchant=False, transaction_hour=0, weekend_transaction=False,
+        velocity_last_hour=VelocityResponse(num_transactions=1, total_amount=1.0, unique_merchants=1, unique_countries=1, max_single_amount=1.0),
+        is_fraud=False, fraud_probability=0.0,
+    )
+    base.update(overrides)
+    return TransactionResponse(**base)
+
+def test_stats_dict_with_non_str_keys():
+    body = FastJSONResponse({"high_risk_merchant": {True: {"total_transactions": 1}, False: {}}, "avg": Decimal("1.5")}).body
+    assert json.loads(body) == {"high_risk_merchant": {"true": {"total_transactions": 1}, "false": {}}, "avg": 1.5}
+
+def test_from_model_matches_pydantic_json():
+    items = [make_response(), make_response(transaction_id="TX_2")]
+    response = FastJSONResponse.from_model(TRANSACTION_LIST_ADAPTER, items)
+    assert json.loads(response.body) == [json.loads(item.model_dump_json()) for item in items]
+    assert response.media_type == "application/json"
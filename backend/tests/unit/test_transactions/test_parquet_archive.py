@@ -0,0 +1,85 @@
+from datetime import date, datetime
+import pyarrow.parquet as pq
+from app.infra.parquet_archive import ParquetArchive, publish, sample_ids
+from app.models.transaction_model import Transaction
+from app.schemas.filter_schema import TransactionFilter
+from app.service import archive_service
+from app.service.archive_service import archive_expression, rows_file_name
+
+def build_row(transaction_id: str, timestamp: datetime, country: str = "Portugal", is_fraud: bool = False) -> tuple:
+    values = dict(
+        transaction_id=transaction_id, customer_id="CUST_1", card_number="1234567890123456", timestamp=timestamp,
+        merchant="Loja XPTO", amount=100.0, currency="EUR", country=country, card_present=True,
+        velocity_last_hour={"num_transactions": 1}, is_fraud=is_fraud,
+    )
+    return tuple(values.get(column.name) for column in Transaction.__table__.columns)
+
+def write_month(archive: ParquetArchive, month: date, rows: list, row_group_rows: int = 2, name: str = "rows"):
+    archive_file = archive.new_file(month, name, row_group_rows)
+    archive_file.write(rows)
+    assert archive_file.close() == len(rows)
+    archive_file.publish()
+    return archive_file
+
+def test_file_invisible_until_published(tmp_path):
+    archive = ParquetArchive(str(tmp_path))
+    archive_file = archive.new_file(date(2024, 5, 1), "transactions_p2024_05", 2)
+    archive_file.write([build_row(f"TX_{i}", datetime(2024, 5, 1, i)) for i in range(5)])
+    archive_file.close()
+    assert archive.files() == []
+
+    archive_file.publish()
+    assert archive.files() == [str(tmp_path / "year=2024" / "month=05" / "transactions_p2024_05.parquet")]
+    assert pq.ParquetFile(archive.files()[0]).metadata.num_row_groups == 3
+
+def test_files_pruned_by_month(tmp_path):
+    archive = ParquetArchive(str(tmp_path))
+    write_month(archive, date(2024, 5, 1), [build_row("TX_MAY", datetime(2024, 5, 3))])
+    write_month(archive, date(2024, 6, 1), [build_row("TX_JUN", datetime(2024, 6, 3))])
+
+    assert archive.months() == [date(2024, 5, 1), date(2024, 6, 1)]
+    assert len(archive.files(start=datetime(2024, 6, 2))) == 1
+    assert len(archive.files(end=datetime(2024, 5, 31))) == 1
+    assert archive.stats()["rows"] == 2
+
+def test_scan_applies_filters(tmp_path):
+    archive = ParquetArchive(str(tmp_path))
+    write_month(archive, date(2024, 5, 1), [
+        build_row("TX_1", datetime(2024, 5, 1), country="Portugal"),
+        build_row("TX_2", datetime(2024, 5, 2), country="Spain", is_fraud=True),
+        build_row("TX_3", datetime(2024, 5, 3), country="portugal", is_fraud=True),
+    ])
+
+    filters = TransactionFilter(country="PORT", is_fraud=True, start_date=datetime(2024, 5, 1))
+    records = [record for batch in archive.scan(archive_expression(filters), filters.start_date, filters.end_date, 100) for record in batch.to_pylist()]
+    assert [record["transaction_id"] for record in records] == ["TX_3"]
+    assert records[0]["velocity_last_hour"] == '{"num_transactions": 1}'
+
+def test_scan_without_files_is_empty(tmp_path):
+    archive = ParquetArchive(str(tmp_path / "missing"))
+    assert list(archive.scan(None, None, None, 100)) == []
+
+def test_unpublished_files_are_listed_and_sampled(tmp_path):
+    archive = ParquetArchive(str(tmp_path))
+    finished = archive.new_file(date(2024, 5, 1), "rows-until-20240520T000000", 2)
+    finished.write([build_row(f"TX_{i}", datetime(2024, 5, 1, i)) for i in range(3)])
+    finished.close()
+    unfinished = archive.new_file(date(2024, 6, 1), "rows-until-20240620T000000", 2)
+    unfinished.write([build_row("TX_9", datetime(2024, 6, 1))])
+
+    assert archive.unpublished() == [finished.tmp_path, unfinished.tmp_path]
+    assert sample_ids(finished.tmp_path, 10) == ["TX_0", "TX_1"]
+    assert sample_ids(unfinished.tmp_path, 10) is None
+
+    publish(finished.tmp_path)
+    assert archive.unpublished() == [unfinished.tmp_path]
+    assert archive.files() == [finished.path]
+
+def test_rows_file_name_is_stable_until_published(tmp_path, monkeypatch):
+    archive = ParquetArchive(str(tmp_path))
+    monkeypatch.setattr(archive_service, "transaction_archive", archive)
+    month, end = date(2024, 5, 1), datetime(2024, 5, 20)
+
+    assert rows_file_name(month, end) == rows_file_name(month, end) == "rows-until-20240520T000000"
+    write_month(archive, month, [build_row("TX_1", datetime(2024, 5, 3))], name="rows-until-20240520T000000")
+    assert rows_file_name(month, end) == "rows-until-20240520T000000-2"
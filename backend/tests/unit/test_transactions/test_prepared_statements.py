@@ -0,0 +1,55 @@
+import asyncio
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock
+from sqlalchemy import bindparam, select
+from sqlalchemy.dialects.postgresql.asyncpg import dialect as asyncpg_dialect
+from app.infra.prepared_statements import StatementRegistry, hot_statements
+from app.models.transaction_model import Transaction
+from app.repositories.transaction_repo import TransactionRepository, page_statement
+from app.schemas.filter_schema import TransactionFilter
+
+DIALECT = asyncpg_dialect()
+
+def test_representative_statement_matches_live_query():
+    registry = StatementRegistry()
+    registry.register("page_in_range", page_statement(TransactionFilter(start_date=datetime.min, end_date=datetime.min), 0, 0))
+
+    live = page_statement(TransactionFilter(start_date=datetime(2025, 1, 1), end_date=datetime(2025, 2, 1)), 100, 200)
+    [(name, sql, args)] = registry.compiled(DIALECT)
+
+    assert name == "page_in_range"
+    assert sql == str(live.compile(dialect=DIALECT))
+    assert args is None
+
+def test_transaction_list_runs_the_registered_page_statement():
+    connection = MagicMock(execute=AsyncMock(return_value=MagicMock()))
+    db = MagicMock(connection=AsyncMock(return_value=connection))
+    filters = TransactionFilter(start_date=datetime(2025, 1, 1), end_date=datetime(2025, 2, 1))
+
+    asyncio.run(TransactionRepository(db).get_transaction_rows(filters, 100, 200))
+
+    [stmt] = connection.execute.call_args.args
+    registered = dict((name, sql) for name, sql, _ in hot_statements.compiled(DIALECT))
+    assert str(stmt.compile(dialect=DIALECT)) == registered["transaction_page_in_range"]
+
+def test_warm_params_are_positional():
+    registry = StatementRegistry()
+    registry.register(
+        "by_id",
+        select(Transaction.transaction_id).where(Transaction.transaction_id == bindparam("transaction_id")).limit(5),
+        warm_params={"transaction_id": ""},
+    )
+
+    [(_, sql, args)] = registry.compiled(DIALECT)
+
+    assert "$1" in sql and "$2" in sql
+    assert args == ["", 5]
+
+def test_register_recompiles():
+    registry = StatementRegistry()
+    registry.register("one", select(Transaction.transaction_id))
+    assert len(registry.compiled(DIALECT)) == 1
+
+    registry.register("two", select(Transaction.customer_id))
+    assert registry.names() == ["one", "two"]
+    assert len(registry.compiled(DIALECT)) == 2
@@ -0,0 +1,46 @@
+import asyncpg
+from sqlalchemy.exc import DBAPIError
+from app.exception.transaction_exceptions import QueryTooExpensiveError
+from app.infra.query_budget import QueryBudgets, is_query_canceled, parse_budgets
+
+def test_parse_budgets():
+    assert parse_budgets("") == {}
+    assert parse_budgets("/transactions/filtered/count=3000, /stats/*=10000,") == {
+        "/transactions/filtered/count": 3000,
+        "/stats/*": 10000,
+    }
+
+def test_budget_for_uses_first_matching_override():
+    budgets = QueryBudgets(15000, {"/stats/fraud/*": 0, "/stats/*": 10000})
+
+    assert budgets.budget_for("/stats/fraud/by-country") == 0
+    assert budgets.budget_for("/stats/timeseries") == 10000
+    assert budgets.budget_for("/transactions/") == 15000
+
+def test_record_counts_per_route_and_reason():
+    budgets = QueryBudgets(15000, {})
+    budgets.record("/transactions/", "statement_timeout")
+    budgets.record("/transactions/", "statement_timeout")
+    budgets.record("/transactions/", "client_disconnected")
+
+    assert budgets.stats()["cancelled"] == {"/transactions/": {"statement_timeout": 2, "client_disconnected": 1}}
+
+class _DriverError(Exception):
+    def __init__(self, sqlstate):
+        self.sqlstate = sqlstate
+
+def test_is_query_canceled_follows_the_cause_chain():
+    canceled = DBAPIError("SELECT 1", None, _DriverError("57014"))
+    other = DBAPIError("SELECT 1", None, _DriverError("23505"))
+    wrapped = RuntimeError("Error accessing the database")
+    wrapped.__cause__ = canceled
+
+    assert is_query_canceled(canceled)
+    assert is_query_canceled(wrapped)
+    assert is_query_canceled(asyncpg.QueryCanceledError("canceling statement"))
+    assert not is_query_canceled(other)
+    assert not is_query_canceled(ValueError())
+
+def test_cancelled_query_is_not_a_validation_error():
+    assert QueryTooExpensiveError("/transactions/", 15000, "statement_timeout").to_http_status() == 504
+    assert QueryTooExpensiveError("/transactions/", 15000, "client_disconnected").to_http_status() == 503
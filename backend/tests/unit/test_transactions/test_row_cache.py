@@ -0,0 +1,43 @@
+from app.infra.row_cache import RowCache
+
+def test_disabled_without_rows():
+    cache = RowCache(0, 30)
+    cache.put("TX_1", {"transaction_id": "TX_1"}, cache.generation)
+
+    assert cache.get("TX_1") is None
+    assert cache.stats()["rows"] == 0
+
+def test_least_recently_used_is_evicted():
+    cache = RowCache(2, 30)
+    for key in ("TX_1", "TX_2"):
+        cache.put(key, {"transaction_id": key}, cache.generation)
+    assert cache.get("TX_1") is not None
+    cache.put("TX_3", {"transaction_id": "TX_3"}, cache.generation)
+
+    assert cache.get("TX_2") is None
+    assert cache.get("TX_1") == {"transaction_id": "TX_1"}
+    assert cache.stats()["hits"] == 2 and cache.stats()["misses"] == 1
+
+def test_expired_rows_are_misses():
+    cache = RowCache(10, -1)
+    cache.put("TX_1", {"transaction_id": "TX_1"}, cache.generation)
+
+    assert cache.get("TX_1") is None
+    assert cache.stats()["rows"] == 0
+
+def test_invalidation_drops_rows_and_reads_started_before_it():
+    cache = RowCache(10, 30)
+    cache.put("TX_1", {"transaction_id": "TX_1"}, cache.generation)
+    cache.put("TX_2", {"transaction_id": "TX_2"}, cache.generation)
+
+    generation = cache.generation
+    cache.invalidate(["TX_1"])
+    assert cache.get("TX_1") is None
+    assert cache.get("TX_2") is not None
+
+    # Read before the write committed: may be the old row
+    cache.put("TX_1", {"transaction_id": "TX_1"}, generation)
+    assert cache.get("TX_1") is None
+
+    cache.invalidate()
+    assert cache.get("TX_2") is None
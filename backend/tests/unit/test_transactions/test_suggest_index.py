@@ -0,0 +1,52 @@
+import pytest
+from app.exception.transaction_exceptions import SuggestIndexNotReadyError
+from app.infra.suggest_index import PrefixSuggestIndex
+from app.service import suggest_service
+from app.service.suggest_service import FilterSuggestService
+
+@pytest.fixture
+def index() -> PrefixSuggestIndex:
+    index = PrefixSuggestIndex(["merchant", "city"])
+    index.load({"merchant": {"Steam": 5, "Starbucks": 9, "Shell": 2, "Amazon": 7, "stadium": 1}})
+    return index
+
+def test_suggest_matches_prefix_case_insensitive_by_frequency(index):
+    assert [s["value"] for s in index.suggest("merchant", "st", 10)] == ["Starbucks", "Steam", "stadium"]
+    assert index.suggest("merchant", "STE", 10) == [{"value": "Steam", "count": 5}]
+
+def test_suggest_limit_and_empty_prefix(index):
+    assert [s["value"] for s in index.suggest("merchant", "", 2)] == ["Starbucks", "Amazon"]
+    assert index.suggest("merchant", "x", 10) == []
+    assert index.suggest("city", "", 10) == []
+
+def test_add_updates_counts_and_new_values(index):
+    index.suggest("merchant", "s", 10)  # cached
+    index.add("merchant", {"Shell": 10, "Subway": 3, None: 4})
+
+    assert [s["value"] for s in index.suggest("merchant", "s", 3)] == ["Shell", "Starbucks", "Steam"]
+    assert index.suggest("merchant", "sub", 10) == [{"value": "Subway", "count": 3}]
+    assert index.size("merchant") == 6
+
+def test_ties_are_alphabetical():
+    index = PrefixSuggestIndex(["city"])
+    index.load({"city": {"Porto": 1, "Paris": 1, "Praga": 1}})
+
+    assert [s["value"] for s in index.suggest("city", "p", 10)] == ["Paris", "Porto", "Praga"]
+
+def test_add_before_first_load_is_ignored():
+    index = PrefixSuggestIndex(["city"])
+    index.add("city", {"Porto": 3})
+    assert not index.ready and index.size() == 0
+
+    index.load({"city": {"Paris": 1}})
+    index.add("city", {"Porto": 3})
+    assert [s["value"] for s in index.suggest("city", "p", 10)] == ["Porto", "Paris"]
+
+def test_service_refuses_before_the_index_is_built(monkeypatch):
+    monkeypatch.setattr(suggest_service, "suggest_index", PrefixSuggestIndex(suggest_service.SUGGEST_FIELDS))
+    with pytest.raises(SuggestIndexNotReadyError) as error:
+        FilterSuggestService.suggest("city", "p", 10)
+    assert error.value.to_http_status() == 503
+
+    suggest_service.suggest_index.load({"city": {"Porto": 1}})
+    assert FilterSuggestService.suggest("city", "p", 10) == [{"value": "Porto", "count": 1}]
@@ -1,6 +1,9 @@
+import datetime
+from types import SimpleNamespace
 from app.exception.transaction_exceptions import TransactionInvalidDataError
 import pytest
 from app.schemas.transaction_schema import TransactionRequest
+from app.schemas.features_schema import conversion_rates
 from app.service.transaction_service import TransactionService
 from app.models.transaction_model import Transaction
 
@@ -236,16 +239,55 @@ def test_extract_features_high_risk_transaction(transaction_request_mock, get_cu
     features_dict = features.model_dump(by_alias=True)
     assert features_dict['high_risk_transaction'] == 0
 
+def test_stored_features_from_generated_columns(fake_transaction, get_currency_conversion_rate):
+    # Not computed yet (no generated values loaded): extract_features computes them
+    assert TransactionService._stored_features(fake_transaction) is None
+
+    generated = dict(
+        amount_usd=105.9894, velocity_total_amount_usd=265.0, velocity_max_single_amount_usd=159.0,
+        is_off_hours=False, is_high_amount=False, is_low_amount=False, suspicious_device=False, high_risk_transaction=False,
+    )
+    for name, value in generated.items():
+        setattr(fake_transaction, name, value)
+    stored = TransactionService._stored_features(fake_transaction)
+    assert stored["is_off_hours"] == 0 and isinstance(stored["is_off_hours"], int)
+
+    request = TransactionService._to_request(fake_transaction)
+    from_columns = TransactionService.extract_features(request, get_currency_conversion_rate, stored).model_dump(by_alias=True)
+    computed = TransactionService.extract_features(request, get_currency_conversion_rate).model_dump(by_alias=True)
+    assert from_columns == pytest.approx(computed)
+
 def test_to_response_masks_card_number(fake_transaction):
     dto = TransactionService._to_response(fake_transaction)
 
     assert dto.card_number.endswith("3456")
     assert dto.card_number.startswith("************")
-    assert dto.amount == 99.99
+    # Responses carry the amount in USD
+    assert dto.amount == pytest.approx(99.99 * conversion_rates["EUR"])
+    assert dto.currency == "USD"
     assert dto.velocity_last_hour.num_transactions == 3
 
 def test_to_response_raises_if_none():
     with pytest.raises(ValueError):
         TransactionService._to_response(None)
 
+def test_amount_usd_prefers_stored_value(fake_transaction):
+    fake_transaction.amount_usd = 120.0
+    assert TransactionService._to_response(fake_transaction).amount == 120.0
+
+    # Not backfilled yet: converted with the first rates
+    row = SimpleNamespace(amount=10.0, currency="XYZ", amount_usd=None)
+    assert TransactionService.amount_usd(row) == pytest.approx(12.8)
 
+
+
+def test_customer_cursor_round_trip():
+    row = SimpleNamespace(timestamp=datetime.datetime(2024, 10, 7, 17, 14, 22, 181495), transaction_id="TX|1")
+    cursor = TransactionService.encode_cursor(row)
+
+    assert TransactionService.decode_cursor(cursor) == (row.timestamp, "TX|1")
+
+@pytest.mark.parametrize("cursor", ["not-base64!", "bm8tc2VwYXJhdG9y", "eHx5"])
+def test_decode_cursor_rejects_invalid_cursor(cursor):
+    with pytest.raises(TransactionInvalidDataError):
+        TransactionService.decode_cursor(cursor)
@@ -2,6 +2,40 @@ import pandas as pd
 import json
 import ast
 
+def convert_to_json(value):
+    """
+    Converts a velocity_last_hour value (Python dict string) to a JSON string.
+    Returns None for empty or unparseable values.
+    """
+    if pd.isna(value) or value == '':
+        return None
+    try:
+        # Convert Python dict string to actual dict, then to JSON
+        dict_obj = ast.literal_eval(str(value))
+        return json.dumps(dict_obj)
+    except (ValueError, SyntaxError):
+        return None
+
+def clean_chunk(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Removes duplicated transactions and normalizes velocity_last_hour to JSON.
+    Works on a whole file or on a single chunk of it.
+
+    Args:
+        df (pd.DataFrame): Raw rows.
+
+    Returns:
+        pd.DataFrame: DataFrame sem duplicados.
+    """
+    # Remove duplicates
+    df_non_duplicates = df.drop_duplicates(subset="transaction_id", keep="first").copy()
+
+    # Convert velocity_last_hour from Python dict string to JSON
+    if 'velocity_last_hour' in df_non_duplicates.columns:
+        df_non_duplicates['velocity_last_hour'] = df_non_duplicates['velocity_last_hour'].apply(convert_to_json)
+
+    return df_non_duplicates
+
 def remover_duplicados_csv(clean_csv: str, save: bool = False) -> pd.DataFrame:
     """
     Reads .csv excel file and removes the duplicated rows
@@ -14,23 +48,7 @@ def remover_duplicados_csv(clean_csv: str, save: bool = False) -> pd.DataFrame:
         pd.DataFrame: DataFrame sem duplicados.
     """
     df = pd.read_csv(clean_csv)
-
-    # Remove duplicates
-    df_non_duplicates = df.drop_duplicates(subset="transaction_id", keep="first")
-
-    # Convert velocity_last_hour from Python dict string to JSON
-    if 'velocity_last_hour' in df_non_duplicates.columns:
-        def convert_to_json(value):
-            if pd.isna(value) or value == '':
-                return None
-            try:
-                # Convert Python dict string to actual dict, then to JSON
-                dict_obj = ast.literal_eval(str(value))
-                return json.dumps(dict_obj)
-            except (ValueError, SyntaxError):
-                return None
-
-        df_non_duplicates['velocity_last_hour'] = df_non_duplicates['velocity_last_hour'].apply(convert_to_json)
+    df_non_duplicates = clean_chunk(df)
 
     # Save
     if save:
@@ -41,4 +59,4 @@ def remover_duplicados_csv(clean_csv: str, save: bool = False) -> pd.DataFrame:
     return df_non_duplicates
 
 if __name__ == "__main__":
-    remover_duplicados_csv("./synthetic_fraud_data.csv", True)
\ No newline at end of file
+    remover_duplicados_csv("./synthetic_fraud_data.csv", True)
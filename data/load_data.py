@@ -0,0 +1,266 @@
+"""
+Streams CSV/Parquet transaction files into Postgres through COPY.
+
+Each file is read in chunks, cleaned with clean_data.clean_chunk (same dedupe and
+velocity_last_hour normalization as remover_duplicados_csv), COPY'd into a temporary
+staging table and merged into transactions, skipping the ids already there. Memory is
+bounded by --chunk-size (two chunks per worker), whatever the size of the files.
+
+Progress of every file is checkpointed after each committed chunk, so an interrupted
+load continues where it stopped with --resume. Files are loaded in parallel, one
+process per file, up to --workers.
+
+Usage (from the repository root, with the backend environment):
+    python data/load_data.py data/synthetic_fraud_data.csv
+    python data/load_data.py exports/*.parquet --workers 4 --chunk-size 100000 --resume
+"""
+import argparse
+import asyncio
+import hashlib
+import io
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+import asyncpg
+import pandas as pd
+import pyarrow.parquet as pq
+from dotenv import load_dotenv
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.pool import NullPool
+from tqdm import tqdm
+
+from clean_data import clean_chunk
+
+# Column rules and partition DDL shared with the backend (these modules create no engine)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+from app.models.transaction_model import NEW_IDS_LOCK_SQL, VELOCITY_COLUMNS, insert_new_ids_sql, velocity_columns_from  # noqa: E402
+from app.service.partition_service import PartitionService  # noqa: E402
+
+TABLE = "transactions"
+STAGING_TABLE = "transactions_staging"
+# Dashboard materialized views of the backend (STATS_SOURCE=materialized_views), refreshed after a load
+STATS_VIEWS = ("stats_dimension_mv", "stats_general_mv")
+INTEGER_TYPES = ("smallint", "integer", "bigint")
+
+def _dsn(database_url: str) -> str:
+    # asyncpg wants a plain postgresql:// URL, the backend uses postgresql+asyncpg://
+    return database_url.replace("postgresql+asyncpg://", "postgresql://")
+
+def _sqlalchemy_url(database_url: str) -> str:
+    return "postgresql+asyncpg://" + _dsn(database_url).split("://", 1)[1]
+
+# --- checkpoints ------------------------
+
+def _checkpoint_path(checkpoint_dir: Path, path: Path) -> Path:
+    digest = hashlib.sha1(str(path.resolve()).encode()).hexdigest()[:12]
+    return checkpoint_dir / f"{path.name}.{digest}.json"
+
+def _file_signature(path: Path, chunk_size: int) -> dict:
+    stat = path.stat()
+    return {"size": stat.st_size, "mtime": stat.st_mtime, "chunk_size": chunk_size}
+
+def read_checkpoint(checkpoint_dir: Path, path: Path, chunk_size: int) -> dict:
+    """Returns the saved progress of `path`, or a fresh one if the file or chunk size changed."""
+    fresh = {**_file_signature(path, chunk_size), "chunks_done": 0, "rows_read": 0, "inserted": 0, "done": False}
+    checkpoint_file = _checkpoint_path(checkpoint_dir, path)
+    if not checkpoint_file.exists():
+        return fresh
+    saved = json.loads(checkpoint_file.read_text())
+    if any(saved.get(key) != value for key, value in _file_signature(path, chunk_size).items()):
+        return fresh
+    return saved
+
+def write_checkpoint(checkpoint_dir: Path, path: Path, state: dict) -> None:
+    checkpoint_dir.mkdir(parents=True, exist_ok=True)
+    target = _checkpoint_path(checkpoint_dir, path)
+    tmp = target.with_suffix(".tmp")
+    tmp.write_text(json.dumps(state))
+    os.replace(tmp, target)
+
+# --- readers ------------------------
+
+def count_rows(path: Path) -> Optional[int]:
+    if path.suffix == ".parquet":
+        return pq.ParquetFile(path).metadata.num_rows
+    return None
+
+def iter_chunks(path: Path, chunk_size: int, skip_chunks: int = 0) -> Iterator[pd.DataFrame]:
+    """Yields DataFrames of at most chunk_size rows, skipping the first skip_chunks chunks."""
+    if path.suffix == ".parquet":
+        parquet = pq.ParquetFile(path)
+        for index, batch in enumerate(parquet.iter_batches(batch_size=chunk_size)):
+            if index >= skip_chunks:
+                yield batch.to_pandas()
+        return
+
+    # Integer skiprows is skipped by the C parser without building a row set
+    columns = pd.read_csv(path, nrows=0).columns
+    reader = pd.read_csv(path, chunksize=chunk_size, header=None, names=columns, skiprows=1 + skip_chunks * chunk_size)
+    yield from reader
+
+# --- database ------------------------
+
+async def table_columns(conn: asyncpg.Connection) -> Dict[str, str]:
+    """Insertable (non-generated) columns of transactions and their data types, in table order."""
+    rows = await conn.fetch(
+        """
+        SELECT column_name, data_type FROM information_schema.columns
+        WHERE table_name = $1 AND is_generated = 'NEVER'
+        ORDER BY ordinal_position
+        """,
+        TABLE,
+    )
+    return {row["column_name"]: row["data_type"] for row in rows}
+
+async def ensure_partitions(session: AsyncSession, timestamps: pd.Series) -> None:
+    """
+    Creates the monthly partitions the chunk needs with the backend's PartitionService: same names and
+    locks, and the rows of a month already in the default partition are moved into its new partition.
+    A partition that cannot be created fails the load (resumable with --resume).
+    """
+    months = pd.to_datetime(timestamps, errors="coerce", utc=True).dt.tz_localize(None).dropna().dt.to_period("M").unique()
+    await PartitionService(session).ensure_partitions_for(months.to_timestamp().to_pydatetime())
+
+def fill_velocity_columns(chunk: pd.DataFrame) -> pd.DataFrame:
+    """
+    Typed velocity columns (VELOCITY_COLUMNS) from the cleaned velocity_last_hour JSON, with the
+    backend's rules (velocity_columns_from), for the rows that do not already carry them (Parquet exports do).
+    """
+    if "velocity_last_hour" not in chunk.columns:
+        return chunk
+    typed = pd.DataFrame.from_records(
+        [velocity_columns_from(json.loads(value) if isinstance(value, str) else None) for value in chunk["velocity_last_hour"]],
+        index=chunk.index,
+        columns=list(VELOCITY_COLUMNS.values()),
+    )
+    for name in VELOCITY_COLUMNS.values():
+        chunk[name] = chunk[name].fillna(typed[name]) if name in chunk.columns else typed[name]
+    return chunk
+
+def chunk_to_csv(chunk: pd.DataFrame, columns: List[str], types: Dict[str, str]) -> io.BytesIO:
+    for column in columns:
+        # NaN turns integer columns into floats; "1.0" is not a valid Postgres integer
+        if types[column] in INTEGER_TYPES and chunk[column].dtype.kind == "f":
+            chunk[column] = chunk[column].astype("Int64")
+    buffer = io.BytesIO()
+    chunk[columns].to_csv(buffer, index=False, header=False)
+    buffer.seek(0)
+    return buffer
+
+async def copy_chunk(conn: asyncpg.Connection, chunk: pd.DataFrame, types: Dict[str, str]) -> int:
+    """COPY one cleaned chunk into staging and merge it; returns the number of inserted rows."""
+    columns = [column for column in types if column in chunk.columns]
+    buffer = chunk_to_csv(chunk, columns, types)
+    async with conn.transaction():
+        await conn.copy_to_table(STAGING_TABLE, source=buffer, columns=columns, format="csv")
+        # Same locks, in the same order, as the backend's writers (see NEW_IDS_LOCK_SQL)
+        await conn.execute(f"LOCK TABLE {TABLE} IN ROW EXCLUSIVE MODE")
+        await conn.execute(NEW_IDS_LOCK_SQL)
+        status = await conn.execute(insert_new_ids_sql(STAGING_TABLE, columns))
+    return int(status.split()[-1])
+
+async def load_file_async(path: Path, options: dict, position: int) -> dict:
+    chunk_size = options["chunk_size"]
+    checkpoint_dir = Path(options["checkpoint_dir"])
+    state = read_checkpoint(checkpoint_dir, path, chunk_size) if options["resume"] else {
+        **_file_signature(path, chunk_size), "chunks_done": 0, "rows_read": 0, "inserted": 0, "done": False
+    }
+    if state["done"]:
+        tqdm.write(f"{path.name}: already loaded, skipping")
+        return {"file": str(path), **state}
+
+    conn = await asyncpg.connect(_dsn(options["database_url"]))
+    # Partition DDL goes through the backend's repository, on a connection of its own
+    engine = create_async_engine(_sqlalchemy_url(options["database_url"]), poolclass=NullPool)
+    session = AsyncSession(engine)
+    try:
+        types = await table_columns(conn)
+        partitioned = await conn.fetchval("SELECT relkind = 'p' FROM pg_class WHERE oid = to_regclass($1)", TABLE)
+        await conn.execute(
+            f"CREATE TEMP TABLE IF NOT EXISTS {STAGING_TABLE} (LIKE {TABLE} INCLUDING DEFAULTS) ON COMMIT DELETE ROWS"
+        )
+        progress = tqdm(total=count_rows(path), initial=state["rows_read"], desc=path.name, unit="rows", position=position)
+
+        chunks = iter_chunks(path, chunk_size, skip_chunks=state["chunks_done"])
+        # Read/clean the next chunk in a thread while the current one is being COPY'd
+        pending = asyncio.create_task(asyncio.to_thread(lambda: next(chunks, None)))
+        while True:
+            raw = await pending
+            if raw is None:
+                break
+            pending = asyncio.create_task(asyncio.to_thread(lambda: next(chunks, None)))
+
+            cleaned = fill_velocity_columns(clean_chunk(raw))
+            if partitioned and "timestamp" in cleaned.columns:
+                await ensure_partitions(session, cleaned["timestamp"])
+            inserted = await copy_chunk(conn, cleaned, types)
+
+            state["chunks_done"] += 1
+            state["rows_read"] += len(raw)
+            state["inserted"] += inserted
+            write_checkpoint(checkpoint_dir, path, state)
+            progress.update(len(raw))
+            progress.set_postfix(inserted=state["inserted"])
+
+        state["done"] = True
+        write_checkpoint(checkpoint_dir, path, state)
+        progress.close()
+        return {"file": str(path), **state}
+    finally:
+        await session.close()
+        await engine.dispose()
+        await conn.close()
+
+async def refresh_stats_views(database_url: str) -> None:
+    """REFRESH ... CONCURRENTLY the backend stats views that exist, so the dashboard sees the new rows."""
+    conn = await asyncpg.connect(_dsn(database_url))
+    try:
+        for view in STATS_VIEWS:
+            if await conn.fetchval("SELECT to_regclass($1) IS NOT NULL", view):
+                await conn.execute(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {view}")
+                print(f"Refreshed {view}")
+    finally:
+        await conn.close()
+
+def load_file(path: str, options: dict, position: int) -> dict:
+    """Process entry point: one event loop and one connection per file."""
+    return asyncio.run(load_file_async(Path(path), options, position))
+
+def main(argv: Optional[List[str]] = None) -> None:
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Stream CSV/Parquet transaction files into Postgres through COPY")
+    parser.add_argument("files", nargs="+", help="CSV or Parquet files to load")
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL"), help="Defaults to $DATABASE_URL")
+    parser.add_argument("--chunk-size", type=int, default=50_000, help="Rows per chunk (bounds memory per worker)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Files loaded in parallel")
+    parser.add_argument("--checkpoint-dir", default=str(Path(__file__).parent / ".load_checkpoints"))
+    parser.add_argument("--resume", action="store_true", help="Continue from the last committed chunk of each file")
+    args = parser.parse_args(argv)
+
+    if not args.database_url:
+        parser.error("DATABASE_URL is not set, pass --database-url")
+
+    options = {
+        "database_url": args.database_url,
+        "chunk_size": args.chunk_size,
+        "checkpoint_dir": args.checkpoint_dir,
+        "resume": args.resume,
+    }
+    workers = max(1, min(args.workers, len(args.files)))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(load_file, path, options, index): path for index, path in enumerate(args.files)}
+        results = [future.result() for future in as_completed(futures)]
+
+    total_read = sum(result["rows_read"] for result in results)
+    total_inserted = sum(result["inserted"] for result in results)
+    print(f"Loaded {len(results)} file(s): {total_read} rows read, {total_inserted} inserted, "
+          f"{total_read - total_inserted} duplicates/skipped")
+    if total_inserted:
+        asyncio.run(refresh_stats_views(args.database_url))
+
+if __name__ == "__main__":
+    main()